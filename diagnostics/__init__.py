@@ -0,0 +1 @@
+# Runtime diagnostics shared by the MCP server and the LangGraph frontend
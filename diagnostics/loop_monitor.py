@@ -0,0 +1,292 @@
+"""Event-loop blocking detector.
+
+Finds code that holds an asyncio event loop: sync HTTP clients (OpenAI,
+requests), sync Redis or Qdrant calls, heavy JSON work inside async def
+functions. Such calls serialize work that looks concurrent.
+
+How it works: every attached loop runs a heartbeat callback every
+threshold/2 seconds. A watchdog thread notices when a heartbeat is more
+than the threshold late and samples the loop thread's stack at that moment
+(sys._current_frames()), i.e. while the offending code is still running.
+When the loop comes back, the stall is recorded under its call site: the
+innermost frame from application code (not the standard library or
+site-packages), together with the library call it was blocked in.
+
+New call sites are logged with their stack as they are found, and a summary
+of the top offenders is logged every LOOP_BLOCK_REPORT_INTERVAL seconds.
+stats() returns the aggregates for metrics and admin endpoints.
+
+Usage:
+
+    from diagnostics.loop_monitor import blocking_detector
+
+    blocking_detector.attach()                 # from inside a running loop
+    asyncio.run(blocking_detector.watch(coro)) # attach for one asyncio.run()
+
+The detector is opt-in; attach() and watch() do nothing unless it is enabled.
+
+Environment variables:
+    LOOP_BLOCK_DETECTOR: Set to 1 to enable. Default 0.
+    LOOP_BLOCK_THRESHOLD_MS: Stall length that counts as blocking. Default 100.
+    LOOP_BLOCK_REPORT_INTERVAL: Seconds between summary logs (0 for none). Default 300.
+"""
+
+import asyncio
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+
+ENABLED = os.getenv("LOOP_BLOCK_DETECTOR", "0") == "1"
+THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+REPORT_INTERVAL = float(os.getenv("LOOP_BLOCK_REPORT_INTERVAL", "300"))
+
+# Frames kept per sampled stack, and distinct call sites tracked (the rest
+# are counted under OTHER_SITE so metric labels stay bounded)
+STACK_DEPTH = 30
+MAX_SITES = 200
+OTHER_SITE = "(other)"
+# Stall with no sample: the blocking code held the GIL so the watchdog could not run
+UNKNOWN_SITE = "(unknown: GIL held)"
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_LIBRARY_PATHS = tuple(sorted({
+    os.path.abspath(path) for name, path in sysconfig.get_paths().items()
+    if name in ("stdlib", "platstdlib", "purelib", "platlib")
+}))
+_OWN_FILE = os.path.abspath(__file__)
+
+
+def _is_app_frame(filename: str) -> bool:
+    """Whether a frame belongs to application code."""
+    if filename.startswith("<"):
+        return False
+    path = os.path.abspath(filename)
+    return path != _OWN_FILE and not path.startswith(_LIBRARY_PATHS) and "site-packages" not in path
+
+
+def _describe(frame: traceback.FrameSummary) -> str:
+    path = os.path.abspath(frame.filename)
+    if path.startswith(PROJECT_ROOT + os.sep):
+        path = os.path.relpath(path, PROJECT_ROOT)
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{frame.lineno} in {frame.name}"
+
+
+class _Sample:
+    """Stack of a loop thread caught while the loop was blocked."""
+
+    __slots__ = ("site", "blocked_in", "stack")
+
+    def __init__(self, frames: List[traceback.FrameSummary]):
+        app_frames = [frame for frame in frames if _is_app_frame(frame.filename)]
+        innermost = frames[-1] if frames else None
+        self.site = _describe(app_frames[-1]) if app_frames else (_describe(innermost) if innermost else UNKNOWN_SITE)
+        self.blocked_in = _describe(innermost) if innermost else None
+        self.stack = [_describe(frame) for frame in frames]
+
+
+class _LoopState:
+    """Heartbeat bookkeeping for one attached loop."""
+
+    __slots__ = ("loop", "thread_id", "interval", "expected", "handle", "sample", "idle")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float):
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+        self.interval = interval
+        self.expected = time.monotonic() + interval  # When the next heartbeat is due
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.sample: Optional[_Sample] = None
+        self.idle = False
+
+
+class BlockingDetector:
+    """Detects and aggregates callbacks that hold an event loop too long."""
+
+    def __init__(
+        self,
+        threshold_ms: float = THRESHOLD_MS,
+        report_interval: float = REPORT_INTERVAL,
+        enabled: bool = ENABLED
+    ):
+        """Initialize the detector.
+
+        Args:
+            threshold_ms: Stall length that counts as blocking
+            report_interval: Seconds between summary logs (0 for none)
+            enabled: attach() and watch() do nothing when False
+        """
+        self.enabled = enabled
+        self.threshold = threshold_ms / 1000
+        self.report_interval = report_interval
+        self._loops: Dict[int, _LoopState] = {}
+        self._sites: Dict[str, Dict[str, Any]] = {}
+        self._events_since_report = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """The watchdog thread and parent loops don't exist in a forked child."""
+        self._lock = threading.Lock()
+        self._thread = None
+        self._loops = {}
+        self._sites = {}
+        self._events_since_report = 0
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Start watching a loop (default: the running one).
+
+        Must be called from the loop's own thread.
+        """
+        if not self.enabled:
+            return
+        loop = loop or asyncio.get_running_loop()
+        state = _LoopState(loop, self.threshold / 2)
+        with self._lock:
+            self._loops[id(loop)] = state
+        state.handle = loop.call_later(state.interval, self._beat, state)
+        self._ensure_watchdog()
+
+    def detach(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Stop watching a loop (call from the loop's thread)."""
+        loop = loop or asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.pop(id(loop), None)
+        if state is not None and state.handle is not None:
+            state.handle.cancel()
+
+    async def watch(self, awaitable: Awaitable[Any]) -> Any:
+        """Await something with the running loop attached, e.g. asyncio.run(watch(coro))."""
+        if not self.enabled:
+            return await awaitable
+        self.attach()
+        try:
+            return await awaitable
+        finally:
+            self.detach()
+
+    def _beat(self, state: _LoopState):
+        """Heartbeat, run on the watched loop."""
+        now = time.monotonic()
+        late = now - state.expected
+        sample, state.sample = state.sample, None
+        if state.idle:
+            # The loop was stopped (not blocked) in between
+            state.idle = False
+        elif late > self.threshold:
+            self._record(sample, late)
+        state.expected = now + state.interval
+        if id(state.loop) in self._loops:
+            state.handle = state.loop.call_later(state.interval, self._beat, state)
+
+    def _ensure_watchdog(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._watchdog, name="loop-block-watchdog", daemon=True)
+            self._thread.start()
+
+    def _watchdog(self):
+        """Sample the stack of every loop whose heartbeat is overdue."""
+        poll = max(self.threshold / 4, 0.005)
+        next_report = time.monotonic() + self.report_interval if self.report_interval else None
+        while True:
+            time.sleep(poll)
+            now = time.monotonic()
+            with self._lock:
+                states = list(self._loops.values())
+            for state in states:
+                if state.loop.is_closed():
+                    with self._lock:
+                        self._loops.pop(id(state.loop), None)
+                    continue
+                if not state.loop.is_running():
+                    state.idle = True
+                    continue
+                if state.sample is None and now - state.expected > self.threshold:
+                    frame = sys._current_frames().get(state.thread_id)
+                    if frame is not None:
+                        frames = traceback.extract_stack(frame, limit=STACK_DEPTH)
+                        state.sample = _Sample(frames)
+                        del frame
+            if next_report is not None and now >= next_report:
+                next_report = now + self.report_interval
+                if self._events_since_report:
+                    self._events_since_report = 0
+                    print(self.report())
+
+    def _record(self, sample: Optional[_Sample], seconds: float):
+        """Add one stall to its call site's totals; log call sites seen for the first time."""
+        site = sample.site if sample is not None else UNKNOWN_SITE
+        now = time.time()
+        with self._lock:
+            self._events_since_report += 1
+            entry = self._sites.get(site)
+            new_site = entry is None
+            if new_site and len(self._sites) >= MAX_SITES:
+                site, new_site = OTHER_SITE, OTHER_SITE not in self._sites
+                entry = self._sites.get(site)
+            if entry is None:
+                entry = self._sites[site] = {
+                    "count": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "first_seen": now,
+                    "blocked_in": sample.blocked_in if sample is not None else None,
+                    "stack": sample.stack if sample is not None else [],
+                }
+            entry["count"] += 1
+            entry["total_seconds"] += seconds
+            entry["last_seen"] = now
+            if seconds > entry["max_seconds"]:
+                entry["max_seconds"] = seconds
+                if sample is not None and site != OTHER_SITE:
+                    # Keep the stack of the worst stall
+                    entry["blocked_in"] = sample.blocked_in
+                    entry["stack"] = sample.stack
+        if new_site:
+            detail = ""
+            if sample is not None:
+                if sample.blocked_in != site:
+                    detail = f" (in {sample.blocked_in})"
+                detail += "".join(f"\n    {line}" for line in sample.stack)
+            print(f"[LOOP_MONITOR] Event loop blocked for {seconds * 1000:.0f} ms at {site}{detail}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-call-site stall counts and durations, worst total first."""
+        with self._lock:
+            sites = {site: dict(entry) for site, entry in self._sites.items()}
+            loops = len(self._loops)
+        ordered = sorted(sites.items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold * 1000,
+            "loops_watched": loops,
+            "sites": [dict(entry, site=site) for site, entry in ordered],
+        }
+
+    def site_totals(self) -> Dict[str, Tuple[int, float]]:
+        """(stall count, total seconds) per call site, for metrics."""
+        with self._lock:
+            return {site: (entry["count"], entry["total_seconds"]) for site, entry in self._sites.items()}
+
+    def report(self, top: int = 10) -> str:
+        """Summarize the worst call sites for the log."""
+        sites = self.stats()["sites"][:top]
+        lines = [f"[LOOP_MONITOR] Top {len(sites)} event-loop blocking call sites (threshold {self.threshold * 1000:.0f} ms):"]
+        for entry in sites:
+            lines.append(
+                f"  {entry['total_seconds']:8.2f}s total {entry['count']:6d}x max {entry['max_seconds'] * 1000:7.0f} ms"
+                f"  {entry['site']}" + (f" (in {entry['blocked_in']})" if entry["blocked_in"] not in (None, entry["site"]) else "")
+            )
+        return "\n".join(lines)
+
+
+# Process-wide detector configured from the environment
+blocking_detector = BlockingDetector()
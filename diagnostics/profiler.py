@@ -0,0 +1,324 @@
+"""On-demand CPU and memory profiling for admin endpoints.
+
+Both the MCP server and the frontend expose these through admin routes
+guarded by ADMIN_TOKEN, so a slow or bloated process can be inspected
+without a redeploy:
+
+- CPU: a sampling profiler reads every thread's stack
+  (sys._current_frames()) at a fixed interval for a bounded number of
+  seconds. The result is returned as collapsed stacks (one
+  "thread;outer;...;inner count" line per stack, for flamegraph.pl or
+  speedscope) or as speedscope JSON. Sampling adds no overhead outside the
+  profiling window and needs no extra dependency.
+- Memory: tracemalloc snapshots, listed by allocation site, and the diff
+  between two of them to find what grew (log writers, cached payloads,
+  model weights). Tracing starts with the first snapshot and slows
+  allocations until it is stopped, so take a baseline, wait for the growth,
+  take a second snapshot, diff, and stop.
+
+Environment variables:
+    ADMIN_TOKEN: Bearer token required by the admin routes. They are
+        disabled (404) when it is not set.
+"""
+
+import hmac
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from diagnostics.loop_monitor import PROJECT_ROOT
+
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# CPU profile bounds
+DEFAULT_PROFILE_SECONDS = 10.0
+MAX_PROFILE_SECONDS = 60.0
+DEFAULT_INTERVAL_MS = 10.0
+MIN_INTERVAL_MS = 1.0
+MAX_STACK_DEPTH = 128
+PROFILE_FORMATS = ("collapsed", "speedscope")
+
+# Memory snapshot bounds
+TRACE_FRAMES = 25  # Frames recorded per allocation
+MAX_SNAPSHOTS = 10  # Oldest snapshots are dropped past this
+DEFAULT_TOP = 25
+GROUP_BY = ("lineno", "filename", "traceback")
+
+
+class ProfilerBusy(Exception):
+    """Raised when a CPU profile is requested while another one is running."""
+
+
+def admin_token_enabled() -> bool:
+    """Whether the admin routes are enabled."""
+    return bool(ADMIN_TOKEN)
+
+
+def check_admin_token(authorization: Optional[str]) -> bool:
+    """Check an Authorization header ("Bearer <token>") against ADMIN_TOKEN."""
+    if not ADMIN_TOKEN or not authorization:
+        return False
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer":
+        return False
+    return hmac.compare_digest(token.strip().encode(), ADMIN_TOKEN.encode())
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to the project root, or the library-relative tail."""
+    path = os.path.abspath(filename) if not filename.startswith("<") else filename
+    if path.startswith(PROJECT_ROOT + os.sep):
+        return os.path.relpath(path, PROJECT_ROOT)
+    marker = os.sep + "site-packages" + os.sep
+    if marker in path:
+        return path.split(marker, 1)[1]
+    return os.path.basename(path)
+
+
+class CpuProfile:
+    """Stack samples aggregated per thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.sample_count = 0
+        # (thread name, stack of frame keys from outermost to innermost) -> samples
+        self.stacks: Counter = Counter()
+        # Frame key (function, file, first line) of every frame seen
+        self.frames: Dict[Tuple[str, str, int], int] = {}
+
+    def add(self, thread_name: str, frame):
+        keys = []
+        while frame is not None and len(keys) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            key = (code.co_name, _short_path(code.co_filename), code.co_firstlineno)
+            if key not in self.frames:
+                self.frames[key] = len(self.frames)
+            keys.append(key)
+            frame = frame.f_back
+        keys.reverse()
+        self.stacks[(thread_name, tuple(keys))] += 1
+
+    def to_collapsed(self) -> str:
+        """One "thread;outer;...;inner count" line per distinct stack."""
+        lines = []
+        for (thread_name, keys), count in self.stacks.most_common():
+            names = [thread_name.replace(";", ":")] + [f"{name} ({path}:{line})" for name, path, line in keys]
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self) -> Dict[str, Any]:
+        """Speedscope file format, one sampled profile per thread."""
+        frames = [None] * len(self.frames)
+        for (name, path, line), index in self.frames.items():
+            frames[index] = {"name": name, "file": path, "line": line}
+        per_thread: Dict[str, Dict[str, list]] = {}
+        for (thread_name, keys), count in self.stacks.most_common():
+            profile = per_thread.setdefault(thread_name, {"samples": [], "weights": []})
+            profile["samples"].append([self.frames[key] for key in keys])
+            profile["weights"].append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"pid {os.getpid()} cpu profile {datetime.fromtimestamp(self.started_at, timezone.utc).isoformat()}",
+            "exporter": "diagnostics.profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(profile["weights"]),
+                    "samples": profile["samples"],
+                    "weights": profile["weights"],
+                }
+                for thread_name, profile in per_thread.items()
+            ],
+        }
+
+
+class CpuProfiler:
+    """Sampling CPU profiler; one profile may run at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(
+        self,
+        seconds: float = DEFAULT_PROFILE_SECONDS,
+        interval_ms: float = DEFAULT_INTERVAL_MS,
+        idle: bool = False
+    ) -> CpuProfile:
+        """Sample all threads for `seconds` (blocks the calling thread).
+
+        Args:
+            seconds: Length of the profile, at most MAX_PROFILE_SECONDS
+            interval_ms: Time between samples, at least MIN_INTERVAL_MS
+            idle: Keep samples of threads waiting on a lock, sleep or socket
+
+        Raises:
+            ValueError: If seconds or interval_ms is out of range
+            ProfilerBusy: If another profile is running
+        """
+        if not 0 < seconds <= MAX_PROFILE_SECONDS:
+            raise ValueError(f"seconds must be between 0 and {MAX_PROFILE_SECONDS:.0f}")
+        if interval_ms < MIN_INTERVAL_MS:
+            raise ValueError(f"interval_ms must be at least {MIN_INTERVAL_MS:.0f}")
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A CPU profile is already running")
+        try:
+            return self._sample(seconds, interval_ms / 1000, idle)
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _sample(seconds: float, interval: float, idle: bool) -> CpuProfile:
+        profile = CpuProfile(interval)
+        own = threading.get_ident()
+        start = time.perf_counter()
+        end = start + seconds
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (not idle and _is_idle(frame)):
+                    continue
+                profile.add(names.get(ident, f"thread-{ident}"), frame)
+            profile.sample_count += 1
+            now = time.perf_counter()
+            if now >= end:
+                break
+            time.sleep(min(interval, end - now))
+        profile.duration = time.perf_counter() - start
+        return profile
+
+
+# Innermost functions of threads parked on a lock, sleep, queue or socket
+_IDLE_LEAVES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"), ("socket.py", "accept"), ("queue.py", "get"),
+    ("thread.py", "_worker"), ("loop_monitor.py", "_watchdog"), ("ssl.py", "read"),
+}
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+
+
+def _statistic(stat, group_by: str) -> Dict[str, Any]:
+    frame = stat.traceback[-1] if group_by == "traceback" else stat.traceback[0]
+    entry = {
+        "location": f"{_short_path(frame.filename)}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_bytes"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    if group_by == "traceback":
+        entry["traceback"] = [f"{_short_path(f.filename)}:{f.lineno}" for f in stat.traceback]
+    return entry
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots kept in memory for diffing."""
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._snapshots: Dict[int, Tuple[float, tracemalloc.Snapshot]] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def snapshot(self, top: int = DEFAULT_TOP, group_by: str = "lineno") -> Dict[str, Any]:
+        """Take a snapshot, starting tracemalloc first if needed.
+
+        Allocations made before tracing started are not counted, so the
+        first snapshot is only a baseline.
+        """
+        _check_group_by(group_by)
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(TRACE_FRAMES)
+            print(f"[PROFILER] tracemalloc started ({TRACE_FRAMES} frames per allocation)")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = (time.time(), snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.pop(min(self._snapshots))
+        return {
+            "id": snapshot_id,
+            "tracing_started": started,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": [_statistic(stat, group_by) for stat in snapshot.statistics(group_by)[:top]],
+        }
+
+    def list(self) -> Dict[str, Any]:
+        """Return the stored snapshots and tracemalloc state."""
+        with self._lock:
+            snapshots = [
+                {"id": snapshot_id, "taken_at": datetime.fromtimestamp(taken_at, timezone.utc).isoformat(),
+                 "traced_bytes": sum(stat.size for stat in snapshot.statistics("filename"))}
+                for snapshot_id, (taken_at, snapshot) in sorted(self._snapshots.items())
+            ]
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {"tracing": tracemalloc.is_tracing(), "traced_bytes": current, "peak_bytes": peak, "snapshots": snapshots}
+
+    def diff(self, base: int, target: int, top: int = DEFAULT_TOP, group_by: str = "lineno") -> Dict[str, Any]:
+        """Compare two snapshots, largest growth first.
+
+        Raises:
+            KeyError: If a snapshot id is unknown
+            ValueError: If group_by is invalid
+        """
+        _check_group_by(group_by)
+        with self._lock:
+            missing = [snapshot_id for snapshot_id in (base, target) if snapshot_id not in self._snapshots]
+            if missing:
+                raise KeyError(f"Unknown snapshot id {missing[0]}")
+            base_snapshot = self._snapshots[base][1]
+            target_snapshot = self._snapshots[target][1]
+        stats = target_snapshot.compare_to(base_snapshot, group_by)
+        return {
+            "base": base,
+            "target": target,
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "top": [_statistic(stat, group_by) for stat in stats[:top]],
+        }
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop tracing and drop all snapshots."""
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.stop()
+            print("[PROFILER] tracemalloc stopped")
+        with self._lock:
+            dropped = len(self._snapshots)
+            self._snapshots.clear()
+        return {"stopped": tracing, "snapshots_dropped": dropped}
+
+
+def _check_group_by(group_by: str):
+    if group_by not in GROUP_BY:
+        raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+
+
+# Process-wide profilers used by the admin routes
+cpu_profiler = CpuProfiler()
+memory_profiler = MemoryProfiler()
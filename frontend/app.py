@@ -43,6 +43,13 @@ else:
     # Fallback to current directory
     load_dotenv()
 
+# Event-loop blocking detector (opt-in with LOOP_BLOCK_DETECTOR=1; reads .env)
+from diagnostics.loop_monitor import blocking_detector
+# CPU/memory profilers behind the ADMIN_TOKEN admin routes
+from diagnostics.profiler import (
+    PROFILE_FORMATS, ProfilerBusy, admin_token_enabled, check_admin_token, cpu_profiler, memory_profiler
+)
+
 # Database setup
 class Base(DeclarativeBase):
     """Base class for all models."""
@@ -153,8 +160,10 @@ def run_async(coro):
     """Run an async coroutine in a fresh event loop.
     
     This ensures each request gets a clean event loop, avoiding
-    "Event loop is closed" errors.
+    "Event loop is closed" errors. The loop is watched by the
+    event-loop blocking detector when it is enabled.
     """
+    coro = blocking_detector.watch(coro)
     # Always create a fresh event loop for Flask requests
     # This is the safest approach to avoid event loop conflicts
     try:
@@ -193,6 +202,18 @@ def require_login(f):
     return decorated_function
 
 
+def require_admin(f):
+    """Decorator to require the ADMIN_TOKEN bearer token for routes."""
+    def decorated_function(*args, **kwargs):
+        if not admin_token_enabled():
+            return jsonify({"error": "Admin endpoints are disabled (set ADMIN_TOKEN)"}), 404
+        if not check_admin_token(request.headers.get("Authorization")):
+            return jsonify({"error": "Invalid or missing admin token"}), 401, {"WWW-Authenticate": "Bearer"}
+        return f(*args, **kwargs)
+    decorated_function.__name__ = f.__name__
+    return decorated_function
+
+
 @app.route("/")
 def index():
     """Serve the React app."""
@@ -859,11 +880,16 @@ def book_hotel():
         sys.path.insert(0, str(project_root / "mcp_system" / "clients"))
         
         from hotel_agent_client import HotelAgentClient
+        from clients.base_client import close_shared_connections
         import asyncio
         
         # Call booking tool via MCP
         async def make_booking():
-            return await HotelAgentClient.invoke("book_hotel_room", **data)
+            try:
+                return await HotelAgentClient.invoke("book_hotel_room", **data)
+            finally:
+                # This request's event loop ends here; close its connections
+                await close_shared_connections()
         
         booking_result = asyncio.run(make_booking())
         
@@ -1201,6 +1227,80 @@ def chat():
         return jsonify({"error": error_msg, "details": "An error occurred processing your request"}), 500
 
 
+@app.route("/api/admin/profile/cpu", methods=["POST"])
+@require_admin
+def profile_cpu():
+    """Sample all threads and return a CPU profile (collapsed stacks or speedscope JSON)."""
+    output_format = request.args.get("format", "collapsed")
+    if output_format not in PROFILE_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(PROFILE_FORMATS)}"}), 400
+    try:
+        profile = cpu_profiler.profile(
+            float(request.args.get("seconds", 10)),
+            float(request.args.get("interval_ms", 10)),
+            request.args.get("idle", "false").lower() == "true"
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+    if output_format == "speedscope":
+        return jsonify(profile.to_speedscope())
+    return app.response_class(profile.to_collapsed(), mimetype="text/plain")
+
+
+@app.route("/api/admin/profile/memory/snapshots", methods=["POST"])
+@require_admin
+def take_memory_snapshot():
+    """Take a tracemalloc snapshot (starts tracing on first use)."""
+    try:
+        return jsonify(memory_profiler.snapshot(
+            int(request.args.get("top", 25)), request.args.get("group_by", "lineno")
+        ))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@app.route("/api/admin/profile/memory/snapshots", methods=["GET"])
+@require_admin
+def list_memory_snapshots():
+    """List stored snapshots and the traced memory."""
+    return jsonify(memory_profiler.list())
+
+
+@app.route("/api/admin/profile/memory/diff", methods=["GET"])
+@require_admin
+def diff_memory_snapshots():
+    """Compare two snapshots (?base=&target=), largest growth first."""
+    if "base" not in request.args or "target" not in request.args:
+        return jsonify({"error": "'base' and 'target' snapshot ids are required"}), 400
+    try:
+        return jsonify(memory_profiler.diff(
+            int(request.args["base"]),
+            int(request.args["target"]),
+            int(request.args.get("top", 25)),
+            request.args.get("group_by", "lineno")
+        ))
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@app.route("/api/admin/profile/memory", methods=["DELETE"])
+@require_admin
+def stop_memory_profiling():
+    """Stop tracemalloc and drop all snapshots."""
+    return jsonify(memory_profiler.stop())
+
+
+@app.route("/api/admin/blocking", methods=["GET"])
+@require_admin
+def get_blocking_stats():
+    """Get event-loop stalls per call site (LOOP_BLOCK_DETECTOR=1)."""
+    return jsonify(blocking_detector.stats())
+
+
 @socketio.on('connect')
 def handle_connect():
     """Handle WebSocket connection."""
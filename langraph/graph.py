@@ -1,5 +1,8 @@
 """LangGraph orchestration for multi-agent travel system."""
 
+import os
+import sys
+import uuid
 from typing import Literal, Union, List
 from langgraph.graph import StateGraph, END
 from state import AgentState
@@ -26,6 +29,10 @@ from nodes.memory_agent_node import memory_agent_node
 from nodes.pii_redaction_node import pii_redaction_node
 from node_wrapper import wrap_node
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mcp_system"))
+from clients.base_client import close_shared_connections
+from clients.run_memo import run_memo
+
 
 def route_decision(state: AgentState) -> Union[str, List[str], Literal["end"]]:
     """Route decision function based on state.route.
@@ -339,7 +346,13 @@ async def run(user_message: str, config: dict = None, user_email: str = None, se
     if config is None:
         config = {"recursion_limit": 100}  # Increased to accommodate join_node retries and multi-step execution
     
-    final_state = await app.ainvoke(initial_state, config)
+    try:
+        # Feedback retries reuse this run's tool results instead of repeating identical calls
+        with run_memo(f"{session_id or 'no-session'}:{uuid.uuid4().hex[:8]}"):
+            final_state = await app.ainvoke(initial_state, config)
+    finally:
+        # The frontend runs each request on its own event loop; close this loop's connections with it
+        await close_shared_connections()
     return final_state
 
 
@@ -675,6 +675,23 @@ DO NOT call get_hotel_rates - the user has already seen the hotels!
                         MAX_DETAILS_TO_FETCH = 10
                         enriched_hotels = []
                         
+                        # Fetch details for all top hotels in one batched round trip
+                        detail_ids = [h.get("hotelId") for h in hotels[:MAX_DETAILS_TO_FETCH] if h.get("hotelId")]
+                        details_by_id = {}
+                        try:
+                            batch_results = await HotelAgentClient.invoke_many([
+                                {"tool": "get_hotel_details", "parameters": {"hotel_id": hotel_id}}
+                                for hotel_id in detail_ids
+                            ])
+                            for hotel_id, entry in zip(detail_ids, batch_results):
+                                if "result" in entry:
+                                    details_by_id[hotel_id] = entry["result"]
+                                else:
+                                    print(f"Warning: Failed to fetch details for hotel {hotel_id}: {entry.get('error')}")
+                        except Exception as batch_error:
+                            # If the batch fails, continue with rate info only
+                            print(f"Warning: Failed to fetch hotel details batch: {batch_error}")
+                        
                         for hotel in hotels[:MAX_DETAILS_TO_FETCH]:
                             hotel_id = hotel.get("hotelId")
                             if not hotel_id:
@@ -683,11 +700,7 @@ DO NOT call get_hotel_rates - the user has already seen the hotels!
                                 continue
                             
                             try:
-                                # Fetch hotel details
-                                details_result = await HotelAgentClient.invoke(
-                                    "get_hotel_details",
-                                    hotel_id=hotel_id
-                                )
+                                details_result = details_by_id.get(hotel_id) or {}
                                 
                                 if not details_result.get("error") and details_result.get("hotel"):
                                     hotel_details = details_result.get("hotel")
@@ -300,29 +300,37 @@ Focus on the location/attraction/restaurant search described above."""
                         photo_count = int(count_match.group(1))
                     
                     print(f"📸 Fetching {photo_count} photos for {len(locations)} locations...")
-                    for location in locations[:10]:  # Limit to first 10 to avoid rate limits
-                        location_id = location.get("location_id")
-                        if location_id:
-                            try:
-                                photos_result = await TripAdvisorAgentClient.invoke("get_location_photos", location_id=int(location_id), limit=photo_count)
-                                if not photos_result.get("error") and photos_result.get("data"):
-                                    # Add all photos to location as a list
-                                    photos = []
-                                    for photo_data in photos_result["data"]:
-                                        photo_url = photo_data.get("images", {}).get("large", {}).get("url")
-                                        if not photo_url:
-                                            photo_url = photo_data.get("images", {}).get("medium", {}).get("url")
-                                        if not photo_url:
-                                            photo_url = photo_data.get("images", {}).get("small", {}).get("url")
-                                        if photo_url:
-                                            photos.append(photo_url)
-                                    
-                                    if photos:
-                                        location["photos"] = photos
-                                        location["photo"] = photos[0]  # Keep first photo for backward compatibility
-                                        print(f"  ✓ Got {len(photos)} photo(s) for {location.get('name')}")
-                            except Exception as e:
-                                print(f"  ⚠️ Failed to get photos for {location.get('name')}: {e}")
+                    photo_locations = [loc for loc in locations[:10] if loc.get("location_id")]  # Limit to first 10 to avoid rate limits
+                    try:
+                        # Fetch photos for all locations in one batched round trip
+                        photo_results = await TripAdvisorAgentClient.invoke_many([
+                            {"tool": "get_location_photos", "parameters": {"location_id": int(loc["location_id"]), "limit": photo_count}}
+                            for loc in photo_locations
+                        ])
+                    except Exception as e:
+                        print(f"  ⚠️ Failed to get photos: {e}")
+                        photo_results = []
+                    for location, entry in zip(photo_locations, photo_results):
+                        photos_result = entry.get("result")
+                        if photos_result is None:
+                            print(f"  ⚠️ Failed to get photos for {location.get('name')}: {entry.get('error')}")
+                            continue
+                        if not photos_result.get("error") and photos_result.get("data"):
+                            # Add all photos to location as a list
+                            photos = []
+                            for photo_data in photos_result["data"]:
+                                photo_url = photo_data.get("images", {}).get("large", {}).get("url")
+                                if not photo_url:
+                                    photo_url = photo_data.get("images", {}).get("medium", {}).get("url")
+                                if not photo_url:
+                                    photo_url = photo_data.get("images", {}).get("small", {}).get("url")
+                                if photo_url:
+                                    photos.append(photo_url)
+                            
+                            if photos:
+                                location["photos"] = photos
+                                location["photo"] = photos[0]  # Keep first photo for backward compatibility
+                                print(f"  ✓ Got {len(photos)} photo(s) for {location.get('name')}")
             
             # ===== INTELLIGENT SUMMARIZATION =====
             # Summarize TripAdvisor results before passing to conversational agent
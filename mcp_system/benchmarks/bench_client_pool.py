@@ -0,0 +1,134 @@
+"""Compare per-agent HTTP clients with the shared client pool under parallel fan-out.
+
+Starts server/main_server.py once and runs the same parallel steps twice:
+- per-agent: one httpx.AsyncClient per agent with the former client limits
+  (5 keep-alive, 10 connections each);
+- shared: every agent uses the process-wide pool (clients/http_pool.py).
+
+Each step fans out --fanout concurrent calls from each of --agents agents
+and waits for all of them, like a LangGraph step running agents in
+parallel; steps are separated by --gap seconds of idle time. Reports the
+step latency (time until the slowest call of the step returned, p50/p99)
+and the per-call p99. Use --gap above 5 to include idle connections being
+closed by the server between steps.
+
+The "delegate" tool is stubbed (MCP_REPLAY_STUBS, see server/journal.py) to
+take --upstream-ms per call, like the upstream-bound agent tools, so the
+server is not CPU-bound and the client side dominates.
+
+Usage:
+    python benchmarks/bench_client_pool.py [--agents 7] [--fanout 16] [--steps 30] [--gap 0.2]
+                                           [--upstream-ms 100]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_workers import start_server, stop_server, wait_ready
+from clients.http_pool import shared_pool
+
+
+class _SharedPoolClient:
+    """Sends each request through the next shard of the shared pool, like BaseAgentClient."""
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await shared_pool.client().post(url, **kwargs)
+
+
+def _p99(values):
+    values = sorted(values)
+    return values[max(int(len(values) * 0.99) - 1, 0)] if values else 0.0
+
+
+async def run_steps(url: str, clients, fanout: int, steps: int, gap: float) -> dict:
+    """Run parallel steps; clients holds the httpx client of each agent."""
+    step_latencies, call_latencies = [], []
+    errors = 0
+
+    async def call(client, agent: int, index: int):
+        nonlocal errors
+        payload = {"tool": "delegate", "parameters": {"agent": f"agent_{agent}", "task": f"step {index}", "args": {}}}
+        start = time.perf_counter()
+        try:
+            response = await client.post(f"{url}/tools/invoke", json=payload)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            errors += 1
+            return
+        call_latencies.append((time.perf_counter() - start) * 1000)
+
+    # Warm-up step: both modes start with open connections
+    await asyncio.gather(*(call(client, agent, 0) for agent, client in enumerate(clients) for _ in range(fanout)))
+    call_latencies.clear()
+    errors = 0
+
+    for _ in range(steps):
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            call(client, agent, index) for agent, client in enumerate(clients) for index in range(fanout)
+        ))
+        step_latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(gap)
+
+    return {
+        "step_p50": statistics.median(step_latencies),
+        "step_p99": _p99(step_latencies),
+        "call_p99": _p99(call_latencies),
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=7, help="Agent clients running in parallel")
+    parser.add_argument("--fanout", type=int, default=16, help="Concurrent calls per agent per step")
+    parser.add_argument("--steps", type=int, default=30, help="Parallel steps per mode")
+    parser.add_argument("--gap", type=float, default=0.2, help="Idle seconds between steps")
+    parser.add_argument("--upstream-ms", type=float, default=100.0, help="Simulated duration of each call")
+    parser.add_argument("--port", type=int, default=18590, help="Port to start the server on")
+    args = parser.parse_args()
+
+    # One-entry journal: every delegate call sleeps upstream_ms on the server
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as journal:
+        journal.write(json.dumps({"t": 0, "tool": "delegate", "p": {}, "ms": args.upstream_ms, "b": 100, "s": 200}) + "\n")
+    os.environ["MCP_REPLAY_STUBS"] = journal.name
+
+    url = f"http://127.0.0.1:{args.port}"
+    process = start_server(1, args.port)
+    try:
+        await wait_ready(url)
+        print(f"{args.agents} agents x {args.fanout} calls per step, {args.steps} steps, {args.gap}s apart, "
+              f"{args.upstream_ms:.0f} ms per call\n")
+        print(f"{'mode':>10} {'step p50 ms':>12} {'step p99 ms':>12} {'call p99 ms':>12} {'errors':>7}")
+
+        per_agent = [
+            httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=10.0),
+                              limits=httpx.Limits(max_keepalive_connections=5, max_connections=10))
+            for _ in range(args.agents)
+        ]
+        shared = [_SharedPoolClient()] * args.agents
+        for mode, clients in (("per-agent", per_agent), ("shared", shared)):
+            result = await run_steps(url, clients, args.fanout, args.steps, args.gap)
+            print(f"{mode:>10} {result['step_p50']:>12.1f} {result['step_p99']:>12.1f} "
+                  f"{result['call_p99']:>12.1f} {result['errors']:>7}")
+        for client in per_agent:
+            await client.aclose()
+        await shared_pool.aclose()
+    finally:
+        stop_server(process)
+        os.unlink(journal.name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,216 @@
+"""Benchmark response encodings for large tool results.
+
+For payloads shaped like hotel rate, flight search and eSIM bundle results,
+reports bytes on the wire plus server-side serialize+compress and
+client-side decompress+parse CPU time for:
+
+- json (stdlib): what FastAPI and response.json() did before
+- json (orjson)
+- msgpack
+each uncompressed, gzip'd and zstd'd (when zstandard is installed).
+
+Usage:
+    python benchmarks/bench_encoding.py [--repeat 50] [--hotels 40] [--flights 60] [--bundles 150]
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import encoding
+from server.encoding import GZIP_LEVEL, JSON, MSGPACK, compress, dumps, msgpack, orjson, zstandard
+
+
+# Seeded so runs are comparable; random ids and prices keep compression honest
+_rng = random.Random(42)
+
+
+def _token(nbytes: int) -> str:
+    return base64.urlsafe_b64encode(_rng.randbytes(nbytes)).decode("ascii")
+
+
+def _price(low: float, high: float) -> float:
+    return round(_rng.uniform(low, high), 2)
+
+
+def make_hotel_rates(hotels: int):
+    """A get_hotel_rates-style result: hotels with roomTypes and rates."""
+    return {
+        "error": False,
+        "hotels": [
+            {
+                "hotelId": f"lp{h:06d}",
+                "name": f"Hotel {h}",
+                "roomTypes": [
+                    {
+                        "roomTypeId": f"rt{h}-{r}",
+                        "offerId": _token(60),
+                        "supplier": "nuitee",
+                        "offerRetailRate": {"amount": _price(90, 900), "currency": "USD"},
+                        "rates": [
+                            {
+                                "rateId": _token(24),
+                                "name": "Deluxe Double Room, 1 King Bed",
+                                "maxOccupancy": 2,
+                                "boardType": "RO",
+                                "boardName": "Room Only",
+                                "retailRate": {
+                                    "total": [{"amount": _price(90, 900), "currency": "USD"}],
+                                    "suggestedSellingPrice": [{"amount": _price(90, 900), "currency": "USD"}],
+                                    "taxesAndFees": [{"included": True, "description": "City tax", "amount": _price(2, 40)}],
+                                },
+                                "cancellationPolicies": {
+                                    "cancelPolicyInfos": [{"cancelTime": "2026-10-30 12:00:00", "amount": _price(0, 300), "type": "amount"}],
+                                    "refundableTag": "RFN",
+                                },
+                            }
+                            for k in range(3)
+                        ],
+                    }
+                    for r in range(4)
+                ],
+            }
+            for h in range(hotels)
+        ],
+    }
+
+
+def make_flights(flights: int):
+    """An agent_get_flights_tool-style result with booking tokens."""
+    return {
+        "error": False,
+        "outbound": [
+            {
+                "flights": [
+                    {
+                        "departure_airport": {"name": "Beirut-Rafic Hariri International Airport", "id": "BEY", "time": "2026-11-01 08:15"},
+                        "arrival_airport": {"name": "Paris Charles de Gaulle Airport", "id": "CDG", "time": "2026-11-01 12:40"},
+                        "duration": 265,
+                        "airplane": "Airbus A320",
+                        "airline": "Middle East Airlines",
+                        "airline_logo": "https://www.gstatic.com/flights/airline_logos/70px/ME.png",
+                        "travel_class": "Economy",
+                        "flight_number": f"ME {200 + i}",
+                        "legroom": "30 in",
+                        "extensions": ["Average legroom (30 in)", "In-seat USB outlet", "Carbon emissions estimate: 210 kg"],
+                    }
+                ],
+                "total_duration": 265,
+                "carbon_emissions": {"this_flight": 210000, "typical_for_this_route": 198000, "difference_percent": 6},
+                "price": _rng.randint(180, 1400),
+                "type": "One way",
+                "booking_token": _token(240),
+            }
+            for i in range(flights)
+        ],
+    }
+
+
+def make_esim_bundles(bundles: int):
+    """A get_esim_bundles-style result."""
+    return {
+        "error": False,
+        "country": "france",
+        "bundles": [
+            {
+                "provider": f"Provider {i % 12}",
+                "plan": f"{(i % 10) + 1}GB - {(i % 4 + 1) * 7} days",
+                "data": f"{(i % 10) + 1} GB",
+                "validity": f"{(i % 4 + 1) * 7} days",
+                "price": f"${(price := _price(3, 80)):.2f}",
+                "price_value": price,
+                "link": f"https://esimdb.com/france/provider-{i % 12}/plan-{i}",
+                "features": ["5G", "Hotspot", "Top-up available"],
+            }
+            for i in range(bundles)
+        ],
+    }
+
+
+def _time(func, repeat: int) -> float:
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def _decompress(body: bytes, coding: str) -> bytes:
+    if coding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(body)
+    if coding == "gzip":
+        return gzip.decompress(body)
+    return body
+
+
+def bench_payload(name: str, payload, repeat: int):
+    formats = [("json (stdlib)", None)]
+    if orjson is not None:
+        formats.append(("json (orjson)", JSON))
+    if msgpack is not None:
+        formats.append(("msgpack", MSGPACK))
+    codings = ["identity", "gzip"] + (["zstd"] if zstandard is not None else [])
+
+    raw_size = None
+    print(f"\n{name}")
+    print(f"{'format':<15} {'coding':<9} {'bytes':>9} {'ratio':>6} {'encode us':>10} {'decode us':>10}")
+    for label, media_type in formats:
+        if media_type is None:
+            def serialize():
+                return json.dumps(payload).encode("utf-8")
+
+            def parse(body):
+                return json.loads(body)
+        elif media_type == JSON:
+            def serialize():
+                return dumps(payload, JSON)
+
+            def parse(body):
+                return orjson.loads(body)
+        else:
+            def serialize():
+                return dumps(payload, MSGPACK)
+
+            def parse(body):
+                return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+        for coding in codings:
+            body = serialize()
+            if coding != "identity":
+                body = compress(body, coding)
+            raw_size = raw_size or len(body)
+
+            def encode():
+                data = serialize()
+                return compress(data, coding) if coding != "identity" else data
+
+            encode_us = _time(encode, repeat)
+            decode_us = _time(lambda: parse(_decompress(body, coding)), repeat)
+            print(f"{label:<15} {coding:<9} {len(body):>9} {len(body) / raw_size:>6.2f} {encode_us:>10.0f} {decode_us:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="Iterations per measurement")
+    parser.add_argument("--hotels", type=int, default=40, help="Hotels in the rates payload")
+    parser.add_argument("--flights", type=int, default=60, help="Flights in the flight payload")
+    parser.add_argument("--bundles", type=int, default=150, help="Bundles in the eSIM payload")
+    args = parser.parse_args()
+
+    print(f"gzip level {GZIP_LEVEL}, zstd level {encoding.ZSTD_LEVEL}, "
+          f"compression threshold {encoding.COMPRESS_MIN_BYTES} bytes")
+    bench_payload(f"hotel rates ({args.hotels} hotels)", make_hotel_rates(args.hotels), args.repeat)
+    bench_payload(f"flights ({args.flights} options)", make_flights(args.flights), args.repeat)
+    bench_payload(f"eSIM bundles ({args.bundles} bundles)", make_esim_bundles(args.bundles), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
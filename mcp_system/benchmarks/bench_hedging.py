@@ -0,0 +1,107 @@
+"""Measure the latency effect of hedged requests against a flaky upstream.
+
+Starts server/main_server.py with the "delegate" tool stubbed
+(MCP_REPLAY_STUBS, see server/journal.py) to replay a latency mix: most
+calls take --fast-ms, one in --slow-every takes --slow-ms, like an upstream
+with occasional stalls. The same calls are then made with hedging off and
+on (clients/hedging.py) and the latency percentiles and the extra requests
+sent by hedging are reported.
+
+Usage:
+    python benchmarks/bench_hedging.py [--calls 2000] [--concurrency 8] [--fast-ms 30]
+                                       [--slow-ms 800] [--slow-every 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_workers import start_server, stop_server, wait_ready
+from clients import base_client
+from clients.base_client import BaseAgentClient
+from clients.hedging import HedgePolicy
+
+
+def _percentile(values, percentile: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * percentile / 100), len(values) - 1)] if values else 0.0
+
+
+async def run_calls(client: BaseAgentClient, calls: int, concurrency: int) -> dict:
+    """Make `calls` delegate calls from `concurrency` closed-loop callers."""
+    latencies = []
+    errors = 0
+    remaining = iter(range(calls))
+
+    async def caller():
+        nonlocal errors
+        for index in remaining:
+            start = time.perf_counter()
+            try:
+                await client.invoke("delegate", agent="bench", task=f"call {index}", args={})
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return {
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "max": max(latencies, default=0.0),
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000, help="Calls per mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers")
+    parser.add_argument("--fast-ms", type=float, default=30.0, help="Usual upstream latency")
+    parser.add_argument("--slow-ms", type=float, default=800.0, help="Latency of a stalled upstream call")
+    parser.add_argument("--slow-every", type=int, default=20, help="One call in this many stalls")
+    parser.add_argument("--port", type=int, default=18690, help="Port to start the server on")
+    args = parser.parse_args()
+
+    # Latency mix replayed by the stub, in a fixed shuffled order
+    rng = random.Random(7)
+    samples = [args.slow_ms if i % args.slow_every == 0 else args.fast_ms for i in range(1000)]
+    rng.shuffle(samples)
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as journal:
+        for ms in samples:
+            journal.write(json.dumps({"t": 0, "tool": "delegate", "p": {}, "ms": ms, "b": 100, "s": 200}) + "\n")
+    os.environ["MCP_REPLAY_STUBS"] = journal.name
+
+    url = f"http://127.0.0.1:{args.port}"
+    process = start_server(1, args.port)
+    try:
+        await wait_ready(url)
+        print(f"{args.calls} calls, {args.concurrency} callers, {args.fast_ms:.0f} ms per call, "
+              f"1 in {args.slow_every} takes {args.slow_ms:.0f} ms\n")
+        print(f"{'hedging':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'extra req':>10} {'errors':>7}")
+        for hedge in (False, True):
+            # A fresh policy per mode, so latencies of the other mode do not count
+            policy = base_client.hedge_policy = HedgePolicy()
+            client = BaseAgentClient("bench-hedging", ["delegate"], server_url=url, transport="http", hedge=hedge)
+            result = await run_calls(client, args.calls, args.concurrency)
+            extra = policy.stats()["hedged"] / args.calls
+            print(f"{'on' if hedge else 'off':>8} {result['p50']:>8.1f} {result['p95']:>8.1f} {result['p99']:>8.1f} "
+                  f"{result['max']:>8.1f} {extra:>9.1%} {result['errors']:>7}")
+            await client.close()
+    finally:
+        stop_server(process)
+        os.unlink(journal.name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
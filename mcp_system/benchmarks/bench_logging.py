@@ -0,0 +1,134 @@
+"""Benchmark the per-request cost of MCP server request logging.
+
+Compares the old print-based logging in FastMCP.invoke (pretty-printed
+parameters and results on every call) with the structured logger in
+server.request_log at several levels, using a hotel-search-sized payload.
+
+Usage:
+    python benchmarks/bench_logging.py [--calls 2000] [--hotels 50]
+
+Two numbers are reported per scenario:
+- request path: time spent inside the request handler (what adds latency)
+- incl. drain: wall time until every record has been written by the
+  background listener thread
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import logging
+from datetime import datetime
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import request_log
+from server.request_log import LazyPayload, log_event, payloads_enabled, stop_logging
+
+
+def make_payloads(hotels: int):
+    """Build parameters and a result shaped like a get_list_of_hotels response."""
+    parameters = {"city_name": "Paris", "country_code": "FR", "checkin": "2026-11-01", "checkout": "2026-11-05"}
+    result = {
+        "error": False,
+        "hotels": [
+            {
+                "id": f"lp{i:06d}",
+                "name": f"Hotel {i}",
+                "address": f"{i} Rue de Rivoli, 75001 Paris",
+                "rating": 4.2,
+                "stars": 4,
+                "main_photo": f"https://static.example.com/hotels/{i}/main.jpg",
+                "facilities": ["WiFi", "Breakfast", "Gym", "Spa", "Parking"] * 3,
+                "description": "A comfortable hotel in the heart of the city. " * 10,
+                "rates": [{"room": "Double", "price": 180 + i, "currency": "EUR"} for _ in range(3)],
+            }
+            for i in range(hotels)
+        ]
+    }
+    return parameters, result
+
+
+def legacy_log(tool_name, parameters, result):
+    """The logging FastMCP.invoke did before server.request_log existed."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"\n{'='*80}")
+    print(f"[{timestamp}] MCP Server: Calling tool '{tool_name}'")
+    print(f"{'='*80}")
+    print(f"Input parameters:")
+    params_str = json.dumps(parameters, indent=2, ensure_ascii=False, default=str)
+    if len(params_str) > 2000:
+        params_str = params_str[:2000] + "\n... (truncated)"
+    print(params_str)
+    print(f"{'-'*80}")
+    print(f"Executing tool function...")
+    print(f"Tool execution completed successfully!")
+    print(f"Output:")
+    result_str = json.dumps(result, indent=2, ensure_ascii=False, default=str)
+    if len(result_str) > 5000:
+        result_str = result_str[:5000] + "\n... (truncated - output too long)"
+    print(result_str)
+    print(f"{'='*80}\n")
+
+
+def structured_log(tool_name, parameters, result):
+    """The logging FastMCP.invoke does now."""
+    log_payloads = payloads_enabled()
+    if log_payloads:
+        log_event(logging.DEBUG, "tool.params", tool=tool_name, params=LazyPayload(parameters, 2000))
+    start = time.perf_counter()
+    log_event(logging.INFO, "tool.call", tool=tool_name, status="ok",
+              duration_ms=round((time.perf_counter() - start) * 1000, 2))
+    if log_payloads:
+        log_event(logging.DEBUG, "tool.result", tool=tool_name, result=LazyPayload(result))
+
+
+def run_scenario(name, log_func, calls, parameters, result, env=None):
+    """Time log_func over many calls with stdout sent to an in-memory sink."""
+    for key, value in (env or {}).items():
+        os.environ[key] = value
+    real_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        request_log.get_logger()
+        start = time.perf_counter()
+        for _ in range(calls):
+            log_func("get_list_of_hotels", parameters, result)
+        request_path = time.perf_counter() - start
+        stop_logging()
+        drained = time.perf_counter() - start
+        written = sys.stdout.tell()
+    finally:
+        sys.stdout = real_stdout
+        for key in (env or {}):
+            os.environ.pop(key, None)
+
+    print(f"{name:<32} request path {request_path / calls * 1e6:9.1f} us/call"
+          f"   incl. drain {drained / calls * 1e6:9.1f} us/call   {written / calls / 1024:6.1f} KB/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000, help="Number of simulated tool calls")
+    parser.add_argument("--hotels", type=int, default=50, help="Hotels in the simulated result")
+    args = parser.parse_args()
+
+    parameters, result = make_payloads(args.hotels)
+    print(f"Result payload: {len(json.dumps(result)) / 1024:.1f} KB, {args.calls} calls\n")
+
+    run_scenario("legacy print (before)", legacy_log, args.calls, parameters, result)
+    run_scenario("structured INFO (default)", structured_log, args.calls, parameters, result,
+                 {"MCP_LOG_LEVEL": "INFO"})
+    run_scenario("structured DEBUG, 10% sampled", structured_log, args.calls, parameters, result,
+                 {"MCP_LOG_LEVEL": "DEBUG", "MCP_LOG_SAMPLE_RATE": "0.1"})
+    run_scenario("structured DEBUG, all payloads", structured_log, args.calls, parameters, result,
+                 {"MCP_LOG_LEVEL": "DEBUG", "MCP_LOG_SAMPLE_RATE": "1.0"})
+    run_scenario("structured WARNING", structured_log, args.calls, parameters, result,
+                 {"MCP_LOG_LEVEL": "WARNING"})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark MCP server behavior past its nominal load.
+
+Starts server/main_server.py once, then drives /tools/invoke with closed-loop
+clients at 1x, 3x and 5x the nominal concurrency (MCP_MAX_IN_FLIGHT by
+default) and reports, per load level:
+- ok/s: completed calls per second (goodput)
+- p50/p99 ms: latency of completed calls
+- shed: calls answered 503 by admission control (returned immediately;
+  the load generator does not retry them)
+- probe ms: p99 latency of GET /tools/list sent alongside the load, i.e.
+  how responsive the process stays
+
+Run it twice, with MCP_ADMISSION=1 (default) and MCP_ADMISSION=0, to compare
+shedding against unbounded queueing. Admission control bounds calls that
+wait (upstream I/O, worker threads); use a tool that calls an upstream to
+see it. The default "delegate" tool is pure event-loop CPU, which only more
+worker processes help with (see bench_workers.py).
+
+Usage:
+    python benchmarks/bench_overload.py [--levels 1,3,5] [--nominal 64] [--duration 10]
+                                        [--tool delegate] [--params '{...}']
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import httpx
+
+from bench_workers import start_server, stop_server, wait_ready
+
+
+def _p99(values):
+    values = sorted(values)
+    return values[max(int(len(values) * 0.99) - 1, 0)] if values else 0.0
+
+
+async def run_level(url: str, concurrency: int, duration: float, payload: dict) -> dict:
+    """Run `concurrency` closed-loop callers plus a /tools/list probe."""
+    latencies, probes = [], []
+    shed = errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+        async def caller():
+            nonlocal shed, errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(f"{url}/tools/invoke", json=payload)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if response.status_code == 503:
+                    shed += 1
+                    # Honor a little of the hint so shed callers don't spin
+                    await asyncio.sleep(0.05)
+                elif response.status_code == 200:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    errors += 1
+
+        async def probe():
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    await client.get(f"{url}/tools/list")
+                    probes.append((time.perf_counter() - start) * 1000)
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.1)
+
+        started = time.monotonic()
+        await asyncio.gather(probe(), *(caller() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    return {
+        "ok_per_s": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p99": _p99(latencies),
+        "shed": shed,
+        "errors": errors,
+        "probe_p99": _p99(probes),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default="1,3,5", help="Comma-separated multiples of the nominal concurrency")
+    parser.add_argument("--nominal", type=int, default=int(os.getenv("MCP_MAX_IN_FLIGHT", "64")),
+                        help="Nominal concurrency (defaults to MCP_MAX_IN_FLIGHT)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per level")
+    parser.add_argument("--tool", default="delegate", help="Tool to call")
+    parser.add_argument("--params", default='{"agent": "hotel_agent", "task": "overload", "args": {}}',
+                        help="JSON parameters for the tool")
+    parser.add_argument("--port", type=int, default=18290, help="Port to start the server on")
+    args = parser.parse_args()
+    payload = {"tool": args.tool, "parameters": json.loads(args.params)}
+
+    url = f"http://127.0.0.1:{args.port}"
+    process = start_server(1, args.port)
+    try:
+        await wait_ready(url)
+        print(f"admission {os.getenv('MCP_ADMISSION', '1')}, nominal concurrency {args.nominal}, "
+              f"{args.duration:.0f}s per level\n")
+        print(f"{'load':>5} {'callers':>8} {'ok/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'shed':>7} {'errors':>7} {'probe ms':>9}")
+        for level in [float(value) for value in args.levels.split(",")]:
+            concurrency = max(int(args.nominal * level), 1)
+            result = await run_level(url, concurrency, args.duration, payload)
+            print(f"{level:>4.0f}x {concurrency:>8} {result['ok_per_s']:>8.1f} {result['p50']:>8.1f} "
+                  f"{result['p99']:>8.1f} {result['shed']:>7} {result['errors']:>7} {result['probe_p99']:>9.1f}")
+    finally:
+        stop_server(process)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""Benchmark MCP server cold start.
+
+Starts server/main_server.py in a fresh process several times and reports,
+from process launch:
+- import: time to import main_server (separate process, no server)
+- /tools/list: time to the first successful catalog response
+- first call: time to the first successful tool call after that
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--tool delegate]
+                                       [--params '{"agent": "a", "task": "t", "args": {}}']
+
+Each run uses a new interpreter, so module imports are cold (the OS file
+cache stays warm; drop caches between runs to measure a cold disk).
+"""
+
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+MCP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(MCP_DIR, "server")
+
+
+def time_import() -> float:
+    """Seconds to import main_server in a fresh interpreter."""
+    code = "import time; t = time.perf_counter(); import main_server; print(time.perf_counter() - t)"
+    env = dict(os.environ, MCP_LOG_LEVEL="WARNING")
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=SERVER_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def time_start(port: int, tool: str, params: dict, timeout: float) -> tuple:
+    """Launch the server and return (seconds to /tools/list, seconds to first call)."""
+    env = dict(os.environ, MCP_PORT=str(port), MCP_WORKERS="1", MCP_LOG_LEVEL="WARNING")
+    url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main_server.py"], cwd=SERVER_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    try:
+        with httpx.Client(timeout=timeout) as client:
+            list_ready = None
+            while list_ready is None:
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError(f"Server did not answer /tools/list within {timeout:.0f}s")
+                if process.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {process.returncode}")
+                try:
+                    if client.get(f"{url}/tools/list").status_code == 200:
+                        list_ready = time.perf_counter() - started
+                except httpx.HTTPError:
+                    time.sleep(0.02)
+
+            response = client.post(f"{url}/tools/invoke", json={"tool": tool, "parameters": params})
+            response.raise_for_status()
+            first_call = time.perf_counter() - started
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+    return list_ready, first_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to measure")
+    parser.add_argument("--tool", default="delegate", help="Tool for the first call")
+    parser.add_argument("--params", default='{"agent": "hotel_agent", "task": "startup", "args": {}}',
+                        help="JSON parameters for the first call")
+    parser.add_argument("--port", type=int, default=18190, help="Port to start the server on")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for startup")
+    args = parser.parse_args()
+    params = json.loads(args.params)
+
+    imports, lists, calls = [], [], []
+    print(f"{'run':>4} {'import s':>9} {'/tools/list s':>14} {'first call s':>13}")
+    for run in range(1, args.runs + 1):
+        imports.append(time_import())
+        list_ready, first_call = time_start(args.port, args.tool, params, args.timeout)
+        lists.append(list_ready)
+        calls.append(first_call)
+        print(f"{run:>4} {imports[-1]:>9.2f} {list_ready:>14.2f} {first_call:>13.2f}")
+
+    print(f"{'p50':>4} {statistics.median(imports):>9.2f} {statistics.median(lists):>14.2f} "
+          f"{statistics.median(calls):>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
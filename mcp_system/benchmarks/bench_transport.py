@@ -0,0 +1,108 @@
+"""Compare agent-client latency over HTTP, the WebSocket channel and in-process calls.
+
+Starts server/main_server.py once and, for each concurrency level, drives
+the same tool calls through a BaseAgentClient with transport="http"
+(httpx, shared connection pool, see clients/http_pool.py), transport="ws"
+(every call on one shared WebSocket connection, see clients/ws_channel.py)
+and transport="inprocess" (the tools are loaded into the benchmark process
+and called directly, see clients/inprocess.py). Reports calls per second
+and p50/p99 latency; the in-process numbers are the baseline the other
+transports add their overhead to.
+
+The default "delegate" call is served entirely in-process, so the numbers
+isolate per-call transport overhead (connection reuse, request framing,
+headers); upstream-bound tools are dominated by the upstream latency.
+
+Usage:
+    python benchmarks/bench_transport.py [--levels 1,10,50] [--duration 5]
+                                         [--tool delegate] [--params '{...}']
+                                         [--transports http,ws,inprocess]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_workers import start_server, stop_server, wait_ready
+from clients.base_client import BaseAgentClient, close_shared_connections
+
+
+def _p99(values):
+    values = sorted(values)
+    return values[max(int(len(values) * 0.99) - 1, 0)] if values else 0.0
+
+
+async def run_level(client: BaseAgentClient, concurrency: int, duration: float, tool: str, params: dict) -> dict:
+    """Run `concurrency` closed-loop callers sharing one client."""
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def caller():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                await client.invoke(tool, **params)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.monotonic()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+    return {
+        "calls_per_s": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p99": _p99(latencies),
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default="1,10,50", help="Comma-separated numbers of concurrent callers")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per transport and level")
+    parser.add_argument("--tool", default="delegate", help="Tool to call")
+    parser.add_argument("--params", default='{"agent": "hotel_agent", "task": "transport", "args": {}}',
+                        help="JSON parameters for the tool")
+    parser.add_argument("--transports", default="http,ws,inprocess", help="Comma-separated transports to compare")
+    parser.add_argument("--port", type=int, default=18490, help="Port to start the server on")
+    args = parser.parse_args()
+    params = json.loads(args.params)
+
+    url = f"http://127.0.0.1:{args.port}"
+    process = start_server(1, args.port)
+    try:
+        await wait_ready(url)
+        clients = {
+            transport: BaseAgentClient(f"bench-{transport}", [args.tool], server_url=url, transport=transport)
+            for transport in args.transports.split(",")
+        }
+        for client in clients.values():
+            # Warm up connections before measuring
+            await client.invoke(args.tool, **params)
+
+        print(f"{'callers':>8} {'transport':>10} {'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for concurrency in [int(value) for value in args.levels.split(",")]:
+            for transport, client in clients.items():
+                result = await run_level(client, concurrency, args.duration, args.tool, params)
+                print(f"{concurrency:>8} {transport:>10} {result['calls_per_s']:>9.1f} {result['p50']:>8.2f} "
+                      f"{result['p99']:>8.2f} {result['errors']:>7}")
+        for client in clients.values():
+            await client.close()
+        await close_shared_connections()
+    finally:
+        stop_server(process)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
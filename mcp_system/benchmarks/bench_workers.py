@@ -0,0 +1,144 @@
+"""Benchmark MCP server throughput with 1..N worker processes.
+
+Starts server/main_server.py once per worker count (MCP_WORKERS=n) on a
+spare port, drives it with concurrent /tools/invoke requests, and reports
+requests per second and latency percentiles.
+
+The default load calls the in-process "delegate" tool with a sizeable
+payload. That isolates the server's own CPU cost (request parsing,
+dispatch, response encoding), which is the part extra workers parallelize.
+Upstream-bound tools mostly wait on I/O and scale with the worker pool, not
+with processes.
+
+Usage:
+    python benchmarks/bench_workers.py [--workers 1,2,4] [--duration 10]
+                                       [--concurrency 64] [--items 200]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+MCP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    """Start the MCP server in its own process group."""
+    env = dict(os.environ, MCP_WORKERS=str(workers), MCP_PORT=str(port), MCP_LOG_LEVEL="WARNING")
+    return subprocess.Popen(
+        [sys.executable, "main_server.py"],
+        cwd=os.path.join(MCP_DIR, "server"),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+def stop_server(process: subprocess.Popen):
+    """Stop the server and all of its worker processes."""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+async def wait_ready(url: str, timeout: float = 120.0):
+    """Wait until the server answers on /."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not start within {timeout:.0f}s")
+
+
+async def run_load(url: str, duration: float, concurrency: int, items: int):
+    """Send requests from `concurrency` loops for `duration` seconds."""
+    payload = {
+        "tool": "delegate",
+        "parameters": {
+            "agent": "hotel_agent",
+            "task": "benchmark",
+            "args": {"items": [{"id": i, "name": f"Item {i}", "tags": ["a", "b", "c"], "price": i * 1.5} for i in range(items)]}
+        }
+    }
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(f"{url}/tools/invoke", json=payload)
+                    response.raise_for_status()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                except httpx.HTTPError:
+                    errors += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    return latencies, errors, elapsed
+
+
+async def bench(workers: int, args) -> dict:
+    port = args.port + workers
+    url = f"http://127.0.0.1:{port}"
+    process = start_server(workers, port)
+    try:
+        await wait_ready(url)
+        # Warm up connections and lazy initialization in every worker
+        await run_load(url, 2.0, args.concurrency, args.items)
+        latencies, errors, elapsed = await run_load(url, args.duration, args.concurrency, args.items)
+    finally:
+        stop_server(process)
+
+    latencies.sort()
+    return {
+        "workers": workers,
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0,
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per run")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent requests")
+    parser.add_argument("--items", type=int, default=200, help="Items in each request payload")
+    parser.add_argument("--port", type=int, default=18090, help="Base port (worker count is added)")
+    args = parser.parse_args()
+
+    print(f"CPU cores: {os.cpu_count()}, concurrency {args.concurrency}, {args.duration:.0f}s per run\n")
+    print(f"{'workers':>7} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} {'scaling':>8}")
+    baseline = None
+    for workers in [int(w) for w in args.workers.split(",")]:
+        result = await bench(workers, args)
+        baseline = baseline or result["rps"]
+        print(f"{result['workers']:>7} {result['rps']:>10.1f} {result['p50']:>9.1f} {result['p99']:>9.1f} "
+              f"{result['errors']:>7} {result['rps'] / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
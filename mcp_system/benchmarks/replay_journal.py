@@ -0,0 +1,149 @@
+"""Replay a tool-invocation journal against the MCP server.
+
+Record production (or staging) traffic with MCP_JOURNAL=/path/journal.jsonl
+(see server/journal.py), then re-issue it here. For each speed-up factor the
+script starts server/main_server.py with MCP_REPLAY_STUBS pointing at the
+journal, so every tool sleeps for its recorded duration and returns a
+payload of its recorded size instead of calling the upstream APIs, and
+sends the recorded calls open-loop at the recorded inter-arrival times
+divided by the factor. A fresh server per factor keeps the result cache as
+cold as it was when the traffic was recorded.
+
+Per speed-up factor it reports:
+- offered/s: calls per second sent (recorded rate times the factor)
+- ok/s: calls completed with 200 per second
+- p50/p95/p99 ms: latency of completed calls
+- shed: calls answered 503 by admission control
+- errors: other failures (4xx/5xx, connection errors)
+- lag ms: p99 delay between a call's scheduled and actual send time; a large
+  value means this load generator, not the server, was the bottleneck
+
+With --url the calls go to an already running server instead (start it
+with MCP_REPLAY_STUBS for stubbed upstreams).
+
+Usage:
+    python benchmarks/replay_journal.py journal.jsonl [--speedup 1,2,5,10] [--limit 5000]
+                                                      [--workers 1] [--url http://...]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_workers import start_server, stop_server, wait_ready
+from server.journal import read_journal
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[max(int(len(values) * fraction + 0.5) - 1, 0)] if values else 0.0
+
+
+def load_calls(path: str, limit: int):
+    """Read the journal as (offset seconds, tool, parameters), oldest first."""
+    entries = read_journal(path)
+    if limit:
+        entries = entries[:limit]
+    if not entries:
+        return []
+    first = entries[0]["t"]
+    return [(entry["t"] - first, entry["tool"], entry.get("p") or {}) for entry in entries]
+
+
+async def replay(url: str, calls, speedup: float, connections: int) -> dict:
+    """Send every call at its recorded offset divided by speedup."""
+    latencies, lags = [], []
+    shed = errors = 0
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+
+    async with httpx.AsyncClient(limits=limits, timeout=120.0) as client:
+        async def send(tool, parameters, scheduled):
+            nonlocal shed, errors
+            start = time.perf_counter()
+            lags.append((start - scheduled) * 1000)
+            try:
+                response = await client.post(f"{url}/tools/invoke", json={"tool": tool, "parameters": parameters})
+            except httpx.HTTPError:
+                errors += 1
+                return
+            if response.status_code == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            elif response.status_code == 503:
+                shed += 1
+            else:
+                errors += 1
+
+        tasks = []
+        started = time.perf_counter()
+        for offset, tool, parameters in calls:
+            scheduled = started + offset / speedup
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(send(tool, parameters, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    span = calls[-1][0] / speedup if len(calls) > 1 else 0.0
+    return {
+        "offered_per_s": len(calls) / span if span else float(len(calls)),
+        "ok_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": _percentile(latencies, 0.50),
+        "p95": _percentile(latencies, 0.95),
+        "p99": _percentile(latencies, 0.99),
+        "shed": shed,
+        "errors": errors,
+        "lag_p99": _percentile(lags, 0.99),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("journal", help="Journal file recorded with MCP_JOURNAL")
+    parser.add_argument("--speedup", default="1,2,5", help="Comma-separated speed-up factors")
+    parser.add_argument("--limit", type=int, default=0, help="Replay only the first N calls")
+    parser.add_argument("--connections", type=int, default=256, help="Maximum open connections")
+    parser.add_argument("--workers", type=int, default=1, help="MCP_WORKERS for the started server")
+    parser.add_argument("--port", type=int, default=18390, help="Port to start the server on")
+    parser.add_argument("--url", help="Replay against this running server instead of starting one")
+    args = parser.parse_args()
+
+    journal = os.path.abspath(args.journal)
+    calls = load_calls(journal, args.limit)
+    if not calls:
+        raise SystemExit(f"No calls in {journal}")
+    recorded_span = calls[-1][0]
+    tools = len({tool for _, tool, _ in calls})
+    print(f"{len(calls)} calls of {tools} tools over {recorded_span:.1f}s recorded\n")
+    print(f"{'speedup':>7} {'offered/s':>10} {'ok/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'shed':>6} {'errors':>7} {'lag ms':>7}")
+
+    # The started servers stub every tool from the journal and don't record the replay
+    os.environ["MCP_REPLAY_STUBS"] = journal
+    os.environ.pop("MCP_JOURNAL", None)
+    for speedup in [float(value) for value in args.speedup.split(",")]:
+        process = None
+        url = args.url
+        if url is None:
+            url = f"http://127.0.0.1:{args.port}"
+            process = start_server(args.workers, args.port)
+        try:
+            await wait_ready(url)
+            result = await replay(url, calls, speedup, args.connections)
+        finally:
+            if process is not None:
+                stop_server(process)
+        print(f"{speedup:>6g}x {result['offered_per_s']:>10.1f} {result['ok_per_s']:>8.1f} {result['p50']:>8.1f} "
+              f"{result['p95']:>8.1f} {result['p99']:>8.1f} {result['shed']:>6} {result['errors']:>7} "
+              f"{result['lag_p99']:>7.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
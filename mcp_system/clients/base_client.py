@@ -2,47 +2,191 @@
 
 import httpx
 import os
+import json
+import time
 import asyncio
-from typing import List, Dict, Any, Optional
+import contextvars
+import random
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, AsyncIterator, Iterator
+
+from clients.hedging import HEDGE, hedge_policy
+from clients.http_pool import shared_pool
+from clients.inprocess import get_inprocess_channel
+from clients.run_memo import current_run_memo
+from clients.ws_channel import TRANSPORT, ChannelClosed, ChannelUnavailable, close_channels, get_channel
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Seconds a cached tool catalog is trusted before it is revalidated with the server
+CATALOG_TTL = float(os.getenv("MCP_CATALOG_TTL", "300"))
+
+# Seconds a failed catalog load is remembered before calls try it again
+CATALOG_RETRY_AFTER = float(os.getenv("MCP_CATALOG_RETRY_AFTER", "10"))
+
+# Process-wide tool catalog cache, keyed by server URL:
+# {"etag": str, "tools": [...], "checked_at": float}
+_catalog_cache: Dict[str, Dict[str, Any]] = {}
+
+# Time (time.monotonic()) of the last failed catalog load, keyed by server URL
+_catalog_failed_at: Dict[str, float] = {}
+
+# Response format requested for tool results: "json" (default; parsed with
+# orjson when installed, which benchmarks/bench_encoding.py shows is faster
+# than msgpack in Python) or "msgpack" (smaller uncompressed bodies).
+# Compression (zstd/gzip) is negotiated by httpx through Accept-Encoding.
+WIRE_FORMAT = os.getenv("MCP_WIRE_FORMAT", "json")
+RESULT_ACCEPT = (
+    "application/msgpack, application/json;q=0.9"
+    if WIRE_FORMAT == "msgpack" and msgpack is not None
+    else "application/json"
+)
+
+
+# Seconds a tool call may take when no call_deadline() is set. Sent to the
+# server as the call's deadline so it stops working when we stop waiting.
+DEFAULT_CALL_TIMEOUT = float(os.getenv("MCP_CALL_TIMEOUT", "60"))
+
+# Remaining budget in milliseconds, honored by the server (server/deadline.py)
+DEADLINE_HEADER = "X-MCP-Deadline-Ms"
+
+# A call shed by the server's admission control (503) is retried after the
+# server's Retry-After, at most SHED_RETRIES times and only while the hint
+# is no longer than MAX_RETRY_AFTER seconds; longer waits fail right away.
+SHED_RETRIES = 2
+MAX_RETRY_AFTER = float(os.getenv("MCP_MAX_RETRY_AFTER", "10"))
+
+# Attempts per request after connection errors, spaced by exponential
+# back-off with full jitter (a random pause of up to RETRY_BASE_DELAY * 2^n,
+# capped at RETRY_MAX_DELAY) so clients that failed together do not retry
+# together.
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+# Absolute time.monotonic() deadline set by call_deadline()
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("mcp_call_deadline", default=None)
+
+
+@contextmanager
+def call_deadline(seconds: float) -> Iterator[None]:
+    """Bound every MCP call made inside the block, retries included.
+    
+    The server is told the remaining time with each request, so it shrinks
+    its upstream timeouts and gives up (504) when the time is spent. A
+    nested block can only shorten an enclosing deadline.
+    
+    Example:
+        with call_deadline(20):
+            hotels = await HotelAgentClient.invoke("get_list_of_hotels", ...)
+    """
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Seconds to wait before retry number attempt + 1 (exponential, full jitter)."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def jittered(retry_after: float) -> float:
+    """Spread retries after the same Retry-After hint over up to half again as long."""
+    return retry_after * random.uniform(1.0, 1.5)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Read a Retry-After value in seconds (HTTP dates are not used by the server)."""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def decode_response(response: httpx.Response) -> Any:
+    """Decode a msgpack or JSON response body."""
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith("application/msgpack"):
+        return msgpack.unpackb(response.content, raw=False, strict_map_key=False)
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+class ToolStreamError(Exception):
+    """Raised when a streamed tool invocation reports an error event."""
+    
+    def __init__(self, tool_name: str, status_code: int, detail: str):
+        super().__init__(f"Tool '{tool_name}' failed ({status_code}): {detail}")
+        self.tool_name = tool_name
+        self.status_code = status_code
+        self.detail = detail
 
 
 class BaseAgentClient:
     """Base client for communicating with MCP server."""
     
-    def __init__(self, name: str, allowed_tools: List[str], server_url: str = None):
+    def __init__(
+        self,
+        name: str,
+        allowed_tools: List[str],
+        server_url: str = None,
+        projections: Optional[Dict[str, Dict[str, Any]]] = None,
+        pages: Optional[Dict[str, int]] = None,
+        transport: Optional[str] = None,
+        hedge: Optional[bool] = None
+    ):
         """Initialize the agent client.
         
         Args:
             name: Agent name
             allowed_tools: List of tool names this agent can use
             server_url: MCP server URL (defaults to MCP_SERVER_URL env var or http://localhost:8090)
+            projections: Default projection spec per tool name, applied by the
+                        server before sending results (see invoke_projected)
+            pages: Default page size per tool name. Long result lists of these
+                  tools come back one page at a time (see next_page)
+            transport: "http", "ws" (one shared, multiplexed WebSocket
+                      connection; see clients/ws_channel.py) or "inprocess"
+                      (direct calls to the tools registered in this process;
+                      see clients/inprocess.py). Defaults to the
+                      MCP_TRANSPORT env var.
+            hedge: Send a second request for slow calls of idempotent tools
+                  (see clients/hedging.py). Defaults to the MCP_HEDGE env var.
         """
         self.name = name
         self.allowed_tools = allowed_tools
+        self.projections = projections or {}
+        self.pages = pages or {}
         self.server_url = server_url or os.getenv("MCP_SERVER_URL", "http://localhost:8090")
-        self._client: Optional[httpx.AsyncClient] = None
+        self.transport = transport or TRANSPORT
+        self.hedge = HEDGE if hedge is None else hedge
+        self._filtered_tools: Optional[List[Dict[str, Any]]] = None
+        self._filtered_etag: Optional[str] = None
     
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create httpx client.
+        """Get the process-wide pooled httpx client for the running event loop.
         
-        Creates a new client if one doesn't exist. If the existing
-        client fails, it will be recreated on the next call.
+        All agent clients share it (see clients/http_pool.py).
         """
-        if self._client is None:
-            # Use longer timeout and better connection settings
-            timeout = httpx.Timeout(60.0, connect=10.0)
-            limits = httpx.Limits(max_keepalive_connections=5, max_connections=10)
-            self._client = httpx.AsyncClient(timeout=timeout, limits=limits)
-        return self._client
+        return shared_pool.client()
     
     async def _reset_client(self):
-        """Reset the HTTP client (close and clear)."""
-        if self._client is not None:
-            try:
-                await self._client.aclose()
-            except:
-                pass
-            self._client = None
+        """Replace the shared HTTP client after it became unusable (closed client or loop)."""
+        await shared_pool.discard()
     
     def _is_connection_error(self, error: Exception) -> bool:
         """Check if error is a connection-related error that should trigger retry."""
@@ -58,6 +202,12 @@ class BaseAgentClient:
         )):
             return True
         
+        # A response arrived, so the connection is fine. A 504 message reads
+        # "Gateway Timeout", but the tool already ran; statuses are only
+        # retried by the explicit 503 Retry-After handling.
+        if isinstance(error, httpx.HTTPStatusError):
+            return False
+        
         # Check error message for connection-related issues
         error_str = str(error).lower()
         connection_keywords = [
@@ -73,54 +223,287 @@ class BaseAgentClient:
         
         return any(keyword in error_str for keyword in connection_keywords)
     
-    async def list_tools(self) -> List[Dict[str, Any]]:
-        """List available tools for this agent.
+    @staticmethod
+    def _request_not_sent(error: Exception) -> bool:
+        """Check if a request failed before reaching the server (safe to retry for any tool)."""
+        return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+    
+    @staticmethod
+    def _attempt_budget(deadline: Optional[float]) -> float:
+        """Seconds the next request may take.
         
+        Raises:
+            TimeoutError: If the call deadline has passed
+        """
+        if deadline is None:
+            return DEFAULT_CALL_TIMEOUT
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("MCP call deadline exceeded")
+        return remaining
+    
+    @staticmethod
+    def _deadline_kwargs(budget: float, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the deadline header and a matching timeout to httpx arguments."""
+        headers = dict(kwargs.get("headers") or {})
+        headers[DEADLINE_HEADER] = str(int(budget * 1000))
+        return dict(kwargs, headers=headers, timeout=httpx.Timeout(budget, connect=min(10.0, budget)))
+    
+    @staticmethod
+    async def _retry_pause(delay: float, deadline: Optional[float]) -> bool:
+        """Sleep before a retry; False if the deadline would pass first."""
+        if deadline is not None and deadline - time.monotonic() <= delay:
+            return False
+        await asyncio.sleep(delay)
+        return True
+    
+    def _check_permission(self, tool_name: str):
+        """Raise PermissionError if tool_name is not in allowed_tools."""
+        if tool_name not in self.allowed_tools:
+            raise PermissionError(
+                f"Agent '{self.name}' is not allowed to use tool '{tool_name}'. "
+                f"Allowed tools: {self.allowed_tools}"
+            )
+    
+    async def _request_with_retry(self, method: str, path: str, idempotent: bool = True, **kwargs) -> httpx.Response:
+        """Send a request to the MCP server, retrying on connection errors.
+        
+        Connection errors are retried with jittered exponential back-off
+        (see backoff_delay). If the request may have reached the server
+        (e.g., a read timeout), it is retried only when idempotent, so a
+        booking is never sent twice. A 503 from the server's admission
+        control (the call did not run) is retried after its jittered
+        Retry-After (see MAX_RETRY_AFTER). Every attempt carries the time left before the call deadline (see
+        call_deadline) in the X-MCP-Deadline-Ms header, and retries stop
+        when the deadline would pass during the back-off.
+        
+        Args:
+            method: HTTP method
+            path: Server path (e.g., "/tools/invoke")
+            idempotent: Whether repeating the request is harmless
+            **kwargs: Extra arguments for httpx (json, headers, ...)
+            
         Returns:
-            List of tool dictionaries with name, description, inputSchema, etc.
+            The successful httpx response
+            
+        Raises:
+            TimeoutError: If the call deadline passed before a response
         """
-        max_retries = 3
-        retry_delay = 0.5
+        deadline = _deadline.get()
+        attempt = 0
+        shed_retries = 0
         
-        for attempt in range(max_retries):
+        while True:
+            budget = self._attempt_budget(deadline)
             try:
                 client = await self._get_client()
-                response = await client.get(f"{self.server_url}/tools/list")
-                response.raise_for_status()
-                data = response.json()
-                all_tools = data.get("tools", [])
-                
-                # Filter tools based on allowed_tools
-                filtered_tools = [
-                    tool for tool in all_tools
-                    if tool["name"] in self.allowed_tools
-                ]
-                
-                return filtered_tools
+                response = await client.request(
+                    method, f"{self.server_url}{path}", **self._deadline_kwargs(budget, kwargs)
+                )
+                if response.status_code == 503 and shed_retries < SHED_RETRIES:
+                    retry_after = parse_retry_after(response.headers.get("retry-after"))
+                    if retry_after is not None and retry_after <= MAX_RETRY_AFTER and \
+                            await self._retry_pause(jittered(retry_after), deadline):
+                        shed_retries += 1
+                        continue
+                if response.status_code != 304:
+                    # 304 answers a conditional request; the caller reuses its cached copy
+                    response.raise_for_status()
+                return response
             except (RuntimeError, AttributeError) as e:
                 # If event loop is closed or client is invalid, reset and retry
                 if "closed" in str(e).lower() or "Event loop" in str(e):
                     await self._reset_client()
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(retry_delay * (attempt + 1))
+                    if attempt < MAX_ATTEMPTS - 1 and await self._retry_pause(backoff_delay(attempt), deadline):
+                        attempt += 1
                         continue
                     raise
                 raise
             except Exception as e:
-                # Handle connection errors with retry
+                # Handle connection errors with retry. The failed connection
+                # has left the pool; other callers keep their warm connections.
                 if self._is_connection_error(e):
-                    await self._reset_client()
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(retry_delay * (attempt + 1))
+                    shared_pool.connection_failed()
+                    if (idempotent or self._request_not_sent(e)) and attempt < MAX_ATTEMPTS - 1 and \
+                            await self._retry_pause(backoff_delay(attempt), deadline):
+                        attempt += 1
                         continue
                     # Last attempt failed, raise the error
                     raise
                 # Non-connection errors are raised immediately
                 raise
     
+    async def _channel_call(
+        self,
+        payload: Dict[str, Any],
+        retry_shed: bool = True,
+        idempotent: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """Send one call over the shared WebSocket channel (transport "ws")
+        or to the tools of this process (transport "inprocess").
+        
+        Like _request_with_retry, calls of idempotent tools cut off by a
+        dropped connection are retried (on a new connection) and, with
+        retry_shed, calls shed by the server are retried after their
+        retry_after. Each attempt carries
+        the time left before the call deadline.
+        
+        Returns:
+            The call's {"result": ...} or {"error": {...}} entry, or None if
+            the channel is unavailable and the call should go over HTTP
+            
+        Raises:
+            TimeoutError: If no reply came before the call deadline
+        """
+        if self.transport == "inprocess":
+            channel = get_inprocess_channel()
+        else:
+            channel = get_channel(self.server_url, WIRE_FORMAT)
+        if channel is None:
+            return None
+        deadline = _deadline.get()
+        attempt = 0
+        shed_retries = 0
+        
+        while True:
+            budget = self._attempt_budget(deadline)
+            try:
+                entry = await channel.call(dict(payload, deadline_ms=int(budget * 1000)), timeout=budget)
+            except ChannelUnavailable:
+                return None
+            except ChannelClosed:
+                # The call may have run before the connection dropped
+                if idempotent and attempt < MAX_ATTEMPTS - 1 and \
+                        await self._retry_pause(backoff_delay(attempt), deadline):
+                    attempt += 1
+                    continue
+                raise
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"No reply from the MCP server within {budget:.1f}s")
+            error = entry.get("error")
+            if retry_shed and error and error.get("status_code") == 503 and shed_retries < SHED_RETRIES:
+                retry_after = error.get("retry_after")
+                if retry_after is not None and retry_after <= MAX_RETRY_AFTER and \
+                        await self._retry_pause(jittered(retry_after), deadline):
+                    shed_retries += 1
+                    continue
+            return entry
+    
+    def _entry_result(self, entry: Dict[str, Any], path: str = "/tools/invoke") -> Any:
+        """Return a channel entry's result, raising its error as httpx.HTTPStatusError (as over HTTP)."""
+        error = entry.get("error")
+        if error is None:
+            return entry.get("result")
+        headers = {"Retry-After": str(error["retry_after"])} if "retry_after" in error else None
+        response = httpx.Response(
+            error.get("status_code", 500),
+            json={"detail": error.get("detail")},
+            headers=headers,
+            request=httpx.Request("POST", f"{self.server_url}{path}")
+        )
+        response.raise_for_status()
+        return None
+    
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """List available tools for this agent.
+        
+        The server catalog is cached per process and shared by all agent
+        clients. Within CATALOG_TTL seconds no request is made; after that the
+        cache is revalidated with a conditional GET (If-None-Match), which
+        costs an empty 304 response when nothing changed.
+        
+        Returns:
+            List of tool dictionaries with name, description, inputSchema, etc.
+        """
+        channel = get_inprocess_channel() if self.transport == "inprocess" else None
+        if channel is not None:
+            # The local catalog is always current; no revalidation needed
+            etag, tools = channel.catalog()
+            cached = {"etag": etag, "tools": tools}
+        else:
+            cached = await self._server_catalog()
+        
+        # Filter tools based on allowed_tools (reused until the catalog changes)
+        if self._filtered_tools is None or self._filtered_etag != cached["etag"]:
+            self._filtered_tools = [
+                tool for tool in cached["tools"]
+                if tool["name"] in self.allowed_tools
+            ]
+            self._filtered_etag = cached["etag"]
+        
+        return list(self._filtered_tools)
+    
+    async def _server_catalog(self) -> Dict[str, Any]:
+        """Return the server's catalog from the process-wide cache, revalidating it after CATALOG_TTL."""
+        cached = _catalog_cache.get(self.server_url)
+        now = time.monotonic()
+        if cached is None or now - cached["checked_at"] >= CATALOG_TTL:
+            headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+            response = await self._request_with_retry("GET", "/tools/list", headers=headers)
+            if response.status_code == 304 and cached is not None:
+                cached["checked_at"] = now
+            else:
+                data = response.json()
+                tools = data.get("tools", [])
+                cached = {
+                    "etag": response.headers.get("etag"),
+                    "tools": tools,
+                    "idempotent": {tool["name"] for tool in tools if tool.get("idempotent")},
+                    "checked_at": now
+                }
+                _catalog_cache[self.server_url] = cached
+        return cached
+    
+    async def _is_idempotent(self, tool_name: str) -> bool:
+        """Check if the server marks a tool idempotent ("idempotent" in /tools/list).
+        
+        Uses the cached catalog (loading it on first use) without
+        revalidating it; tools are treated as not idempotent when the
+        catalog cannot be loaded. A failed load is not tried again for
+        CATALOG_RETRY_AFTER seconds, so calls made while /tools/list is down
+        do not each wait for its retries.
+        """
+        channel = get_inprocess_channel() if self.transport == "inprocess" else None
+        if channel is not None:
+            return channel.idempotent(tool_name)
+        cached = _catalog_cache.get(self.server_url)
+        if cached is None:
+            failed_at = _catalog_failed_at.get(self.server_url)
+            if failed_at is not None and time.monotonic() - failed_at < CATALOG_RETRY_AFTER:
+                return False
+            try:
+                cached = await self._server_catalog()
+            except (httpx.HTTPError, TimeoutError):
+                _catalog_failed_at[self.server_url] = time.monotonic()
+                return False
+            _catalog_failed_at.pop(self.server_url, None)
+        return tool_name in cached["idempotent"]
+    
+    def _call_payload(
+        self,
+        tool_name: str,
+        parameters: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Build an invoke payload, adding the tool's projection and page size if any."""
+        payload = {
+            "tool": tool_name,
+            "parameters": parameters
+        }
+        projection = self.projections.get(tool_name) if projection is None else projection
+        if projection:
+            payload["projection"] = projection
+        page_size = self.pages.get(tool_name) if page_size is None else page_size
+        if page_size:
+            payload["page"] = {"size": page_size}
+        return payload
+    
     async def invoke(self, tool_name: str, **kwargs) -> Any:
         """Invoke a tool.
         
+        The tool's default projection and page size (if any) are applied.
+        
         Args:
             tool_name: Name of the tool to invoke
             **kwargs: Tool parameters
@@ -131,47 +514,219 @@ class BaseAgentClient:
         Raises:
             PermissionError: If tool is not in allowed_tools
         """
-        if tool_name not in self.allowed_tools:
-            raise PermissionError(
-                f"Agent '{self.name}' is not allowed to use tool '{tool_name}'. "
-                f"Allowed tools: {self.allowed_tools}"
+        return await self.invoke_projected(tool_name, None, **kwargs)
+    
+    async def invoke_projected(self, tool_name: str, projection: Optional[Dict[str, Any]], **kwargs) -> Any:
+        """Invoke a tool, letting the server trim the result first.
+        
+        Args:
+            tool_name: Name of the tool to invoke
+            projection: {"include": [paths], "exclude": [paths], "limits": {path: n}}.
+                        Paths are dot-separated keys; lists are traversed, "*"
+                        matches any key. None uses the client's default for
+                        the tool, {} requests the full result.
+            **kwargs: Tool parameters
+            
+        Inside a run_memo() block, a repeated call of an idempotent tool
+        returns the result of the first one.
+        
+        Returns:
+            Tool result (with "_truncated": {path: original length} when a
+            top-level list was cut)
+            
+        Raises:
+            PermissionError: If tool is not in allowed_tools
+        """
+        self._check_permission(tool_name)
+        
+        payload = self._call_payload(tool_name, kwargs, projection)
+        idempotent = await self._is_idempotent(tool_name)
+        memo = current_run_memo()
+        if idempotent and memo is not None:
+            # Repeated within this graph run (e.g., a feedback retry): see clients/run_memo.py
+            return await memo.call(payload, lambda: self._call_once(tool_name, payload, idempotent))
+        return await self._call_once(tool_name, payload, idempotent)
+    
+    async def _call_once(self, tool_name: str, payload: Dict[str, Any], idempotent: bool) -> Any:
+        """Send a call, hedged if hedging is on and the tool is idempotent."""
+        if idempotent and self.hedge:
+            return await hedge_policy.run(
+                tool_name, lambda hedge: self._send_call(dict(payload, hedge=True) if hedge else payload, True)
             )
+        return await self._send_call(payload, idempotent)
+    
+    async def _send_call(self, payload: Dict[str, Any], idempotent: bool) -> Any:
+        """Send one invoke payload over the client's transport and return the result."""
+        if self.transport in ("ws", "inprocess"):
+            entry = await self._channel_call(payload, idempotent=idempotent)
+            if entry is not None:
+                return self._entry_result(entry)
+        response = await self._request_with_retry(
+            "POST", "/tools/invoke", idempotent=idempotent, json=payload, headers={"Accept": RESULT_ACCEPT}
+        )
+        data = decode_response(response)
+        return data.get("result")
+    
+    async def invoke_many(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Invoke several tools concurrently in a single round trip.
         
-        max_retries = 3
-        retry_delay = 0.5
+        With the "ws" transport the calls are sent as concurrent messages on
+        the shared WebSocket connection instead of one batch request; with
+        "inprocess" they run concurrently in this process.
         
-        for attempt in range(max_retries):
-            try:
-                client = await self._get_client()
-                payload = {
-                    "tool": tool_name,
-                    "parameters": kwargs
-                }
-                
-                response = await client.post(f"{self.server_url}/tools/invoke", json=payload)
+        Args:
+            calls: List of {"tool": tool_name, "parameters": {...}} dictionaries,
+                   optionally with a "projection" and a "page_size"
+                   (defaults as in invoke)
+            
+        Returns:
+            List of per-call entries in the same order as calls. Each entry is
+            either {"result": ...} or {"error": {"status_code": ..., "detail": ...}}.
+            Calls shed by the server (503) are resubmitted after their
+            retry_after, like single invocations. Inside a run_memo() block,
+            calls of idempotent tools made earlier in the run are not sent.
+            
+        Raises:
+            PermissionError: If any call uses a tool not in allowed_tools
+        """
+        for call in calls:
+            self._check_permission(call.get("tool"))
+        
+        if not calls:
+            return []
+        
+        payloads = [
+            self._call_payload(call["tool"], call.get("parameters", {}), call.get("projection"), call.get("page_size"))
+            for call in calls
+        ]
+        results: List[Dict[str, Any]] = [{} for _ in payloads]
+        pending = list(range(len(payloads)))
+        deadline = _deadline.get()
+        
+        memo = current_run_memo()
+        memoizable = set()
+        if memo is not None:
+            memoizable = {i for i in pending if await self._is_idempotent(payloads[i]["tool"])}
+            for index in memoizable:
+                hit, result = memo.lookup(payloads[index])
+                if hit:
+                    results[index] = {"result": result}
+                    pending.remove(index)
+        sent = list(pending)
+        
+        for shed_retries in range(SHED_RETRIES + 1):
+            if not pending:
+                break
+            for index, entry in zip(pending, await self._send_calls([payloads[i] for i in pending])):
+                results[index] = entry
+            
+            # Resubmit only the calls the server shed under load
+            shed = [i for i in pending if results[i].get("error", {}).get("status_code") == 503]
+            retry_after = max((results[i]["error"].get("retry_after") or 0 for i in shed), default=0)
+            if not shed or shed_retries == SHED_RETRIES or retry_after > MAX_RETRY_AFTER or \
+                    not await self._retry_pause(jittered(retry_after), deadline):
+                break
+            pending = shed
+        
+        for index in memoizable.intersection(sent):
+            if "result" in results[index]:
+                memo.store(payloads[index], results[index]["result"])
+        return results
+    
+    async def _send_calls(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send calls concurrently over a channel (transport "ws" or "inprocess") or as one /tools/invoke_batch request.
+        
+        A batch is retried after an ambiguous connection error only if all its tools are idempotent.
+        """
+        entries: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+        idempotent = [await self._is_idempotent(payload["tool"]) for payload in payloads]
+        if self.transport in ("ws", "inprocess"):
+            entries = list(await asyncio.gather(*(
+                self._channel_call(payload, retry_shed=False, idempotent=safe)
+                for payload, safe in zip(payloads, idempotent)
+            )))
+        rest = [i for i, entry in enumerate(entries) if entry is None]
+        if rest:
+            response = await self._request_with_retry(
+                "POST", "/tools/invoke_batch", idempotent=all(idempotent[i] for i in rest),
+                json={"calls": [payloads[i] for i in rest]}, headers={"Accept": RESULT_ACCEPT}
+            )
+            for index, entry in zip(rest, decode_response(response).get("results", [])):
+                entries[index] = entry
+        return entries
+    
+    async def invoke_stream(self, tool_name: str, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Invoke a tool and iterate over its results as they arrive.
+        
+        Tools that support streaming (see "streaming" in list_tools) emit
+        {"type": "partial", "data": ...} events as sub-fetches complete,
+        followed by one {"type": "result", "data": ...} event. Other tools
+        emit just the result event. The tool's default projection applies to
+        the result event.
+        
+        Streams are not retried: partial results may already have been
+        consumed. The call deadline (see call_deadline) bounds the whole stream.
+        
+        Args:
+            tool_name: Name of the tool to invoke
+            **kwargs: Tool parameters
+            
+        Yields:
+            Event dictionaries with "type" and "data" keys
+            
+        Raises:
+            PermissionError: If tool is not in allowed_tools
+            ToolStreamError: If the server reports an error mid-stream
+        """
+        self._check_permission(tool_name)
+        
+        payload = self._call_payload(tool_name, kwargs)
+        budget = self._attempt_budget(_deadline.get())
+        channel = get_inprocess_channel() if self.transport == "inprocess" else None
+        if channel is not None:
+            async for event in channel.stream(dict(payload, deadline_ms=int(budget * 1000))):
+                if event.get("type") == "error":
+                    raise ToolStreamError(tool_name, event.get("status_code", 500), event.get("detail", ""))
+                yield event
+            return
+        client = await self._get_client()
+        async with client.stream(
+            "POST",
+            f"{self.server_url}/tools/invoke_stream",
+            **self._deadline_kwargs(budget, {"json": payload, "headers": {"Accept": "application/x-ndjson"}})
+        ) as response:
+            if response.is_error:
+                await response.aread()
                 response.raise_for_status()
-                data = response.json()
-                return data.get("result")
-            except (RuntimeError, AttributeError) as e:
-                # If event loop is closed or client is invalid, reset and retry
-                if "closed" in str(e).lower() or "Event loop" in str(e):
-                    await self._reset_client()
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(retry_delay * (attempt + 1))
-                        continue
-                    raise
-                raise
-            except Exception as e:
-                # Handle connection errors with retry
-                if self._is_connection_error(e):
-                    await self._reset_client()
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(retry_delay * (attempt + 1))
-                        continue
-                    # Last attempt failed, raise the error
-                    raise
-                # Non-connection errors are raised immediately
-                raise
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if event.get("type") == "error":
+                    raise ToolStreamError(tool_name, event.get("status_code", 500), event.get("detail", ""))
+                yield event
+    
+    async def next_page(self, result: Dict[str, Any], size: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Fetch the page after a paginated result (or after a previous page).
+        
+        Args:
+            result: A result or page carrying a "_page" object
+            size: Optional number of items per list (defaults to the size of
+                  the previous page)
+            
+        Returns:
+            The next page ({<list fields>: [...], "_page": {...}}), an error
+            dict if the handle expired, or None when there is nothing more
+            
+        Raises:
+            PermissionError: If fetch_page is not in allowed_tools
+        """
+        page = result.get("_page") if isinstance(result, dict) else None
+        if not page or not page.get("next_cursor"):
+            return None
+        return await self.invoke(
+            "fetch_page", handle=page["handle"], cursor=page["next_cursor"], size=size or page.get("page_size")
+        )
     
     async def call_tool(self, tool_name: str, **kwargs) -> Any:
         """Alias for invoke method (for backward compatibility).
@@ -186,8 +741,21 @@ class BaseAgentClient:
         return await self.invoke(tool_name, **kwargs)
     
     async def close(self):
-        """Close the HTTP client."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """Release this client.
+        
+        The HTTP pool and WebSocket channels are shared by every agent client
+        of the process, so closing one client leaves them open for the others.
+        Close them with close_shared_connections() before the event loop ends
+        (langraph/graph.py does so after every run).
+        """
+
+
+async def close_shared_connections():
+    """Close the running loop's shared HTTP pool and WebSocket channels.
+
+    Call it before an event loop ends (at the end of a graph run, request or
+    script): open connections keep the loop and their sockets alive otherwise.
+    """
+    await shared_pool.aclose()
+    await close_channels()
 
@@ -3,8 +3,15 @@
 from clients.base_client import BaseAgentClient
 
 
+# Booking tokens and segment extensions are dropped by every consumer
+# (result_summarizer, planner); don't send them.
+FLIGHT_PROJECTION = {"exclude": ["*.booking_token", "*.flights.extensions"]}
+
 FlightAgentClient = BaseAgentClient(
     name="FlightAgent",
-    allowed_tools=["agent_get_flights_tool", "agent_get_flights_flexible_tool"]
+    allowed_tools=["agent_get_flights_tool", "agent_get_flights_flexible_tool", "fetch_page"],
+    projections={
+        "agent_get_flights_tool": FLIGHT_PROJECTION,
+        "agent_get_flights_flexible_tool": FLIGHT_PROJECTION,
+    }
 )
-
@@ -0,0 +1,145 @@
+"""Hedged requests for idempotent tools.
+
+With hedging on (MCP_HEDGE=1 or BaseAgentClient(hedge=True)), a call of an
+idempotent tool (see "idempotent" in /tools/list) that is still running
+after the MCP_HEDGE_PERCENTILE latency of its recent calls is sent a second
+time. The first successful reply wins and the other request is cancelled,
+which also stops it on the server. The server runs a hedge as its own
+execution instead of joining the slow one (see FastMCP.invoke), so a slow
+upstream response does not hold up both.
+
+Hedges add load, so they are capped at MCP_HEDGE_BUDGET of all hedgeable
+calls, and a tool is not hedged before MIN_SAMPLES of its calls have been
+timed.
+
+Environment variables:
+    MCP_HEDGE: Set to "1" to hedge calls of idempotent tools. Default off.
+    MCP_HEDGE_PERCENTILE: Latency percentile after which the hedge is sent.
+        Default 95.
+    MCP_HEDGE_BUDGET: Largest fraction of calls that may be hedged.
+        Default 0.1.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+
+HEDGE = os.getenv("MCP_HEDGE", "0") == "1"
+HEDGE_PERCENTILE = float(os.getenv("MCP_HEDGE_PERCENTILE", "95"))
+HEDGE_BUDGET = float(os.getenv("MCP_HEDGE_BUDGET", "0.1"))
+
+# Latencies kept per tool, and needed before its calls are hedged
+WINDOW = 200
+MIN_SAMPLES = 20
+
+# Never hedge sooner than this (seconds), however fast the tool usually is
+MIN_DELAY = 0.05
+
+
+class HedgePolicy:
+    """Per-tool latency history, hedge delay and hedge budget."""
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        budget: float = HEDGE_BUDGET,
+        window: int = WINDOW,
+        min_samples: int = MIN_SAMPLES,
+        min_delay: float = MIN_DELAY
+    ):
+        self.percentile = percentile
+        self.budget = budget
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._stats = {"calls": 0, "hedged": 0, "hedge_wins": 0}
+
+    def record(self, tool_name: str, seconds: float):
+        """Add the latency of a call."""
+        latencies = self._latencies.get(tool_name)
+        if latencies is None:
+            latencies = self._latencies[tool_name] = deque(maxlen=self.window)
+        latencies.append(seconds)
+
+    def delay(self, tool_name: str) -> Optional[float]:
+        """Seconds to wait before hedging a call, or None while too few calls were timed."""
+        latencies = self._latencies.get(tool_name)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        index = min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)
+        return max(ordered[index], self.min_delay)
+
+    def _take_hedge(self) -> bool:
+        """Use the budget for one hedge, if any is left."""
+        if self._stats["hedged"] + 1 > self.budget * self._stats["calls"]:
+            return False
+        self._stats["hedged"] += 1
+        return True
+
+    async def run(self, tool_name: str, attempt: Callable[[bool], Awaitable[Any]]) -> Any:
+        """Run attempt(False), hedging it with attempt(True) if it is slow.
+
+        Args:
+            tool_name: Tool being called (its latencies set the hedge delay)
+            attempt: Sends the call; the argument tells whether it is the hedge
+
+        Returns:
+            The first successful result
+
+        Raises:
+            The primary's error if both requests failed
+        """
+        self._stats["calls"] += 1
+        delay = self.delay(tool_name)
+        start = time.perf_counter()
+        if delay is None:
+            result = await attempt(False)
+            self.record(tool_name, time.perf_counter() - start)
+            return result
+
+        primary = asyncio.ensure_future(attempt(False))
+        pending = {primary}
+        try:
+            await asyncio.wait(pending, timeout=delay)
+            if primary.done() or not self._take_hedge():
+                result = await primary
+                self.record(tool_name, time.perf_counter() - start)
+                return result
+
+            hedge = asyncio.ensure_future(attempt(True))
+            pending = {primary, hedge}
+            errors = {}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda task: task is hedge):
+                    if task.exception() is not None:
+                        errors[task] = task.exception()
+                        continue
+                    if task is hedge:
+                        self._stats["hedge_wins"] += 1
+                    # Time of the primary so far: a lower bound when the hedge won
+                    self.record(tool_name, time.perf_counter() - start)
+                    return task.result()
+            raise errors.get(primary) or errors[hedge]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hedge counters and the current hedge delay per tool (ms)."""
+        delays = {name: self.delay(name) for name in self._latencies}
+        return dict(
+            self._stats,
+            percentile=self.percentile,
+            budget=self.budget,
+            delay_ms={name: round(delay * 1000, 1) for name, delay in delays.items() if delay is not None},
+        )
+
+
+# Policy shared by every agent client in the process
+hedge_policy = HedgePolicy()
@@ -5,6 +5,10 @@ from clients.base_client import BaseAgentClient
 
 HotelAgentClient = BaseAgentClient(
     name="HotelAgent",
-    allowed_tools=["get_list_of_hotels", "get_hotel_rates", "get_hotel_rates_by_price", "get_hotel_details", "book_hotel_room"]
+    allowed_tools=["get_list_of_hotels", "get_hotel_rates", "get_hotel_rates_by_price", "get_hotel_details", "book_hotel_room", "fetch_page"],
+    projections={
+        # Only the first few images are ever shown or passed to the LLM
+        "get_hotel_details": {"limits": {"hotel.hotelImages": 3}},
+    }
 )
 
@@ -0,0 +1,152 @@
+"""Process-wide pooled HTTP client shared by all agent clients.
+
+Every BaseAgentClient (hotel, flight, visa, ...) sends its requests through
+one pool per event loop instead of keeping a small pool of its own, so a
+parallel step that fans out to several agents reuses the same warm
+connections, and the pool is sized for that fan-out.
+
+The pool is split into MCP_POOL_SHARDS httpx.AsyncClient shards that
+requests are spread over round-robin: the CPU cost of httpx's connection
+pool grows with the number of connections in one client, and a single
+client with 100+ connections spends more time on pool bookkeeping than on
+requests (benchmarks/bench_client_pool.py). httpx clients are bound to the
+event loop that created them (the frontend runs a new loop per request), so
+shards are kept per running loop. Their open connections keep the loop
+alive, so a loop's shards must be closed before the loop ends:
+langraph/graph.py calls close_shared_connections() (clients/base_client.py)
+at the end of every run. Shards of loops that were closed without that are
+dropped the next time a new loop creates its shards.
+
+Connection failures do not reset the pool: httpx drops a connection that
+failed, and idle connections are checked before reuse (a connection the
+server closed is discarded, not handed out), so a retry simply gets a fresh
+connection while other callers keep theirs. The client is only recreated
+when it is unusable (closed). Idle connections are dropped before the
+server's keep-alive timeout (uvicorn closes them after 5 s) to avoid
+sending a request on a connection the server is closing.
+
+HTTP/2 is enabled when the h2 package is installed. It is negotiated with
+TLS (ALPN), i.e. when MCP_SERVER_URL is https:// behind a proxy that speaks
+HTTP/2; plain http:// connections to uvicorn stay on HTTP/1.1.
+
+Environment variables:
+    MCP_POOL_MAX_CONNECTIONS: Connections per loop, over all shards. Default 128.
+    MCP_POOL_MAX_KEEPALIVE: Idle connections kept per loop. Default 64.
+    MCP_POOL_SHARDS: httpx clients the connections are split over. Default 16.
+    MCP_POOL_KEEPALIVE_EXPIRY: Seconds an idle connection is kept. Default 4.
+    MCP_HTTP2: Set to "0" to disable HTTP/2. Default enabled when h2 is
+        installed.
+"""
+
+import asyncio
+import itertools
+import os
+import weakref
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+try:
+    import h2  # noqa: F401 (httpx needs it for http2=True)
+except ImportError:
+    h2 = None
+
+
+MAX_CONNECTIONS = int(os.getenv("MCP_POOL_MAX_CONNECTIONS", "128"))
+MAX_KEEPALIVE = int(os.getenv("MCP_POOL_MAX_KEEPALIVE", "64"))
+SHARDS = int(os.getenv("MCP_POOL_SHARDS", "16"))
+# Below uvicorn's default timeout_keep_alive of 5 s
+KEEPALIVE_EXPIRY = float(os.getenv("MCP_POOL_KEEPALIVE_EXPIRY", "4"))
+HTTP2 = os.getenv("MCP_HTTP2", "1") != "0" and h2 is not None
+
+# Default timeouts; requests normally pass their own (see BaseAgentClient._deadline_kwargs)
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+
+class SharedHttpPool:
+    """Sharded pool of httpx.AsyncClients per event loop."""
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive: int = MAX_KEEPALIVE,
+        shards: int = SHARDS,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+        http2: bool = HTTP2
+    ):
+        self.shards = max(min(shards, max_connections), 1)
+        self.limits = httpx.Limits(
+            max_connections=max(max_connections // self.shards, 1),
+            max_keepalive_connections=max(max_keepalive // self.shards, 1),
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2
+        # loop -> (shards, round-robin counter)
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[List[httpx.AsyncClient], Any]]" = \
+            weakref.WeakKeyDictionary()
+        self._stats = {"clients_created": 0, "connection_errors": 0, "discarded": 0, "abandoned": 0}
+
+    def _new_client(self) -> httpx.AsyncClient:
+        self._stats["clients_created"] += 1
+        return httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, limits=self.limits, http2=self.http2)
+
+    def client(self) -> httpx.AsyncClient:
+        """Get the next shard for the running loop, creating it on first use or after it was closed."""
+        loop = asyncio.get_running_loop()
+        entry = self._loops.get(loop)
+        if entry is None:
+            self._forget_closed_loops()
+            entry = self._loops[loop] = ([self._new_client() for _ in range(self.shards)], itertools.count())
+        clients, counter = entry
+        index = next(counter) % self.shards
+        if clients[index].is_closed:
+            clients[index] = self._new_client()
+        return clients[index]
+
+    def _forget_closed_loops(self):
+        """Drop the shards of loops that ended without aclose().
+
+        They cannot be closed cleanly any more (that needs their loop);
+        dropping them lets their sockets be closed when they are collected.
+        """
+        for loop in [loop for loop in self._loops if loop.is_closed()]:
+            self._stats["abandoned"] += 1
+            del self._loops[loop]
+
+    def connection_failed(self):
+        """Count a failed request; the failed connection has already left the pool."""
+        self._stats["connection_errors"] += 1
+
+    async def discard(self):
+        """Close the running loop's shards because they are unusable; the next call creates new ones."""
+        entry = self._loops.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            self._stats["discarded"] += 1
+            for client in entry[0]:
+                try:
+                    await client.aclose()
+                except Exception:
+                    pass
+
+    async def aclose(self):
+        """Close the running loop's shards (e.g., at the end of a test or script)."""
+        entry = self._loops.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            for client in entry[0]:
+                await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool settings and counters."""
+        return dict(
+            self._stats,
+            loops=len(self._loops),
+            shards=self.shards,
+            http2=self.http2,
+            max_connections_per_shard=self.limits.max_connections,
+            max_keepalive_per_shard=self.limits.max_keepalive_connections,
+            keepalive_expiry=self.limits.keepalive_expiry,
+        )
+
+
+# Pool shared by every agent client in the process
+shared_pool = SharedHttpPool()
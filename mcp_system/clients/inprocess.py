@@ -0,0 +1,135 @@
+"""In-process transport to the FastMCP tools of this process.
+
+With MCP_TRANSPORT=inprocess, agent clients call the registered tools of
+server/main_server.py directly instead of sending each call as JSON over
+HTTP. This is meant for a LangGraph runner co-located with the tools: the
+request encoding, the HTTP round trip and the response decoding go away,
+while the call still takes the server's path (cache, admission, dispatch
+lanes, deadline, projection, pagination, journal), so results and error
+entries have the same shape as over HTTP or WebSocket. The client-side
+permission check (allowed_tools) runs before any call, as with the other
+transports.
+
+Importing server/main_server.py on first use registers every tool group in
+this process, so it needs the server's dependencies and configuration. If
+the import fails, clients fall back to HTTP. Results are copied (dicts and
+lists) before they are returned: the server keeps cached and coalesced
+results, which a caller must not be able to modify.
+
+The server's concurrency caps are shared by all event loops of the process;
+use this transport from a process that runs one long-lived loop (the graph
+runner), not from code that starts a loop per request.
+
+Environment variables:
+    MCP_TRANSPORT: "http" (default), "ws" or "inprocess".
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+
+def detach(value: Any) -> Any:
+    """Copy the dicts and lists of a result (tuples become lists, as in JSON)."""
+    if isinstance(value, dict):
+        return {key: detach(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [detach(item) for item in value]
+    return value
+
+
+class InProcessChannel:
+    """Calls into a FastMCP instance, with the same entry format as ToolChannel."""
+
+    def __init__(self, server: Any):
+        """Initialize the channel.
+
+        Args:
+            server: The FastMCP instance whose tools are called
+        """
+        from fastapi import HTTPException
+        from server.deadline import CallBudget, parse_deadline
+
+        self.server = server
+        self._http_exception = HTTPException
+        self._call_budget = CallBudget
+        self._parse_deadline = parse_deadline
+        self._catalog: Optional[Tuple[str, list]] = None
+        self.stats = {"calls": 0, "streams": 0}
+
+    async def call(self, message: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run one call.
+
+        Args:
+            message: {"tool", "parameters", "projection", "page", "hedge", "deadline_ms"}
+            timeout: Unused; the server enforces deadline_ms (504)
+
+        Returns:
+            {"result": ...} or {"error": {"status_code": ..., "detail": ...}}
+        """
+        self.stats["calls"] += 1
+        entry = await self.server._channel_call(message)
+        if "result" in entry:
+            entry["result"] = detach(entry["result"])
+        return entry
+
+    async def stream(self, message: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Run one streamed call, yielding the events /tools/invoke_stream would send.
+
+        Errors are yielded as {"type": "error", "status_code": ..., "detail": ...}.
+        """
+        self.stats["streams"] += 1
+        tool_name = message.get("tool")
+        try:
+            deadline = self._parse_deadline(
+                None if message.get("deadline_ms") is None else str(message["deadline_ms"])
+            )
+        except ValueError as e:
+            yield {"type": "error", "status_code": 400, "detail": str(e)}
+            return
+        try:
+            projection = self.server._parse_projection(message.get("projection"))
+            page_size = self.server._parse_page(tool_name, message.get("page"))
+            self.server._get_tool_func(tool_name)
+            budget = self._call_budget(deadline) if deadline is not None else None
+            async for event, payload in self.server.invoke_stream(tool_name, message.get("parameters", {}), budget):
+                if event == "result":
+                    payload = await self.server._shape_result(tool_name, payload, projection, page_size)
+                yield {"type": event, "data": detach(payload)}
+        except self._http_exception as e:
+            yield dict(self.server._error_entry(e), type="error")
+
+    def idempotent(self, tool_name: str) -> bool:
+        """Check if the server marks a tool idempotent."""
+        return bool(self.server.tools.get(tool_name, {}).get("idempotent"))
+
+    def catalog(self) -> Tuple[str, list]:
+        """Return the server's catalog ETag and tools (parsed again only after a registration change)."""
+        body, etag = self.server._get_catalog()
+        if self._catalog is None or self._catalog[0] != etag:
+            self._catalog = (etag, json.loads(body).get("tools", []))
+        return self._catalog
+
+
+_channel: Optional[InProcessChannel] = None
+_import_failed = False
+
+
+def use_server(server: Any):
+    """Serve in-process calls from a given FastMCP instance instead of importing main_server."""
+    global _channel
+    _channel = InProcessChannel(server)
+
+
+def get_inprocess_channel() -> Optional[InProcessChannel]:
+    """Get the channel to this process's tools, or None if the server cannot be loaded."""
+    global _import_failed
+    if _channel is None and not _import_failed:
+        try:
+            from server.main_server import mcp
+        except Exception as e:
+            _import_failed = True
+            print(f"[MCP_INPROCESS] Warning: cannot load the MCP server in-process "
+                  f"({type(e).__name__}: {e}); using HTTP")
+            return None
+        use_server(mcp)
+    return _channel
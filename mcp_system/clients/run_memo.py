@@ -0,0 +1,133 @@
+"""Run-scoped memo of tool results.
+
+Within one graph run, feedback nodes (flight_agent_feedback,
+hotel_agent_feedback, ...) send agents back for another attempt, and the
+retry often repeats tool calls of the first attempt with the same
+arguments. Inside a run_memo() block, BaseAgentClient answers a repeated
+call of an idempotent tool (see "idempotent" in /tools/list) from the memo
+instead of calling the MCP server again, so a retry only pays for the calls
+whose arguments changed. Identical calls made concurrently share one
+request.
+
+Calls are keyed by tool and canonical arguments, including the projection
+and page size (which change the result). Failed calls and error results
+({"error": True, ...}) are not kept, so they are retried. Every caller gets
+its own copy of a result. The memo is dropped when the block ends; unlike
+the server's result cache it never outlives the run, so a new user message
+sees fresh prices and availability.
+
+Example:
+    with run_memo(session_id):
+        final_state = await app.ainvoke(initial_state, config)
+"""
+
+import asyncio
+import contextvars
+import json
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from clients.inprocess import detach
+
+
+def memo_key(payload: Dict[str, Any]) -> str:
+    """Canonical key of an invoke payload (tool, parameters, projection, page)."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, dict) and bool(result.get("error"))
+
+
+class RunMemo:
+    """Tool results of one graph run, keyed by canonical call."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self._entries: Dict[str, asyncio.Future] = {}
+        self._stats = {"hits": 0, "misses": 0}
+
+    async def call(self, payload: Dict[str, Any], send: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the memoized result of a call, or send it and remember a successful result.
+
+        Args:
+            payload: The invoke payload (its canonical form is the key)
+            send: Makes the call when it is not memoized
+        """
+        key = memo_key(payload)
+        future = self._entries.get(key)
+        while future is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The caller that made the call went away; make it again
+                future = self._entries.get(key)
+                continue
+            self._stats["hits"] += 1
+            return detach(result)
+
+        self._stats["misses"] += 1
+        future = self._entries[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await send()
+        except Exception as e:
+            # Callers sharing the call get its error, but it is not remembered
+            self._forget(key, future)
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            self._forget(key, future)
+            future.cancel()
+            raise
+        if _is_error(result):
+            self._forget(key, future)
+        future.set_result(result)
+        return detach(result)
+
+    def lookup(self, payload: Dict[str, Any]) -> Tuple[bool, Any]:
+        """Return (True, result) for a completed, successful call, else (False, None)."""
+        future = self._entries.get(memo_key(payload))
+        if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+            return False, None
+        self._stats["hits"] += 1
+        return True, detach(future.result())
+
+    def store(self, payload: Dict[str, Any], result: Any):
+        """Remember the successful result of a call made without call() (e.g., in a batch)."""
+        self._stats["misses"] += 1
+        if _is_error(result):
+            return
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(detach(result))
+        self._entries.setdefault(memo_key(payload), future)
+
+    def _forget(self, key: str, future: asyncio.Future):
+        if self._entries.get(key) is future:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit and miss counters and the number of remembered calls."""
+        return dict(self._stats, run_id=self.run_id, entries=len(self._entries))
+
+
+_memo: contextvars.ContextVar[Optional[RunMemo]] = contextvars.ContextVar("mcp_run_memo", default=None)
+
+
+def current_run_memo() -> Optional[RunMemo]:
+    """The memo of the graph run this code belongs to, if any."""
+    return _memo.get()
+
+
+@contextmanager
+def run_memo(run_id: str) -> Iterator[RunMemo]:
+    """Memoize idempotent tool calls made inside the block (and the tasks it starts)."""
+    memo = RunMemo(run_id)
+    token = _memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _memo.reset(token)
+        print(f"[RUN_MEMO] Run {run_id}: {memo.stats()}")
@@ -0,0 +1,261 @@
+"""Persistent, multiplexed WebSocket transport to the MCP server.
+
+With MCP_TRANSPORT=ws, agent clients send tool calls over the server's
+/tools/ws endpoint instead of one HTTP request each. All agent clients of a
+process share one connection per server and event loop; concurrent calls
+are correlated by id, so parallel agents neither open extra connections nor
+wait for each other's responses.
+
+Reconnects: a channel connects on first use. If the connection drops,
+calls waiting on it fail with ChannelClosed (the caller retries them on a
+new connection). If connecting fails, the channel raises ChannelUnavailable
+and does not try again for a back-off period (doubling up to
+MAX_RECONNECT_DELAY), during which callers use plain HTTP.
+
+Requires the websockets package; without it MCP_TRANSPORT=ws falls back to
+HTTP.
+
+Environment variables:
+    MCP_TRANSPORT: "http" (default) or "ws".
+    MCP_WS_CONNECT_TIMEOUT: Seconds to wait for the connection. Default 5.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+TRANSPORT = os.getenv("MCP_TRANSPORT", "http")
+CONNECT_TIMEOUT = float(os.getenv("MCP_WS_CONNECT_TIMEOUT", "5"))
+
+# Back-off after a failed connection attempt, doubled per failure
+MIN_RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 30.0
+
+
+class ChannelUnavailable(Exception):
+    """Raised when the WebSocket connection cannot be established (use HTTP instead)."""
+
+
+class ChannelClosed(Exception):
+    """Raised for calls in flight when their connection drops."""
+
+
+def _decode(frame: Any, binary_format: bool) -> Any:
+    if binary_format:
+        return msgpack.unpackb(frame, raw=False, strict_map_key=False)
+    if orjson is not None:
+        return orjson.loads(frame)
+    return json.loads(frame)
+
+
+class ToolChannel:
+    """One WebSocket connection to /tools/ws carrying many concurrent calls."""
+
+    def __init__(self, server_url: str, wire_format: str = "json"):
+        """Initialize the channel (no connection is made until the first call).
+
+        Args:
+            server_url: HTTP base URL of the MCP server
+            wire_format: Reply format, "json" or "msgpack" (see MCP_WIRE_FORMAT)
+        """
+        base = server_url.rstrip("/")
+        if base.startswith("https://"):
+            base = "wss://" + base[len("https://"):]
+        elif base.startswith("http://"):
+            base = "ws://" + base[len("http://"):]
+        self.msgpack = wire_format == "msgpack" and msgpack is not None
+        self.url = f"{base}/tools/ws?accept={'application/msgpack' if self.msgpack else 'application/json'}"
+        self._ws = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connecting: Optional[asyncio.Future] = None
+        self._failures = 0
+        self._retry_at = 0.0
+        self.stats = {"connects": 0, "connect_failures": 0, "disconnects": 0, "calls": 0}
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    async def _connection(self):
+        """Return the open connection, connecting first if needed.
+
+        Raises:
+            ChannelUnavailable: If connecting failed now or recently
+        """
+        if self._ws is not None:
+            return self._ws
+        if self._connecting is None:
+            if time.monotonic() < self._retry_at:
+                raise ChannelUnavailable(f"Not reconnecting to {self.url} yet")
+            self._connecting = asyncio.ensure_future(self._connect())
+        connecting = self._connecting
+        try:
+            return await asyncio.shield(connecting)
+        finally:
+            if connecting.done() and self._connecting is connecting:
+                self._connecting = None
+
+    async def _connect(self):
+        try:
+            ws = await asyncio.wait_for(
+                websockets.connect(self.url, max_size=None, open_timeout=CONNECT_TIMEOUT),
+                CONNECT_TIMEOUT
+            )
+        except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+            self._failures += 1
+            self.stats["connect_failures"] += 1
+            delay = min(MIN_RECONNECT_DELAY * 2 ** (self._failures - 1), MAX_RECONNECT_DELAY)
+            self._retry_at = time.monotonic() + delay
+            print(f"[MCP_WS] Cannot connect to {self.url} ({type(e).__name__}: {e}); using HTTP for {delay:.1f}s")
+            raise ChannelUnavailable(str(e)) from e
+        self._failures = 0
+        self.stats["connects"] += 1
+        self._ws = ws
+        self._reader = asyncio.ensure_future(self._read(ws))
+        return ws
+
+    async def _read(self, ws):
+        """Resolve pending calls as their replies arrive."""
+        error: Exception = ChannelClosed("Connection to the MCP server closed")
+        try:
+            async for frame in ws:
+                message = _decode(frame, self.msgpack)
+                future = self._pending.pop(message.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except websockets.exceptions.ConnectionClosed as e:
+            error = ChannelClosed(f"Connection to the MCP server closed ({e})")
+        except asyncio.CancelledError:
+            # close(), or the loop ending (asyncio.run() cancels leftover
+            # tasks): the socket cannot outlive the loop, so drop it now
+            error = ChannelClosed("Channel closed with its event loop")
+            ws.transport.abort()
+            raise
+        except Exception as e:
+            error = ChannelClosed(f"Connection to the MCP server failed ({type(e).__name__}: {e})")
+        finally:
+            self._closed(ws, error)
+
+    def _closed(self, ws, error: Exception):
+        """Forget a dropped connection and fail the calls waiting on it."""
+        if self._ws is not ws:
+            return
+        self._ws = None
+        self.stats["disconnects"] += 1
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def call(self, message: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send one call and wait for its reply entry.
+
+        Args:
+            message: {"tool", "parameters", ...} (the id is added here)
+            timeout: Seconds to wait; the call is cancelled on the server
+                     when the wait ends early
+
+        Returns:
+            {"result": ...} or {"error": {"status_code": ..., "detail": ...}}
+
+        Raises:
+            ChannelUnavailable: If there is no connection (use HTTP)
+            ChannelClosed: If the connection dropped before the reply
+            asyncio.TimeoutError: If no reply came within timeout
+        """
+        ws = await self._connection()
+        call_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[call_id] = future
+        self.stats["calls"] += 1
+        try:
+            await ws.send(json.dumps(dict(message, id=call_id), ensure_ascii=False, default=str))
+        except websockets.exceptions.ConnectionClosed as e:
+            self._pending.pop(call_id, None)
+            self._closed(ws, ChannelClosed(str(e)))
+            raise ChannelClosed(f"Connection to the MCP server closed ({e})") from e
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # Nobody waits for this call any more; stop it on the server
+            self._pending.pop(call_id, None)
+            if self._ws is ws:
+                try:
+                    await ws.send(json.dumps({"id": call_id, "cancel": True}))
+                except Exception:
+                    pass
+            raise
+
+    async def close(self):
+        """Close the connection; the next call reconnects."""
+        ws = self._ws
+        if ws is not None:
+            await ws.close()
+            self._closed(ws, ChannelClosed("Channel closed by the client"))
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+
+# Channels per event loop (the frontend runs a new loop per request) and server
+# URL; close_channels() closes a loop's channels before the loop ends
+_channels: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ToolChannel]]" = weakref.WeakKeyDictionary()
+_missing_warned = False
+
+
+def get_channel(server_url: str, wire_format: str = "json") -> Optional[ToolChannel]:
+    """Get the shared channel to a server for the running loop, or None without websockets."""
+    global _missing_warned
+    if websockets is None:
+        if not _missing_warned:
+            _missing_warned = True
+            print("[MCP_WS] Warning: MCP_TRANSPORT=ws needs the websockets package; using HTTP")
+        return None
+    loop = asyncio.get_running_loop()
+    channels = _channels.get(loop)
+    if channels is None:
+        # Forget the channels of loops that ended without close_channels()
+        for closed in [other for other in _channels if other.is_closed()]:
+            del _channels[closed]
+        channels = _channels[loop] = {}
+    channel = channels.get(server_url)
+    if channel is None:
+        channel = channels[server_url] = ToolChannel(server_url, wire_format)
+    return channel
+
+
+async def close_channel(server_url: str):
+    """Close the running loop's channel to a server, if it has one."""
+    channels = _channels.get(asyncio.get_running_loop(), {})
+    channel = channels.pop(server_url, None)
+    if channel is not None:
+        await channel.close()
+
+
+async def close_channels():
+    """Close every channel of the running loop."""
+    channels = _channels.pop(asyncio.get_running_loop(), {})
+    for channel in channels.values():
+        await channel.close()
@@ -0,0 +1 @@
+"""Server package for MCP system."""
@@ -0,0 +1,279 @@
+"""Admission control and load shedding for tool calls.
+
+Every tool execution must be admitted before it is dispatched. Identical
+concurrent calls coalesced into one execution (see server/dispatch.py) take
+a single slot, so a burst of repeats does not crowd out other calls. Tools
+belong to a priority class (declared with @mcp.tool(priority=...)):
+
+- interactive: calls a user is waiting on (searches, lookups). Default.
+- background: work nobody is watching (memory writes, planner sync).
+
+A call starts right away while fewer than MCP_MAX_IN_FLIGHT calls are
+running overall and its class is under its own in-flight limit. Otherwise
+it waits in its class's bounded queue; freed slots go to interactive calls
+first. A call is shed with Overloaded (a 503 with Retry-After) when its
+queue is full or it could not start within MCP_ADMISSION_MAX_WAIT (or its
+deadline). Shedding early keeps latency flat for the calls that are
+admitted instead of letting every queue grow under a burst.
+
+Environment variables:
+    MCP_ADMISSION: Set to 0 to admit every call. Default 1.
+    MCP_MAX_IN_FLIGHT: Calls running at once across all classes. Default 64.
+    MCP_ADMISSION_CLASSES: Per-class overrides such as
+        "interactive=64:128,background=8:16" (in-flight limit:queue length).
+    MCP_ADMISSION_MAX_WAIT: Longest a call waits in the queue, in seconds. Default 5.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from server.deadline import current_budget
+from server.metrics import admission_rejected
+
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+ADMISSION_ENABLED = os.getenv("MCP_ADMISSION", "1") != "0"
+MAX_IN_FLIGHT = int(os.getenv("MCP_MAX_IN_FLIGHT", "64"))
+MAX_WAIT = float(os.getenv("MCP_ADMISSION_MAX_WAIT", "5"))
+
+# Default (in-flight limit, queue length) per class, in priority order
+DEFAULT_CLASSES: Dict[str, Tuple[int, int]] = {
+    INTERACTIVE: (64, 128),
+    BACKGROUND: (8, 16),
+}
+
+# Bounds of the Retry-After hint, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 30
+
+
+def _parse_classes(raw: Optional[str]) -> Dict[str, Tuple[int, int]]:
+    """Parse an override string such as "interactive=64:128,background=8:16"."""
+    classes = {}
+    if not raw:
+        return classes
+    for entry in raw.split(","):
+        if "=" not in entry:
+            continue
+        name, value = entry.split("=", 1)
+        try:
+            limit, _, queue = value.strip().partition(":")
+            classes[name.strip()] = (int(limit), int(queue) if queue else int(limit) * 2)
+        except ValueError:
+            print(f"[ADMISSION] Warning: ignoring invalid class limit '{entry}'")
+    return classes
+
+
+class Overloaded(Exception):
+    """Raised when a call is shed instead of queued."""
+
+    def __init__(self, priority: str, retry_after: int, reason: str):
+        self.priority = priority
+        self.retry_after = retry_after
+        super().__init__(f"Server overloaded ({reason}); retry in {retry_after}s")
+
+
+class PriorityClass:
+    """In-flight count, wait queue and counters of one priority class."""
+
+    def __init__(self, name: str, rank: int, limit: int, queue_limit: int):
+        self.name = name
+        self.rank = rank  # Lower ranks get freed slots first
+        self.limit = limit
+        self.queue_limit = queue_limit
+        self.in_flight = 0
+        self.waiters: Deque["asyncio.Future[None]"] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait_ms = 0.0
+        self.avg_seconds = 0.0  # Moving average of call duration, for Retry-After
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "queue_limit": self.queue_limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_ms / self.admitted, 3) if self.admitted else 0.0,
+            "avg_call_ms": round(self.avg_seconds * 1000, 3),
+        }
+
+
+class AdmissionController:
+    """Admits tool calls by priority class, shedding what cannot be served soon.
+
+    All state is touched from the event loop only, so no locks are needed.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        classes: Optional[Dict[str, Tuple[int, int]]] = None,
+        max_wait: Optional[float] = None,
+        enabled: bool = ADMISSION_ENABLED
+    ):
+        """Initialize the controller.
+
+        Args:
+            max_in_flight: Calls running at once across all classes
+            classes: (in-flight limit, queue length) per class, in priority
+                    order (defaults to DEFAULT_CLASSES plus MCP_ADMISSION_CLASSES)
+            max_wait: Longest a call waits in its queue, in seconds
+            enabled: Admit every call immediately when False
+        """
+        self.enabled = enabled
+        self.max_in_flight = max_in_flight or MAX_IN_FLIGHT
+        self.max_wait = MAX_WAIT if max_wait is None else max_wait
+        limits = dict(DEFAULT_CLASSES)
+        limits.update(_parse_classes(os.getenv("MCP_ADMISSION_CLASSES")))
+        if classes:
+            limits.update(classes)
+        self.classes = {
+            name: PriorityClass(name, rank, limit, queue_limit)
+            for rank, (name, (limit, queue_limit)) in enumerate(limits.items())
+        }
+        self._tool_classes: Dict[str, str] = {}
+        self.in_flight = 0
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """Start a forked worker with empty queues."""
+        self.in_flight = 0
+        for cls in self.classes.values():
+            cls.in_flight = 0
+            cls.waiters = deque()
+
+    def configure_tool(self, tool_name: str, priority: str = INTERACTIVE):
+        """Register the priority class declared for a tool.
+
+        Raises:
+            ValueError: If the class is unknown
+        """
+        if priority not in self.classes:
+            raise ValueError(f"Unknown priority '{priority}' for tool '{tool_name}'; "
+                             f"expected one of {', '.join(self.classes)}")
+        self._tool_classes[tool_name] = priority
+
+    def priority_of(self, tool_name: str) -> PriorityClass:
+        return self.classes[self._tool_classes.get(tool_name, INTERACTIVE)]
+
+    def _has_slot(self, cls: PriorityClass) -> bool:
+        return self.in_flight < self.max_in_flight and cls.in_flight < cls.limit
+
+    def _can_start(self, cls: PriorityClass) -> bool:
+        """Whether a new call may skip the queue.
+
+        Not while callers of the same class are queued, or while a
+        higher-priority class is waiting for a global slot.
+        """
+        if cls.waiters or not self._has_slot(cls):
+            return False
+        return not any(
+            other.waiters and other.in_flight < other.limit
+            for other in self.classes.values() if other.rank < cls.rank
+        )
+
+    def _start(self, cls: PriorityClass):
+        self.in_flight += 1
+        cls.in_flight += 1
+        cls.admitted += 1
+
+    def _wake(self):
+        """Hand freed slots to queued calls, highest priority first."""
+        for cls in sorted(self.classes.values(), key=lambda c: c.rank):
+            while cls.waiters and self._has_slot(cls):
+                waiter = cls.waiters.popleft()
+                if not waiter.done():
+                    self._start(cls)
+                    waiter.set_result(None)
+
+    def retry_after(self, cls: PriorityClass) -> int:
+        """Seconds until the class's queue has likely drained."""
+        slots = max(min(cls.limit, self.max_in_flight), 1)
+        estimate = cls.avg_seconds * (len(cls.waiters) + 1) / slots
+        return int(min(max(math.ceil(estimate), MIN_RETRY_AFTER), MAX_RETRY_AFTER))
+
+    def _shed(self, cls: PriorityClass, reason: str) -> Overloaded:
+        cls.rejected += 1
+        admission_rejected.inc(cls.name, reason)
+        return Overloaded(cls.name, self.retry_after(cls), reason)
+
+    async def acquire(self, tool_name: str):
+        """Wait for a slot for one call of a tool.
+
+        Raises:
+            Overloaded: If the queue is full or no slot freed up in time
+        """
+        if not self.enabled:
+            return
+        cls = self.priority_of(tool_name)
+        if self._can_start(cls):
+            self._start(cls)
+            return
+        if len(cls.waiters) >= cls.queue_limit:
+            raise self._shed(cls, "queue full")
+
+        timeout = self.max_wait
+        budget = current_budget()
+        remaining = budget.remaining() if budget is not None else None
+        if remaining is not None:
+            timeout = min(timeout, max(remaining, 0.0))
+
+        waiter = asyncio.get_running_loop().create_future()
+        cls.waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self._forget(cls, waiter)
+            raise self._shed(cls, "queue timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the caller went away: pass the slot on
+                self.release(tool_name)
+            else:
+                self._forget(cls, waiter)
+            raise
+        cls.total_wait_ms += (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def _forget(cls: PriorityClass, waiter: "asyncio.Future[None]"):
+        try:
+            cls.waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, tool_name: str, duration: Optional[float] = None):
+        """Free the slot taken by acquire().
+
+        Args:
+            tool_name: Name of the tool that finished
+            duration: Seconds the call ran, for the Retry-After estimate
+        """
+        if not self.enabled:
+            return
+        cls = self.priority_of(tool_name)
+        self.in_flight -= 1
+        cls.in_flight -= 1
+        if duration is not None:
+            cls.avg_seconds = duration if not cls.avg_seconds else cls.avg_seconds * 0.9 + duration * 0.1
+        self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return in-flight, queue and shedding counters per class."""
+        return {
+            "enabled": self.enabled,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "max_wait": self.max_wait,
+            "classes": {name: cls.stats() for name, cls in self.classes.items()},
+        }
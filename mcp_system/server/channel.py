@@ -0,0 +1,108 @@
+"""Multiplexed tool calls over one WebSocket connection.
+
+/tools/ws carries any number of concurrent tool calls on a single
+persistent connection, so parallel agents don't each open HTTP connections
+and pay per-request overhead. Calls are correlated by a client-chosen id and
+answered as they complete, in any order.
+
+Client -> server (JSON text or binary frames):
+
+    {"id": 7, "tool": "get_list_of_hotels", "parameters": {...},
+     "projection": {...}, "page": {...}, "deadline_ms": 20000}
+    {"id": 7, "cancel": true}
+
+"projection", "page", "hedge" and "deadline_ms" are optional and behave
+like the body fields and X-MCP-Deadline-Ms header of /tools/invoke. A cancel stops a
+call the client stopped waiting for (no reply is sent for it).
+
+Server -> client (binary frames, JSON or msgpack):
+
+    {"id": 7, "result": ...}
+    {"id": 7, "error": {"status_code": 503, "detail": "...", "retry_after": 2}}
+
+The frame format is chosen once per connection with the "accept" query
+parameter (/tools/ws?accept=application/msgpack), like the Accept header of
+/tools/invoke. When the connection closes, calls still running for it are
+cancelled.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import WebSocket
+
+from server.encoding import JSON, dumps
+from server.request_log import log_event
+
+
+# Reply for frames that are not a call or cancel object
+_MALFORMED = {"status_code": 400, "detail": "Each message must be a JSON object with an 'id' and a 'tool'"}
+
+
+async def serve_channel(
+    websocket: WebSocket,
+    run_call: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    media_type: str = JSON
+):
+    """Serve one accepted WebSocket connection until the client goes away.
+
+    Args:
+        websocket: The accepted connection
+        run_call: Runs one call message and returns its {"result": ...} or
+                  {"error": {...}} entry
+        media_type: Encoding of outgoing frames (JSON or msgpack)
+    """
+    outgoing: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+    running: Dict[Any, "asyncio.Task[None]"] = {}
+    calls = 0
+
+    async def send_replies():
+        # One writer, so frames from concurrent calls never interleave
+        while True:
+            message = await outgoing.get()
+            await websocket.send_bytes(dumps(message, media_type))
+
+    async def run(call_id: Any, message: Dict[str, Any]):
+        try:
+            entry = await run_call(message)
+        finally:
+            running.pop(call_id, None)
+        outgoing.put_nowait(dict(entry, id=call_id))
+
+    sender = asyncio.ensure_future(send_replies())
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
+            try:
+                message = json.loads(frame.get("text") or frame.get("bytes") or b"")
+            except ValueError:
+                message = None
+            if not isinstance(message, dict) or "id" not in message:
+                outgoing.put_nowait({"id": None, "error": _MALFORMED})
+                continue
+
+            call_id = message["id"]
+            if message.get("cancel"):
+                task = running.get(call_id)
+                if task is not None:
+                    task.cancel()
+                continue
+            if call_id in running:
+                outgoing.put_nowait({"id": call_id, "error": {
+                    "status_code": 400, "detail": f"Call id {call_id!r} is already in use"
+                }})
+                continue
+            calls += 1
+            running[call_id] = asyncio.ensure_future(run(call_id, message))
+            if sender.done():
+                # The connection broke while sending
+                break
+    finally:
+        for task in list(running.values()):
+            task.cancel()
+        sender.cancel()
+        log_event(logging.INFO, "ws.closed", calls=calls, cancelled=len(running))
@@ -0,0 +1,105 @@
+"""Request deadlines and cancellation for tool calls.
+
+Callers send the time they are still willing to wait in the
+X-MCP-Deadline-Ms header (a relative budget, so client and server clocks
+need not agree). The server keeps the deadline in a context variable for
+the duration of the call, which follows the call onto worker threads:
+
+- FastMCP.invoke() gives up with a 504 when the budget runs out;
+- upstream_call() refuses to start requests after the deadline or after the
+  call was cancelled, and call.timeout(default) shrinks a request timeout
+  to the remaining budget.
+
+A call is cancelled when its caller times out or disconnects and no other
+(coalesced) caller is waiting for it. Async tools are interrupted right
+away; sync tools cannot be stopped mid-request, but make no further
+upstream calls.
+
+Environment variables:
+    MCP_MAX_DEADLINE_MS: Upper bound for a caller's budget. Default 300000.
+"""
+
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+DEADLINE_HEADER = "X-MCP-Deadline-Ms"
+
+# Longest budget a caller may ask for
+MAX_DEADLINE_MS = float(os.getenv("MCP_MAX_DEADLINE_MS", "300000"))
+
+# Shortest timeout handed to an upstream request, so a nearly spent budget
+# still fails with a timeout instead of an invalid value
+MIN_TIMEOUT = 0.05
+
+
+class CallBudget:
+    """Deadline and cancellation flag of one tool execution."""
+
+    __slots__ = ("deadline", "cancelled")
+
+    def __init__(self, deadline: Optional[float] = None):
+        self.deadline = deadline  # time.monotonic() value, or None for no deadline
+        self.cancelled = False
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None without a deadline)."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def cancel(self):
+        """Mark the execution as abandoned by every caller."""
+        self.cancelled = True
+
+
+_budget: contextvars.ContextVar[Optional[CallBudget]] = contextvars.ContextVar("mcp_call_budget", default=None)
+
+
+def current_budget() -> Optional[CallBudget]:
+    """The budget of the tool call running in this context, if any."""
+    return _budget.get()
+
+
+@contextmanager
+def budget_scope(budget: Optional[CallBudget]) -> Iterator[Optional[CallBudget]]:
+    """Make a budget current for the code inside the block."""
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+def parse_deadline(value: Optional[str], max_ms: float = MAX_DEADLINE_MS) -> Optional[float]:
+    """Turn an X-MCP-Deadline-Ms header into an absolute monotonic deadline.
+
+    Raises:
+        ValueError: If the header is not a non-negative number
+    """
+    if value is None or value == "":
+        return None
+    try:
+        budget_ms = float(value)
+    except ValueError:
+        budget_ms = -1.0
+    if budget_ms < 0 or budget_ms != budget_ms:
+        raise ValueError(f"{DEADLINE_HEADER} must be a non-negative number of milliseconds, got {value!r}")
+    return time.monotonic() + min(budget_ms, max_ms) / 1000
+
+
+def clamp_timeout(default: Optional[float]) -> Optional[float]:
+    """Shrink a timeout (seconds, None for none) to the remaining budget."""
+    budget = _budget.get()
+    remaining = budget.remaining() if budget is not None else None
+    if remaining is None:
+        return default
+    remaining = max(remaining, MIN_TIMEOUT)
+    return remaining if default is None else min(default, remaining)
@@ -0,0 +1,476 @@
+"""Dispatch layer for running MCP tools without blocking the event loop."""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from inspect import iscoroutinefunction
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from server.deadline import CallBudget, budget_scope, current_budget
+from server.result_cache import canonical_key
+
+
+# Size of the shared worker pool used for synchronous tools
+DEFAULT_WORKER_THREADS = int(os.getenv("MCP_WORKER_THREADS", "32"))
+
+# Default concurrency caps per upstream service. A tool declares which upstream
+# it talks to in its @mcp.tool decorator; every tool sharing an upstream shares
+# the cap, so one slow API cannot take over the whole worker pool.
+DEFAULT_UPSTREAM_LIMITS = {
+    "serpapi": 8,
+    "liteapi": 10,
+    "tripadvisor": 10,
+    "openweathermap": 8,
+    "exchangerate": 8,
+    "worldtimeapi": 8,
+    "calendarific": 8,
+    "esim": 4,
+    "traveldoc": 2,  # Each call launches a headless browser
+    "openai": 8,
+    "qdrant": 8,
+    "postgres": 10,
+}
+
+
+def _parse_upstream_limits(raw: Optional[str]) -> Dict[str, int]:
+    """Parse an override string such as "serpapi=4,liteapi=6"."""
+    limits = {}
+    if not raw:
+        return limits
+    for entry in raw.split(","):
+        if "=" not in entry:
+            continue
+        name, value = entry.split("=", 1)
+        try:
+            limits[name.strip()] = int(value.strip())
+        except ValueError:
+            print(f"[DISPATCH] Warning: ignoring invalid upstream limit '{entry}'")
+    return limits
+
+
+class ConcurrencyLane:
+    """A concurrency cap with queue-depth accounting.
+
+    A limit of None (or 0) means unlimited; the lane still tracks in-flight
+    calls so the numbers show up in the dispatch stats.
+    """
+
+    def __init__(self, name: str, limit: Optional[int] = None):
+        self.name = name
+        self.limit = limit or None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.max_waiting = 0
+        self.total_wait_ms = 0.0
+
+    async def acquire(self):
+        """Wait for a free slot in the lane."""
+        if self.limit:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.limit)
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            start = time.perf_counter()
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.waiting -= 1
+            self.total_wait_ms += (time.perf_counter() - start) * 1000
+        self.in_flight += 1
+
+    def reset(self):
+        """Drop the semaphore and live counters (used after fork)."""
+        self._semaphore = None
+        self.waiting = 0
+        self.in_flight = 0
+
+    def release(self):
+        """Release a slot acquired with acquire()."""
+        self.in_flight -= 1
+        self.completed += 1
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the lane counters."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait_ms / self.completed, 3) if self.completed else 0.0,
+        }
+
+
+class _ExecutionSlots:
+    """The admission slot and lane slots held by one tool execution.
+
+    A sync tool keeps running on its worker thread after its caller is
+    cancelled, so every worker-pool step of the execution holds the slots
+    as well. They are released when the execution and all of its steps
+    have finished, and the caps keep bounding the work actually running.
+    Used from the event loop only.
+    """
+
+    def __init__(self, tool_name: str, admission: Optional[Any]):
+        self.tool_name = tool_name
+        self.admission = admission
+        self.admitted_at: Optional[float] = None
+        self.lanes = []
+        self._holders = 1
+
+    async def acquire(self, lanes):
+        """Wait for admission, then for each lane in order."""
+        if self.admission is not None:
+            await self.admission.acquire(self.tool_name)
+            self.admitted_at = time.perf_counter()
+        for lane in lanes:
+            await lane.acquire()
+            self.lanes.append(lane)
+
+    def hold(self):
+        """Keep the slots until a matching release()."""
+        self._holders += 1
+
+    def release(self):
+        """Drop one hold, freeing the slots with the last one."""
+        self._holders -= 1
+        if self._holders:
+            return
+        for lane in reversed(self.lanes):
+            lane.release()
+        if self.admitted_at is not None:
+            self.admission.release(self.tool_name, time.perf_counter() - self.admitted_at)
+
+
+class ToolDispatcher:
+    """Runs tool functions with per-tool and per-upstream concurrency caps.
+
+    Async tools are awaited on the event loop. Sync tools run on a bounded
+    thread pool so a slow upstream call never freezes the server.
+
+    Each execution runs under its own CallBudget carrying the caller's
+    deadline (see server/deadline.py), which is marked cancelled when every
+    caller has gone away so the tool stops making upstream calls.
+
+    With an admission controller, each execution is admitted before it
+    enters its lanes. Callers joining a coalesced execution already in
+    flight share its admission slot instead of taking one each. A sync
+    execution keeps its slots until its worker thread is done, even when
+    every caller has been cancelled.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        upstream_limits: Optional[Dict[str, int]] = None,
+        admission: Optional[Any] = None
+    ):
+        """Initialize the dispatcher.
+
+        Args:
+            max_workers: Size of the worker pool for sync tools
+            upstream_limits: Concurrency caps per upstream service (defaults to
+                            DEFAULT_UPSTREAM_LIMITS plus MCP_UPSTREAM_LIMITS overrides)
+            admission: AdmissionController every execution must pass (see
+                      server/admission.py), or None to admit everything
+        """
+        self.max_workers = max_workers or DEFAULT_WORKER_THREADS
+        self.admission = admission
+        self.upstream_limits = dict(DEFAULT_UPSTREAM_LIMITS)
+        self.upstream_limits.update(_parse_upstream_limits(os.getenv("MCP_UPSTREAM_LIMITS")))
+        if upstream_limits:
+            self.upstream_limits.update(upstream_limits)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._tool_config: Dict[str, Dict[str, Any]] = {}
+        self._tool_lanes: Dict[str, ConcurrencyLane] = {}
+        self._upstream_lanes: Dict[str, ConcurrencyLane] = {}
+        self._in_flight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._waiters: Dict["asyncio.Future[Any]", int] = {}
+        self._coalesced: Dict[str, int] = {}
+        self._counter_lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """Reset per-process state in a forked worker.
+
+        Pool threads, locks and semaphores do not survive fork(); the child
+        builds its own on first use.
+        """
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._in_flight = {}
+        self._waiters = {}
+        for lane in list(self._tool_lanes.values()) + list(self._upstream_lanes.values()):
+            lane.reset()
+
+    def configure_tool(
+        self,
+        tool_name: str,
+        max_concurrency: Optional[int] = None,
+        upstream: Optional[str] = None,
+        coalesce: bool = True
+    ):
+        """Register the concurrency settings declared for a tool.
+
+        Args:
+            tool_name: Name of the tool
+            max_concurrency: Maximum concurrent calls of this tool (None for unlimited)
+            upstream: Name of the upstream service the tool calls, if any
+            coalesce: Share one execution between identical concurrent calls
+        """
+        self._tool_config[tool_name] = {
+            "max_concurrency": max_concurrency,
+            "upstream": upstream,
+            "coalesce": coalesce
+        }
+        self._tool_lanes[tool_name] = ConcurrencyLane(tool_name, max_concurrency)
+        if upstream and upstream not in self._upstream_lanes:
+            self._upstream_lanes[upstream] = ConcurrencyLane(upstream, self.upstream_limits.get(upstream))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get or create the worker pool."""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="mcp-tool"
+                    )
+        return self._executor
+
+    def _lanes_for(self, tool_name: str):
+        """Return the lanes a call must pass through, in acquisition order."""
+        lanes = []
+        tool_lane = self._tool_lanes.get(tool_name)
+        if tool_lane is None:
+            tool_lane = self._tool_lanes[tool_name] = ConcurrencyLane(tool_name)
+        lanes.append(tool_lane)
+        upstream = self._tool_config.get(tool_name, {}).get("upstream")
+        if upstream:
+            lanes.append(self._upstream_lanes[upstream])
+        return lanes
+
+    async def run(self, tool_name: str, func: Callable, parameters: Dict[str, Any], coalesce: bool = True) -> Any:
+        """Run a tool function under its concurrency caps.
+
+        Identical concurrent calls (same tool and canonical parameters) of a
+        coalescing tool share one execution: later callers wait for the call
+        already in flight instead of issuing their own upstream request. The
+        shared execution runs under the first caller's deadline, and is
+        cancelled only when every caller waiting on it has been cancelled.
+
+        Args:
+            tool_name: Name of the tool being invoked
+            func: The registered tool function
+            parameters: Keyword arguments for the tool
+            coalesce: False to run a separate execution even for a
+                      coalescing tool (hedged requests, which exist to avoid
+                      waiting on the slow execution already in flight)
+
+        Returns:
+            The tool result
+
+        Raises:
+            Overloaded: If the execution was shed by admission control
+        """
+        if not coalesce or not self._tool_config.get(tool_name, {}).get("coalesce", True):
+            return await self._run(tool_name, func, parameters)
+
+        key = canonical_key(tool_name, parameters)
+        loop = asyncio.get_running_loop()
+        task = self._in_flight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._run(tool_name, func, parameters))
+            self._in_flight[key] = task
+            task.add_done_callback(functools.partial(self._call_finished, key))
+        else:
+            self._coalesced[tool_name] = self._coalesced.get(tool_name, 0) + 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # A caller going away must not cancel the call for the others waiting on it
+            return await asyncio.shield(task)
+        finally:
+            waiters = self._waiters.pop(task, 1) - 1
+            if waiters:
+                self._waiters[task] = waiters
+            elif not task.done():
+                task.cancel()
+
+    def _call_finished(self, key: str, task: "asyncio.Future[Any]"):
+        """Forget a finished coalesced call."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every caller went away
+            task.exception()
+
+    @staticmethod
+    def _execution_budget(caller: Optional[CallBudget] = None) -> CallBudget:
+        """A fresh budget for one execution, with the caller's deadline."""
+        caller = caller or current_budget()
+        return CallBudget(caller.deadline if caller is not None else None)
+
+    async def _run(self, tool_name: str, func: Callable, parameters: Dict[str, Any]) -> Any:
+        """Run one tool execution inside its admission slot and concurrency lanes."""
+        slots = _ExecutionSlots(tool_name, self.admission)
+        budget = self._execution_budget()
+        try:
+            await slots.acquire(self._lanes_for(tool_name))
+
+            with budget_scope(budget):
+                if iscoroutinefunction(func):
+                    return await func(**parameters)
+                # The worker thread gets a copy of this context, budget included
+                return await self.run_sync(functools.partial(func, **parameters), slots)
+        except asyncio.CancelledError:
+            # A sync tool keeps running on its thread; stop its further upstream calls
+            budget.cancel()
+            raise
+        finally:
+            slots.release()
+
+    async def stream(
+        self,
+        tool_name: str,
+        func: Callable,
+        parameters: Dict[str, Any],
+        caller: Optional[CallBudget] = None
+    ) -> AsyncIterator[Any]:
+        """Iterate a streaming tool generator under the tool's concurrency caps.
+        
+        Sync generators are advanced one item at a time on the worker pool,
+        so each sub-fetch runs off the event loop.
+        
+        Args:
+            tool_name: Name of the tool being streamed
+            func: Generator function (sync or async) registered for the tool
+            parameters: Keyword arguments for the generator
+            caller: Budget of the caller (defaults to the current one)
+        
+        Yields:
+            Items produced by the generator
+        """
+        slots = _ExecutionSlots(tool_name, self.admission)
+        budget = self._execution_budget(caller)
+        try:
+            # The admission wait is bounded by the caller's deadline
+            with budget_scope(caller or current_budget()):
+                await slots.acquire(self._lanes_for(tool_name))
+
+            # The budget is made current around each step only, never across a yield
+            events = func(**parameters)
+            if hasattr(events, "__aiter__"):
+                while True:
+                    with budget_scope(budget):
+                        try:
+                            item = await events.__anext__()
+                        except StopAsyncIteration:
+                            break
+                    yield item
+                return
+
+            done = object()
+            try:
+                while True:
+                    with budget_scope(budget):
+                        item = await self.run_sync(functools.partial(next, events, done), slots)
+                    if item is done:
+                        break
+                    yield item
+            finally:
+                try:
+                    events.close()
+                except ValueError:
+                    # Still running on a worker thread after cancellation
+                    pass
+        except (asyncio.CancelledError, GeneratorExit):
+            # The consumer went away; stop further upstream calls
+            budget.cancel()
+            raise
+        finally:
+            slots.release()
+
+    async def run_sync(self, call: Callable[[], Any], slots: Optional[_ExecutionSlots] = None) -> Any:
+        """Run a blocking callable on the worker pool.
+
+        The caller's context variables are copied into the worker thread.
+        Cancelling the caller cancels the call only while it is queued; once
+        running it finishes on its thread, and `slots` (if given) are held
+        until then.
+        """
+        ctx = contextvars.copy_context()
+
+        def _run():
+            with self._counter_lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return ctx.run(call)
+            finally:
+                with self._counter_lock:
+                    self._running -= 1
+
+        loop = asyncio.get_running_loop()
+        with self._counter_lock:
+            self._queued += 1
+        if slots is not None:
+            slots.hold()
+        try:
+            future = self._get_executor().submit(_run)
+        except BaseException:
+            with self._counter_lock:
+                self._queued -= 1
+            if slots is not None:
+                slots.release()
+            raise
+        future.add_done_callback(functools.partial(self._call_done, loop, slots))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _call_done(self, loop: asyncio.AbstractEventLoop, slots: Optional[_ExecutionSlots], future):
+        """Settle the counters and slots of a finished or cancelled worker-pool call."""
+        if future.cancelled():
+            # Cancelled while queued: _run never started
+            with self._counter_lock:
+                self._queued -= 1
+        if slots is not None:
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:
+                # The loop is closed; its semaphores went with it
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue-depth and in-flight counters for the pool and every lane."""
+        return {
+            "workers": {
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "queued": self._queued,
+            },
+            "tools": {
+                name: dict(lane.stats(), coalesced=self._coalesced.get(name, 0))
+                for name, lane in self._tool_lanes.items()
+            },
+            "upstreams": {name: lane.stats() for name, lane in self._upstream_lanes.items()},
+        }
+
+    def shutdown(self, wait: bool = False):
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,132 @@
+"""Response encoding and compression for tool results.
+
+Clients choose the body format with the Accept header and the compression
+with Accept-Encoding:
+
+- application/msgpack (when msgpack is installed) is smaller than JSON and
+  much cheaper to parse;
+- application/json is the default, encoded with orjson when installed and
+  the stdlib encoder otherwise;
+- bodies larger than MCP_COMPRESS_MIN_BYTES are compressed with zstd (when
+  zstandard is installed) or gzip.
+
+Environment variables:
+    MCP_COMPRESS_MIN_BYTES: Smallest body that is compressed. Default 4096.
+    MCP_COMPRESSION: Set to "0" to never compress responses. Default enabled.
+    MCP_GZIP_LEVEL: gzip compression level. Default 5.
+    MCP_ZSTD_LEVEL: zstd compression level. Default 3.
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+# Smallest body worth compressing; below this the headers dominate
+COMPRESS_MIN_BYTES = int(os.getenv("MCP_COMPRESS_MIN_BYTES", "4096"))
+COMPRESSION_ENABLED = os.getenv("MCP_COMPRESSION", "1") != "0"
+GZIP_LEVEL = int(os.getenv("MCP_GZIP_LEVEL", "5"))
+ZSTD_LEVEL = int(os.getenv("MCP_ZSTD_LEVEL", "3"))
+
+_zstd_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if zstandard is not None else None
+
+
+def _default(value: Any) -> Any:
+    """Fallback for values the encoders do not handle natively."""
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _accepts(header: str, media_type: str) -> bool:
+    """Whether an Accept/Accept-Encoding header lists a value with q > 0."""
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == media_type:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Pick the body format for an Accept header (msgpack only when asked for)."""
+    if accept and msgpack is not None and _accepts(accept, MSGPACK):
+        return MSGPACK
+    return JSON
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the content coding for an Accept-Encoding header, or None."""
+    if not COMPRESSION_ENABLED or not accept_encoding:
+        return None
+    if _zstd_compressor is not None and _accepts(accept_encoding, "zstd"):
+        return "zstd"
+    if _accepts(accept_encoding, "gzip"):
+        return "gzip"
+    return None
+
+
+def dumps(payload: Any, media_type: str = JSON) -> bytes:
+    """Serialize a payload as msgpack or JSON."""
+    if media_type == MSGPACK:
+        return msgpack.packb(payload, default=_default, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with "zstd" or "gzip"."""
+    if encoding == "zstd":
+        return _zstd_compressor.compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def encode_body(payload: Any, accept: Optional[str], accept_encoding: Optional[str]) -> Tuple[bytes, str, Optional[str]]:
+    """Serialize and (above the size threshold) compress a payload.
+
+    Returns:
+        (body, media type, content coding or None)
+    """
+    media_type = negotiate_format(accept)
+    body = dumps(payload, media_type)
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding is not None:
+        body = compress(body, encoding)
+    return body, media_type, encoding
+
+
+def encoded_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    """Build a response in the format and compression the client asked for."""
+    body, media_type, encoding = encode_body(
+        payload,
+        request.headers.get("accept"),
+        request.headers.get("accept-encoding")
+    )
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
@@ -0,0 +1,304 @@
+"""Tool-invocation journal and replay stubs.
+
+With MCP_JOURNAL set, every tool call handled by FastMCP.invoke() (and
+/tools/invoke_stream) appends one compact JSON line to that file:
+
+    {"t":1760000000.123,"tool":"get_list_of_hotels","p":{...},"ms":412.5,"b":48213,"c":"miss","s":200}
+
+    t     Wall-clock time the call started (seconds since the epoch)
+    tool  Tool name
+    p     Parameters, normalized with the tool's cache key normalizers
+    ms    Server-side duration in milliseconds
+    b     Size of the JSON-encoded tool result in bytes (before projection
+          and paging; 0 when the call raised)
+    c     "hit" or "miss" for tools with a cache policy, absent otherwise
+    s     HTTP status of the call (200, or the 4xx/5xx it was mapped to)
+    e     error_code of a tool error result, when there is one
+
+Lines are handed to a background writer thread through a bounded queue
+(calls are dropped, and counted, rather than blocking the event loop) and
+written with O_APPEND, so worker processes can share one file. The result
+size is measured on the writer thread.
+
+benchmarks/replay_journal.py re-issues a journal against a server started
+with MCP_REPLAY_STUBS pointing at the same file. In that mode every tool is
+replaced by a stub that sleeps for the recorded duration and returns a
+payload of the recorded size (or the recorded error), so traffic can be
+replayed at any speed without calling the real upstream APIs.
+
+Environment variables:
+    MCP_JOURNAL: Path of the journal file. Journaling is off when unset.
+    MCP_JOURNAL_QUEUE: Calls buffered for the writer before new ones are
+        dropped. Default 10000.
+    MCP_REPLAY_STUBS: Journal file to build replay stubs from (replay
+        servers only).
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from server.result_cache import CachePolicy, canonical_params
+
+
+JOURNAL_PATH = os.getenv("MCP_JOURNAL", "")
+QUEUE_SIZE = int(os.getenv("MCP_JOURNAL_QUEUE", "10000"))
+
+# Lines written per os.write() call at most
+WRITE_BATCH = 256
+
+_STOP = object()
+
+
+def _result_size(result: Any) -> int:
+    try:
+        return len(json.dumps(result, ensure_ascii=False, default=str).encode("utf-8"))
+    except Exception:
+        return 0
+
+
+class InvocationJournal:
+    """Append-only record of tool calls, written off the event loop."""
+
+    def __init__(self, path: Optional[str] = None, queue_size: int = QUEUE_SIZE):
+        """Initialize the journal.
+
+        Args:
+            path: File to append to; the journal is disabled when empty
+            queue_size: Calls buffered for the writer thread
+        """
+        self.path = JOURNAL_PATH if path is None else path
+        self.queue_size = queue_size
+        self._queue: "queue.Queue[Any]" = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "dropped": 0, "written": 0, "bytes_written": 0, "write_errors": 0}
+        if self.path:
+            atexit.register(self.close)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """The writer thread does not survive a fork; a worker starts its own."""
+        self._queue = queue.Queue(self.queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(self._stats, 0)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def record(
+        self,
+        tool_name: str,
+        parameters: Dict[str, Any],
+        start: float,
+        cache: Optional[str] = None,
+        result: Any = None,
+        status: int = 200,
+        policy: Optional[CachePolicy] = None
+    ):
+        """Queue one call for the journal (does nothing when disabled).
+
+        Args:
+            tool_name: Tool that was called
+            parameters: Parameters as received (normalized on the writer thread)
+            start: time.perf_counter() value at the start of the call
+            cache: "hit", "miss", or None for tools without a cache policy
+            result: Tool result, measured on the writer thread (treated as read-only)
+            status: HTTP status the call was mapped to
+            policy: The tool's cache policy, whose normalizers are applied to the parameters
+        """
+        if not self.path:
+            return
+        elapsed = time.perf_counter() - start
+        entry = (time.time() - elapsed, tool_name, parameters, elapsed * 1000, cache, result, status, policy)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self._stats["dropped"] += 1
+            return
+        self._stats["recorded"] += 1
+        if self._thread is None:
+            self._start_writer()
+
+    def _start_writer(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="mcp-journal", daemon=True)
+                self._thread.start()
+
+    def _writer(self):
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        except OSError as e:
+            print(f"[JOURNAL] Warning: cannot open {self.path} ({e}), journaling disabled")
+            self.path = ""
+            return
+        try:
+            while True:
+                entries = [self._queue.get()]
+                while len(entries) < WRITE_BATCH:
+                    try:
+                        entries.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = any(entry is _STOP for entry in entries)
+                lines = [self._format(entry) for entry in entries if entry is not _STOP]
+                if lines:
+                    data = "".join(lines).encode("utf-8")
+                    try:
+                        os.write(fd, data)
+                        self._stats["written"] += len(lines)
+                        self._stats["bytes_written"] += len(data)
+                    except OSError as e:
+                        self._stats["write_errors"] += 1
+                        print(f"[JOURNAL] Warning: write to {self.path} failed ({e})")
+                if stop:
+                    return
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _format(entry: Tuple[Any, ...]) -> str:
+        started_at, tool_name, parameters, duration_ms, cache, result, status, policy = entry
+        if policy is not None:
+            try:
+                parameters = policy.normalize(parameters)
+            except Exception:
+                pass
+        line: Dict[str, Any] = {
+            "t": round(started_at, 3),
+            "tool": tool_name,
+            "p": parameters,
+            "ms": round(duration_ms, 2),
+            "b": _result_size(result) if status == 200 else 0,
+        }
+        if cache is not None:
+            line["c"] = cache
+        line["s"] = status
+        if isinstance(result, dict) and result.get("error"):
+            line["e"] = str(result.get("error_code") or "error")
+        return json.dumps(line, ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+
+    def close(self, timeout: float = 5.0):
+        """Write out queued calls and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the journal path and recorded/dropped/written counters."""
+        return dict(self._stats, enabled=self.enabled, path=self.path or None, queued=self._queue.qsize())
+
+
+def read_journal(path: str) -> List[Dict[str, Any]]:
+    """Read a journal file, oldest call first.
+
+    Lines that do not parse (e.g., one cut short by a crash) are skipped.
+    """
+    entries = []
+    with open(path, encoding="utf-8") as journal_file:
+        for line in journal_file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and "tool" in entry and "t" in entry:
+                entries.append(entry)
+    entries.sort(key=lambda entry: entry["t"])
+    return entries
+
+
+# (duration in seconds, result size in bytes, error_code, status)
+_Sample = Tuple[float, int, Optional[str], int]
+
+
+class ReplayStubs:
+    """Stand-ins for tool functions that replay recorded durations and result sizes.
+
+    Only calls that ran the tool (cache misses and uncached tools) are used;
+    cache hits are served by the replay server's own cache. Each call gets
+    the next recorded sample for the same tool and parameters, or a sample
+    of the same tool when those parameters were never recorded.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self._calls: Dict[Tuple[str, str], List[_Sample]] = {}
+        self._tools: Dict[str, List[_Sample]] = {}
+        self._next: Dict[Any, int] = {}
+        for entry in entries:
+            if entry.get("c") == "hit" or entry.get("s", 200) not in (200, 500):
+                continue
+            sample = (entry.get("ms", 0.0) / 1000, entry.get("b", 0), entry.get("e"), entry.get("s", 200))
+            key = (entry["tool"], canonical_params(entry.get("p") or {}))
+            self._calls.setdefault(key, []).append(sample)
+            self._tools.setdefault(entry["tool"], []).append(sample)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ReplayStubs":
+        stubs = cls(read_journal(path))
+        print(f"[JOURNAL] Replay stubs loaded from {path}: {len(stubs._calls)} distinct calls of {len(stubs._tools)} tools")
+        return stubs
+
+    def _sample(self, tool_name: str, parameters: Dict[str, Any]) -> _Sample:
+        key = (tool_name, canonical_params(parameters))
+        samples = self._calls.get(key)
+        if samples is None:
+            key = tool_name
+            samples = self._tools.get(tool_name)
+            if not samples:
+                return 0.0, 0, None, 200
+        index = self._next.get(key, 0)
+        self._next[key] = index + 1
+        return samples[index % len(samples)]
+
+    @staticmethod
+    def _payload(tool_name: str, sample: _Sample) -> Dict[str, Any]:
+        _, size, error_code, status = sample
+        if status != 200:
+            raise RuntimeError(f"Replayed failure of '{tool_name}'")
+        if error_code:
+            return {
+                "error": True,
+                "error_code": error_code,
+                "error_message": f"Replayed {error_code} error",
+                "suggestion": "This is a recorded error replayed by the journal stubs."
+            }
+        # Pad to the recorded size (the envelope itself takes ~30 bytes)
+        return {"replayed": tool_name, "data": "x" * max(size - 30 - len(tool_name), 0)}
+
+    def wrap(self, tool_name: str, func: Callable) -> Callable:
+        """Return a stub with the same sync/async kind as func, so it runs where the tool would."""
+        if iscoroutinefunction(func):
+            async def stub(**parameters):
+                sample = self._sample(tool_name, parameters)
+                await asyncio.sleep(sample[0])
+                return self._payload(tool_name, sample)
+        else:
+            def stub(**parameters):
+                sample = self._sample(tool_name, parameters)
+                time.sleep(sample[0])
+                return self._payload(tool_name, sample)
+        return stub
+
+
+def load_replay_stubs() -> Optional[ReplayStubs]:
+    """Build replay stubs from MCP_REPLAY_STUBS, or None when it is not set."""
+    path = os.getenv("MCP_REPLAY_STUBS")
+    if not path:
+        return None
+    return ReplayStubs.from_file(path)
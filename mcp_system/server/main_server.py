@@ -1,16 +1,18 @@
 """Main MCP server for Travel Agent Tools."""
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, List, get_origin, get_args, Optional
+from fastapi import FastAPI, HTTPException, Request, WebSocket
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from typing import Dict, Any, List, get_origin, get_args, Optional, AsyncIterator, Awaitable, Tuple
 import uvicorn
-from inspect import signature, getdoc, iscoroutinefunction
+import asyncio
+from inspect import signature, getdoc
 import json
+import hashlib
+import logging
 import sys
 import os
-import traceback
+import time
 from pathlib import Path
-from datetime import datetime
 from dotenv import load_dotenv
 
 # Load .env file from project root (works both locally and in Docker)
@@ -24,6 +26,8 @@ else:
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Project root, for packages shared with the frontend (diagnostics)
+sys.path.append(str(project_root))
 
 from tools.hotel_tools import register_hotel_tools
 from tools.coordinator_tools import register_coordinator_tools
@@ -33,6 +37,38 @@ from tools.flight_tools import register_flight_tools
 from tools.utilities_tools import register_utilities_tools
 from tools.memory_tools import register_memory_tools
 from tools.planner_tools import register_planner_tools
+from server.dispatch import ToolDispatcher
+from server.result_cache import CachePolicy, ResultCache
+from server.multiprocess import serve
+from server.encoding import encoded_response, negotiate_format
+from server.channel import serve_channel
+from server.projection import Projection
+from server.result_store import PagePolicy, ResultStore
+from server.admission import INTERACTIVE, AdmissionController, Overloaded
+from server.journal import InvocationJournal, load_replay_stubs
+from server.deadline import DEADLINE_HEADER, CallBudget, budget_scope, current_budget, parse_deadline
+from tools.upstream import upstream_stats
+from diagnostics.loop_monitor import blocking_detector
+from diagnostics.profiler import (
+    PROFILE_FORMATS, ProfilerBusy, admin_token_enabled, check_admin_token, cpu_profiler, memory_profiler
+)
+from server.request_log import LazyPayload, log_event, payloads_enabled, stop_logging
+from server.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, LoopLagMonitor, loop_lag, loop_lag_last, metrics,
+    tool_duration, tool_errors, tool_in_flight
+)
+
+
+# Maximum number of calls accepted by /tools/invoke_batch
+MAX_BATCH_SIZE = int(os.getenv("MCP_MAX_BATCH_SIZE", "50"))
+
+# Expose /metrics and run the event-loop lag probe
+METRICS_ENABLED = os.getenv("MCP_METRICS", "1") != "0"
+
+
+def _elapsed_ms(start: float) -> float:
+    """Milliseconds since a time.perf_counter() start value."""
+    return round((time.perf_counter() - start) * 1000, 2)
 
 
 class FastMCP:
@@ -47,14 +83,54 @@ class FastMCP:
         self.name = name
         self.app = FastAPI(title=name)
         self.tools: Dict[str, Any] = {}
+        self._catalog: Optional[Tuple[bytes, str]] = None
+        self.admission = AdmissionController()
+        self.dispatcher = ToolDispatcher(admission=self.admission)
+        self.cache = ResultCache()
+        self.result_store = ResultStore()
+        self.journal = InvocationJournal()
+        self.replay_stubs = load_replay_stubs()
+        self.loop_monitor = LoopLagMonitor(loop_lag, loop_lag_last)
+        self._register_metrics()
         self._setup_routes()
+        self._setup_admin_routes()
     
-    def tool(self, description: Optional[str] = None):
+    def tool(
+        self,
+        description: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        upstream: Optional[str] = None,
+        cache: Optional[CachePolicy] = None,
+        coalesce: bool = True,
+        priority: str = INTERACTIVE,
+        pages: Optional[PagePolicy] = None,
+        idempotent: Optional[bool] = None
+    ):
         """Decorator to register a tool.
         
         Args:
             description: Optional description for the tool. If not provided,
                         will be extracted from the function's docstring.
+            max_concurrency: Optional cap on concurrent calls of this tool.
+            upstream: Optional name of the external service the tool calls
+                     (e.g., "liteapi"). Tools sharing an upstream share its
+                     concurrency cap.
+            cache: Optional CachePolicy. Results of identical calls are
+                  reused until the policy's TTL expires.
+            coalesce: Share one execution between identical concurrent
+                     calls. Set to False for tools with side effects
+                     (bookings, writes).
+            priority: Admission class, "interactive" (default) or
+                     "background" for work no user is waiting on. Under
+                     load, background calls are queued behind interactive
+                     ones and shed first (see server/admission.py).
+            pages: Optional PagePolicy naming result lists callers may
+                  page through with fetch_page instead of receiving them
+                  whole (see server/result_store.py).
+            idempotent: Whether repeating a call is harmless, so clients may
+                       retry it after an ambiguous failure and hedge it.
+                       Published in /tools/list. Defaults to coalesce
+                       (tools with side effects set coalesce=False).
         
         Returns:
             Decorator function
@@ -148,16 +224,452 @@ class FastMCP:
                 "returns": {
                     "type": output_type,
                     "description": f"Result from {tool_name}"
-                }
+                },
+                "idempotent": coalesce if idempotent is None else idempotent
             }
             
             # Store the function for invocation
             self.tools[tool_name]["_func"] = func
+            self._catalog = None
+            self.dispatcher.configure_tool(
+                tool_name,
+                max_concurrency=max_concurrency,
+                upstream=upstream,
+                coalesce=coalesce
+            )
+            self.cache.configure_tool(tool_name, cache)
+            self.admission.configure_tool(tool_name, priority)
+            self.result_store.configure_tool(tool_name, pages)
             
             return func  # Return the original function so it can still be called
         
         return decorator  # Return the decorator function
     
+    def streamer(self, tool_name: str):
+        """Decorator to register a streaming variant of an existing tool.
+        
+        The decorated function takes the same parameters as the tool and
+        returns a generator (sync or async) yielding ("partial", payload)
+        events as sub-results complete, then one ("result", payload) event.
+        It is used by /tools/invoke_stream; /tools/invoke is unchanged.
+        
+        Args:
+            tool_name: Name of the already-registered tool
+        
+        Returns:
+            Decorator function
+        """
+        def decorator(func):
+            if tool_name not in self.tools:
+                raise ValueError(f"Cannot register streamer for unknown tool '{tool_name}'")
+            self.tools[tool_name]["_stream"] = func
+            self._catalog = None
+            return func
+        
+        return decorator
+    
+    async def invoke(self, tool_name: str, parameters: Dict[str, Any], hedge: bool = False) -> Any:
+        """Invoke a registered tool.
+        
+        Args:
+            tool_name: Name of the tool to invoke
+            parameters: Keyword arguments for the tool
+            hedge: The call is a client's hedge of a slow identical call;
+                   it gets its own execution instead of joining that one
+        
+        Returns:
+            Tool result
+        
+        Runs under the deadline of the current request, if any (see
+        server/deadline.py); a cache hit is returned even past the deadline.
+        
+        Raises:
+            HTTPException: 404 if the tool is unknown, 400 for invalid
+                          parameters, 500 if the tool raised, 503 (with
+                          Retry-After) if the call was shed under load,
+                          504 if the deadline passed first
+        """
+        parameters = parameters or {}
+        log_payloads = payloads_enabled()
+        if log_payloads:
+            log_event(logging.DEBUG, "tool.params", tool=tool_name, params=LazyPayload(parameters, 2000))
+        
+        tool_func = self._get_tool_func(tool_name)
+        if self.replay_stubs is not None:
+            tool_func = self.replay_stubs.wrap(tool_name, tool_func)
+        
+        start = time.perf_counter()
+        cache_key, hit, result = await self.cache.get(tool_name, parameters)
+        if hit:
+            self._observe_result(tool_name, result, start)
+            log_event(logging.INFO, "tool.call", tool=tool_name, status="ok",
+                      duration_ms=_elapsed_ms(start), cache="hit")
+            self._journal(tool_name, parameters, start, "hit", result)
+            return result
+        cache_status = "miss" if cache_key is not None else None
+        
+        budget = current_budget()
+        remaining = budget.remaining() if budget is not None else None
+        tool_in_flight.inc(tool_name)
+        try:
+            if remaining is not None and remaining <= 0:
+                raise asyncio.TimeoutError()
+            # Async tools run on the event loop, sync tools on the worker pool;
+            # admission is taken by the execution, once per coalesced group
+            call = self.dispatcher.run(tool_name, tool_func, parameters, coalesce=not hedge)
+            result = await (asyncio.wait_for(call, remaining) if remaining is not None else call)
+        except Overloaded as e:
+            raise self._tool_error(tool_name, self._overloaded_error(e), start, parameters, cache_status)
+        except asyncio.TimeoutError as e:
+            if remaining is None:
+                raise self._tool_error(tool_name, e, start, parameters, cache_status)
+            error = HTTPException(status_code=504, detail=f"Deadline exceeded for tool '{tool_name}'")
+            raise self._tool_error(tool_name, error, start, parameters, cache_status)
+        except Exception as e:
+            raise self._tool_error(tool_name, e, start, parameters, cache_status)
+        finally:
+            tool_in_flight.dec(tool_name)
+        
+        if cache_key is not None:
+            await self.cache.set(tool_name, cache_key, result)
+        self._observe_result(tool_name, result, start)
+        log_event(logging.INFO, "tool.call", tool=tool_name, status="ok", duration_ms=_elapsed_ms(start))
+        self._journal(tool_name, parameters, start, cache_status, result)
+        if log_payloads:
+            log_event(logging.DEBUG, "tool.result", tool=tool_name, result=LazyPayload(result))
+        return result
+    
+    @staticmethod
+    def _overloaded_error(error: Overloaded) -> HTTPException:
+        """Map a shed call to a 503 with Retry-After."""
+        return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": str(error.retry_after)})
+    
+    @staticmethod
+    def _error_entry(error: HTTPException) -> Dict[str, Any]:
+        """Describe a failed call inside a batch or stream response."""
+        entry = {"status_code": error.status_code, "detail": error.detail}
+        if error.headers and "Retry-After" in error.headers:
+            entry["retry_after"] = int(error.headers["Retry-After"])
+        return entry
+    
+    @staticmethod
+    def _require_admin(http_request: Request):
+        """Reject requests without the ADMIN_TOKEN bearer token."""
+        if not admin_token_enabled():
+            raise HTTPException(status_code=404, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+        if not check_admin_token(http_request.headers.get("authorization")):
+            raise HTTPException(status_code=401, detail="Invalid or missing admin token",
+                                headers={"WWW-Authenticate": "Bearer"})
+    
+    def _get_catalog(self) -> Tuple[bytes, str]:
+        """Return the serialized tool catalog and its ETag.
+        
+        The catalog is built on first use after a registration change and
+        reused for every /tools/list request until the next change.
+        """
+        if self._catalog is None:
+            tools_list = [
+                {
+                    "name": tool["name"],
+                    "description": tool["description"],
+                    "inputSchema": tool["inputSchema"],
+                    "returns": tool.get("returns", {"type": "object"}),
+                    "streaming": "_stream" in tool,
+                    "pageable": tool["name"] in self.result_store.policies,
+                    "idempotent": tool["idempotent"]
+                }
+                for tool in self.tools.values()
+                if "_func" in tool
+            ]
+            tools_json = json.dumps(tools_list, ensure_ascii=False, sort_keys=True)
+            version = hashlib.sha256(tools_json.encode("utf-8")).hexdigest()[:16]
+            body = json.dumps({"version": version, "tools": tools_list}, ensure_ascii=False).encode("utf-8")
+            self._catalog = (body, f'"{version}"')
+        return self._catalog
+    
+    def _get_tool_func(self, tool_name: str):
+        """Look up a registered tool function.
+        
+        Raises:
+            HTTPException: 404 if the tool is unknown, 500 if it is not callable
+        """
+        if tool_name not in self.tools:
+            error_msg = f"Tool '{tool_name}' not found"
+            log_event(logging.WARNING, "tool.call", tool=tool_name, status=404, error=error_msg)
+            raise HTTPException(status_code=404, detail=error_msg)
+        
+        tool_func = self.tools[tool_name].get("_func")
+        if not tool_func:
+            error_msg = f"Tool '{tool_name}' not callable"
+            log_event(logging.ERROR, "tool.call", tool=tool_name, status=500, error=error_msg)
+            raise HTTPException(status_code=500, detail=error_msg)
+        return tool_func
+    
+    def _parse_projection(self, spec: Any) -> Optional[Projection]:
+        """Compile a request's projection spec, mapping bad specs to a 400."""
+        try:
+            return Projection.from_spec(spec)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid projection: {e}")
+    
+    def _parse_page(self, tool_name: str, spec: Any) -> Optional[int]:
+        """Resolve a request's page spec to a page size, mapping bad specs to a 400."""
+        if not spec:
+            return None
+        self._get_tool_func(tool_name)
+        try:
+            return self.result_store.page_size(tool_name, spec)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid page: {e}")
+    
+    async def _shape_result(
+        self,
+        tool_name: str,
+        result: Any,
+        projection: Optional[Projection],
+        page_size: Optional[int]
+    ) -> Any:
+        """Apply a request's projection, then cut pageable lists to their first page."""
+        if projection is not None:
+            result = projection.apply(result)
+        if page_size is not None:
+            result = await self.result_store.paginate(tool_name, result, page_size)
+        return result
+    
+    async def _call_entry(self, call: Any) -> Dict[str, Any]:
+        """Run one {tool, parameters, projection, page, hedge} call of a batch or channel.
+        
+        Returns:
+            {"result": ...}, or {"error": {"status_code": ..., "detail": ...}}
+        """
+        if not isinstance(call, dict):
+            return {"error": {"status_code": 400, "detail": "Each call must be a {tool, parameters} object"}}
+        try:
+            projection = self._parse_projection(call.get("projection"))
+            page_size = self._parse_page(call.get("tool"), call.get("page"))
+            result = await self.invoke(call.get("tool"), call.get("parameters", {}), bool(call.get("hedge")))
+            return {"result": await self._shape_result(call.get("tool"), result, projection, page_size)}
+        except HTTPException as e:
+            return {"error": self._error_entry(e)}
+    
+    async def _channel_call(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one call received on /tools/ws under its own deadline."""
+        try:
+            deadline = parse_deadline(None if message.get("deadline_ms") is None else str(message["deadline_ms"]))
+        except ValueError as e:
+            return {"error": {"status_code": 400, "detail": str(e)}}
+        with budget_scope(CallBudget(deadline) if deadline is not None else None):
+            return await self._call_entry(message)
+    
+    def _request_budget(self, http_request: Request) -> Optional[CallBudget]:
+        """Read the caller's deadline header, mapping bad values to a 400."""
+        try:
+            deadline = parse_deadline(http_request.headers.get(DEADLINE_HEADER))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return CallBudget(deadline) if deadline is not None else None
+    
+    async def _until_disconnect(self, http_request: Request, work: Awaitable[Any]) -> Any:
+        """Run a request's work, cancelling it if the client disconnects first.
+        
+        Cancellation reaches the dispatcher, which stops the tool's upstream
+        calls unless another caller is waiting on the same execution.
+        """
+        task = asyncio.ensure_future(work)
+        
+        async def disconnected():
+            # The body has been read; the next message is the disconnect
+            while (await http_request.receive())["type"] != "http.disconnect":
+                pass
+        
+        watcher = asyncio.ensure_future(disconnected())
+        try:
+            done, _ = await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            watcher.cancel()
+            if not task.done():
+                task.cancel()
+        if task not in done:
+            log_event(logging.INFO, "request.disconnected", path=http_request.url.path)
+            # Nobody is left to read the response
+            return Response(status_code=499)
+        return task.result()
+    
+    def _observe_result(self, tool_name: str, result: Any, start: float):
+        """Record latency for a completed call; error results count as errors."""
+        if isinstance(result, dict) and result.get("error"):
+            tool_errors.inc(tool_name, str(result.get("error_code") or "error"))
+            tool_duration.observe(tool_name, "error", value=time.perf_counter() - start)
+        else:
+            tool_duration.observe(tool_name, "ok", value=time.perf_counter() - start)
+    
+    def _journal(
+        self,
+        tool_name: str,
+        parameters: Dict[str, Any],
+        start: float,
+        cache: Optional[str],
+        result: Any = None,
+        status: int = 200
+    ):
+        """Record a finished call in the invocation journal (MCP_JOURNAL)."""
+        if self.journal.enabled:
+            self.journal.record(tool_name, parameters, start, cache=cache, result=result, status=status,
+                                policy=self.cache.policies.get(tool_name))
+    
+    def _tool_error(
+        self,
+        tool_name: str,
+        error: Exception,
+        start: float,
+        parameters: Optional[Dict[str, Any]] = None,
+        cache: Optional[str] = None
+    ) -> HTTPException:
+        """Log a tool failure and map it to an HTTPException (journaled when parameters are given)."""
+        duration_ms = _elapsed_ms(start)
+        status_code = error.status_code if isinstance(error, HTTPException) else 400 if isinstance(error, TypeError) else 500
+        if parameters is not None:
+            self._journal(tool_name, parameters, start, cache, status=status_code)
+        tool_errors.inc(tool_name, str(status_code))
+        tool_duration.observe(tool_name, str(status_code), value=duration_ms / 1000)
+        if isinstance(error, HTTPException):
+            log_event(logging.WARNING, "tool.call", tool=tool_name, status=error.status_code,
+                      duration_ms=duration_ms, error=error.detail)
+            return error
+        if isinstance(error, TypeError):
+            error_msg = f"Invalid parameters for tool '{tool_name}': {str(error)}"
+            log_event(logging.WARNING, "tool.call", tool=tool_name, status=400,
+                      duration_ms=duration_ms, error=error_msg)
+            return HTTPException(
+                status_code=400,
+                detail=error_msg
+            )
+        error_msg = f"Error executing tool '{tool_name}': {str(error)}"
+        log_event(logging.ERROR, "tool.call", exc_info=error, tool=tool_name, status=500,
+                  duration_ms=duration_ms, error_type=type(error).__name__, error=str(error))
+        return HTTPException(
+            status_code=500,
+            detail=error_msg
+        )
+    
+    async def invoke_stream(
+        self,
+        tool_name: str,
+        parameters: Dict[str, Any],
+        budget: Optional[CallBudget] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Invoke a tool, yielding partial results as they complete.
+        
+        Tools with a registered streamer yield ("partial", payload) events
+        followed by one ("result", payload). Other tools yield a single
+        ("result", payload) event.
+        
+        Args:
+            tool_name: Name of the tool to invoke
+            parameters: Keyword arguments for the tool
+            budget: Deadline of the call (passed explicitly because context
+                    variables set here would leak across yields)
+        
+        Yields:
+            (event, payload) tuples
+        
+        Raises:
+            HTTPException: Same mapping as invoke()
+        """
+        parameters = parameters or {}
+        stream_func = self.tools.get(tool_name, {}).get("_stream")
+        if not stream_func or self.replay_stubs is not None:
+            with budget_scope(budget or current_budget()):
+                result = await self.invoke(tool_name, parameters)
+            yield "result", result
+            return
+        
+        start = time.perf_counter()
+        partials = 0
+        result = None
+        tool_in_flight.inc(tool_name)
+        try:
+            # The dispatcher takes the admission slot before the stream starts
+            async for event, payload in self.dispatcher.stream(tool_name, stream_func, parameters, budget):
+                if event == "partial":
+                    partials += 1
+                else:
+                    result = payload
+                yield event, payload
+        except Overloaded as e:
+            raise self._tool_error(tool_name, self._overloaded_error(e), start, parameters)
+        except Exception as e:
+            raise self._tool_error(tool_name, e, start, parameters)
+        finally:
+            tool_in_flight.dec(tool_name)
+        self._observe_result(tool_name, result, start)
+        log_event(logging.INFO, "tool.stream", tool=tool_name, status="ok",
+                  duration_ms=_elapsed_ms(start), partials=partials)
+        self._journal(tool_name, parameters, start, None, result)
+    
+    def _register_metrics(self):
+        """Add scrape-time metrics that read the cache, dispatcher, admission and breaker counters."""
+        def cache_lookups():
+            values = {}
+            for name, counters in self.cache.stats()["tools"].items():
+                values[(name, "hit")] = counters["hits"]
+                values[(name, "redis_hit")] = counters["redis_hits"]
+                values[(name, "miss")] = counters["misses"]
+            return values
+        
+        def cache_hit_ratio():
+            values = {}
+            for name, counters in self.cache.stats()["tools"].items():
+                lookups = counters["hits"] + counters["redis_hits"] + counters["misses"]
+                if lookups:
+                    values[(name,)] = (counters["hits"] + counters["redis_hits"]) / lookups
+            return values
+        
+        def lane_values(field):
+            def collect():
+                stats = self.dispatcher.stats()
+                values = {("tool", name): lane[field] for name, lane in stats["tools"].items()}
+                values.update({("upstream", name): lane[field] for name, lane in stats["upstreams"].items()})
+                return values
+            return collect
+        
+        def worker_pool():
+            workers = self.dispatcher.stats()["workers"]
+            return {("running",): workers["running"], ("queued",): workers["queued"]}
+        
+        def admission_values(field):
+            def collect():
+                return {(name,): cls[field] for name, cls in self.admission.stats()["classes"].items()}
+            return collect
+        
+        def circuit_open():
+            return {(name,): 0 if state["circuit"]["state"] == "closed" else 1
+                    for name, state in upstream_stats().items()}
+        
+        def loop_blocked(index):
+            def collect():
+                return {(site,): totals[index] for site, totals in blocking_detector.site_totals().items()}
+            return collect
+        
+        metrics.counter("mcp_cache_lookups_total", "Result cache lookups by outcome.",
+                        ("tool", "result"), collect=cache_lookups)
+        metrics.gauge("mcp_cache_hit_ratio", "Result cache hits / lookups since start.",
+                      ("tool",), collect=cache_hit_ratio)
+        metrics.gauge("mcp_dispatch_waiting", "Calls queued for a concurrency lane.",
+                      ("lane", "name"), collect=lane_values("waiting"))
+        metrics.gauge("mcp_dispatch_worker_threads", "Sync tool worker pool usage.",
+                      ("state",), collect=worker_pool)
+        metrics.gauge("mcp_admission_in_flight", "Admitted tool calls running, per priority class.",
+                      ("priority",), collect=admission_values("in_flight"))
+        metrics.gauge("mcp_admission_waiting", "Tool calls queued for admission, per priority class.",
+                      ("priority",), collect=admission_values("waiting"))
+        metrics.gauge("mcp_upstream_circuit_open", "1 while an upstream's circuit breaker is open or half-open.",
+                      ("service",), collect=circuit_open)
+        metrics.counter("mcp_event_loop_blocked_total", "Event-loop stalls past LOOP_BLOCK_THRESHOLD_MS, by call site.",
+                        ("site",), collect=loop_blocked(0))
+        metrics.counter("mcp_event_loop_blocked_seconds_total", "Time the event loop was blocked, by call site.",
+                        ("site",), collect=loop_blocked(1))
+    
     def _setup_routes(self):
         """Setup FastAPI routes."""
         
@@ -166,133 +678,288 @@ class FastMCP:
             return {"server": self.name, "status": "running"}
         
         @self.app.get("/tools/list")
-        async def list_tools():
+        async def list_tools(request: Request):
             """List all available tools with full metadata.
             
+            The catalog is built once and served with an ETag. Clients that
+            send a matching If-None-Match header get an empty 304 response.
+            
             Returns:
-                JSON response with tools array, each containing:
+                JSON response with a version (catalog hash) and a tools array,
+                each containing:
                 - name: Tool name
                 - description: Tool description
                 - inputSchema: JSON schema for input parameters
                 - returns: JSON schema for output
+                - streaming: Whether /tools/invoke_stream emits partial results
             """
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"\n{'='*80}")
-            print(f"[{timestamp}] MCP Server: Listing available tools")
-            print(f"{'='*80}")
-            
-            tools_list = [
-                {
-                    "name": tool["name"],
-                    "description": tool["description"],
-                    "inputSchema": tool["inputSchema"],
-                    "returns": tool.get("returns", {"type": "object"})
-                }
-                for tool in self.tools.values()
-                if "_func" in tool
-            ]
-            
-            print(f"Found {len(tools_list)} tools: {', '.join([t['name'] for t in tools_list])}")
-            print(f"{'='*80}\n")
-            
-            return {"tools": tools_list}
+            body, etag = self._get_catalog()
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag in request.headers.get("if-none-match", ""):
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type="application/json", headers=headers)
         
         @self.app.get("/tools/metadata")
         async def get_tool_metadata():
             """Get metadata for all tools."""
             return {"tools": self.tools}
         
+        @self.app.get("/tools/dispatch/stats")
+        async def get_dispatch_stats():
+            """Get worker pool and per-tool/per-upstream queue-depth metrics."""
+            return self.dispatcher.stats()
+        
+        @self.app.get("/tools/upstream/stats")
+        async def get_upstream_stats():
+            """Get rate limiter and circuit breaker state per upstream API."""
+            return upstream_stats()
+        
+        @self.app.get("/tools/cache/stats")
+        async def get_cache_stats():
+            """Get result cache hit/miss counters per tool."""
+            return self.cache.stats()
+        
+        @self.app.get("/tools/pages/stats")
+        async def get_page_stats():
+            """Get paginated result handles and fetch counters."""
+            return self.result_store.stats()
+        
+        @self.app.get("/tools/admission/stats")
+        async def get_admission_stats():
+            """Get in-flight, queued and shed counts per priority class."""
+            return self.admission.stats()
+        
+        @self.app.get("/tools/journal/stats")
+        async def get_journal_stats():
+            """Get invocation journal counters (MCP_JOURNAL)."""
+            return self.journal.stats()
+        
+        @self.app.get("/tools/blocking/stats")
+        async def get_blocking_stats():
+            """Get event-loop stalls per call site (LOOP_BLOCK_DETECTOR=1)."""
+            return blocking_detector.stats()
+        
+        @self.app.get("/metrics")
+        async def get_metrics():
+            """Get server metrics in the Prometheus text format."""
+            if not METRICS_ENABLED:
+                raise HTTPException(status_code=404, detail="Metrics are disabled (MCP_METRICS=0)")
+            return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+        
+        @self.app.on_event("startup")
+        async def start_loop_monitor():
+            if METRICS_ENABLED:
+                self.loop_monitor.start()
+            blocking_detector.attach()
+        
+        @self.app.on_event("shutdown")
+        async def shutdown_dispatcher():
+            self.loop_monitor.stop()
+            blocking_detector.detach()
+            self.dispatcher.shutdown()
+            self.journal.close()
+            stop_logging()
+        
         @self.app.post("/tools/invoke")
-        async def invoke_tool(request: Dict[str, Any]):
+        async def invoke_tool(request: Dict[str, Any], http_request: Request):
             """Invoke a tool.
             
             Expected request format:
             {
                 "tool": "tool_name",
-                "parameters": {...}
+                "parameters": {...},
+                "projection": {"include": [...], "exclude": [...], "limits": {...}},  # optional
+                "page": {"size": 25},  # optional, pageable tools only
+                "hedge": true  # optional, see FastMCP.invoke
             }
-            """
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            tool_name = request.get("tool")
-            parameters = request.get("parameters", {})
             
-            print(f"\n{'='*80}")
-            print(f"[{timestamp}] MCP Server: Calling tool '{tool_name}'")
-            print(f"{'='*80}")
-            print(f"Input parameters:")
-            try:
-                # Pretty print parameters, truncate very long values
-                params_str = json.dumps(parameters, indent=2, ensure_ascii=False, default=str)
-                # Truncate if too long (more than 2000 chars)
-                if len(params_str) > 2000:
-                    params_str = params_str[:2000] + "\n... (truncated)"
-                print(params_str)
-            except Exception:
-                print(f"  {parameters}")
-            print(f"{'-'*80}")
+            The projection trims the result before it is sent (see
+            server/projection.py). With a page size, long result lists are
+            cut to their first page and the rest is kept under a handle for
+            fetch_page (see server/result_store.py). The response is JSON, or msgpack when the
+            client sends "Accept: application/msgpack"; large bodies are
+            compressed according to Accept-Encoding (see server/encoding.py).
             
-            if tool_name not in self.tools:
-                error_msg = f"Tool '{tool_name}' not found"
-                print(f"ERROR: {error_msg}")
-                print(f"Available tools: {', '.join(self.tools.keys())}")
-                print(f"{'='*80}\n")
-                raise HTTPException(status_code=404, detail=error_msg)
+            An X-MCP-Deadline-Ms header bounds the call (504 when it runs
+            out), and the call is cancelled if the client disconnects (see
+            server/deadline.py).
+            """
+            tool_name = request.get("tool")
+            projection = self._parse_projection(request.get("projection"))
+            page_size = self._parse_page(tool_name, request.get("page"))
+            with budget_scope(self._request_budget(http_request)):
+                result = await self._until_disconnect(
+                    http_request, self.invoke(tool_name, request.get("parameters", {}), bool(request.get("hedge")))
+                )
+            if isinstance(result, Response):
+                return result
+            result = await self._shape_result(tool_name, result, projection, page_size)
+            return encoded_response(http_request, {"result": result})
+        
+        @self.app.post("/tools/invoke_batch")
+        async def invoke_batch(request: Dict[str, Any], http_request: Request):
+            """Invoke several tools concurrently in one round trip.
             
-            tool_func = self.tools[tool_name].get("_func")
-            if not tool_func:
-                error_msg = f"Tool '{tool_name}' not callable"
-                print(f"ERROR: {error_msg}")
-                print(f"{'='*80}\n")
-                raise HTTPException(status_code=500, detail=error_msg)
+            Expected request format:
+            {
+                "calls": [
+                    {"tool": "tool_name", "parameters": {...}, "projection": {...}, "page": {...}},
+                    ...
+                ]
+            }
             
-            try:
-                print(f"Executing tool function...")
-                # Check if the function is async and handle accordingly
-                if iscoroutinefunction(tool_func):
-                    result = await tool_func(**parameters)
-                else:
-                    result = tool_func(**parameters)
-                
-                print(f"Tool execution completed successfully!")
-                print(f"Output:")
-                try:
-                    # Pretty print result, truncate very long values
-                    result_str = json.dumps(result, indent=2, ensure_ascii=False, default=str)
-                    # Truncate if too long (more than 5000 chars)
-                    if len(result_str) > 5000:
-                        result_str = result_str[:5000] + "\n... (truncated - output too long)"
-                    print(result_str)
-                except Exception:
-                    print(f"  {result}")
-                
-                print(f"{'='*80}\n")
-                return {"result": result}
-            except TypeError as e:
-                error_msg = f"Invalid parameters for tool '{tool_name}': {str(e)}"
-                print(f"ERROR: {error_msg}")
-                print(f"Exception type: TypeError")
-                print(f"Exception details: {str(e)}")
-                print(f"{'='*80}\n")
+            Returns:
+                Response with a results array in the same order as calls,
+                encoded like /tools/invoke. Each entry is either
+                {"result": ...} or {"error": {"status_code": ..., "detail": ...}};
+                calls shed under load have status_code 503 and a retry_after.
+            """
+            calls = request.get("calls")
+            if not isinstance(calls, list):
+                raise HTTPException(status_code=400, detail="'calls' must be a list of {tool, parameters} objects")
+            if len(calls) > MAX_BATCH_SIZE:
                 raise HTTPException(
                     status_code=400,
-                    detail=error_msg
+                    detail=f"Batch of {len(calls)} calls exceeds the limit of {MAX_BATCH_SIZE}"
                 )
-            except Exception as e:
-                error_msg = f"Error executing tool '{tool_name}': {str(e)}"
-                print(f"ERROR: {error_msg}")
-                print(f"Exception type: {type(e).__name__}")
-                print(f"Exception details: {str(e)}")
-                print(f"Traceback:")
-                traceback.print_exc()
-                print(f"{'='*80}\n")
-                raise HTTPException(
-                    status_code=500,
-                    detail=error_msg
+            
+            with budget_scope(self._request_budget(http_request)):
+                results = await self._until_disconnect(
+                    http_request, asyncio.gather(*(self._call_entry(call) for call in calls))
                 )
+            if isinstance(results, Response):
+                return results
+            return encoded_response(http_request, {"results": results})
+        
+        @self.app.post("/tools/invoke_stream")
+        async def invoke_tool_stream(request: Request):
+            """Invoke a tool and stream partial results as they complete.
+            
+            Takes the same request body and deadline header as /tools/invoke
+            (the projection and page apply to the final result event). The response is NDJSON (one event per line) by default, or Server-Sent Events when
+            the client sends "Accept: text/event-stream". Events are:
+            - {"type": "partial", "data": ...} for each sub-result
+            - {"type": "result", "data": ...} with the final result
+            - {"type": "error", "status_code": ..., "detail": ...} on failure
+              (plus "retry_after" when the call was shed under load)
+            """
+            body = await request.json()
+            tool_name = body.get("tool")
+            parameters = body.get("parameters", {})
+            # Fail with a normal HTTP error before the stream starts
+            projection = self._parse_projection(body.get("projection"))
+            page_size = self._parse_page(tool_name, body.get("page"))
+            budget = self._request_budget(request)
+            self._get_tool_func(tool_name)
+            
+            use_sse = "text/event-stream" in request.headers.get("accept", "")
+            
+            def encode_event(event: Dict[str, Any]) -> str:
+                line = json.dumps(event, ensure_ascii=False, default=str)
+                return f"data: {line}\n\n" if use_sse else f"{line}\n"
+            
+            async def event_stream():
+                try:
+                    async for event, payload in self.invoke_stream(tool_name, parameters, budget):
+                        if event == "result":
+                            payload = await self._shape_result(tool_name, payload, projection, page_size)
+                        yield encode_event({"type": event, "data": payload})
+                except HTTPException as e:
+                    yield encode_event(dict(self._error_entry(e), type="error"))
+            
+            media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+            return StreamingResponse(event_stream(), media_type=media_type)
+    
+        @self.app.websocket("/tools/ws")
+        async def invoke_tool_channel(websocket: WebSocket):
+            """Invoke tools over one persistent, multiplexed WebSocket connection.
+            
+            Many concurrent calls share the connection; each message carries
+            an id that its reply echoes (see server/channel.py for the
+            message format). Replies are JSON, or msgpack with
+            ?accept=application/msgpack.
+            """
+            media_type = negotiate_format(websocket.query_params.get("accept"))
+            await websocket.accept()
+            await serve_channel(websocket, self._channel_call, media_type)
+    
+    def _setup_admin_routes(self):
+        """Setup profiling routes (require the ADMIN_TOKEN bearer token).
+        
+        With MCP_WORKERS > 1 each request profiles the worker that serves it.
+        """
+        
+        @self.app.post("/admin/profile/cpu")
+        async def profile_cpu(
+            http_request: Request,
+            seconds: float = 10.0,
+            interval_ms: float = 10.0,
+            format: str = "collapsed",
+            idle: bool = False
+        ):
+            """Sample all threads for `seconds` and return the CPU profile.
+            
+            Formats: collapsed (text, for flamegraph.pl or speedscope) or
+            speedscope (JSON). Idle threads are skipped unless idle=true.
+            """
+            self._require_admin(http_request)
+            if format not in PROFILE_FORMATS:
+                raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(PROFILE_FORMATS)}")
+            try:
+                profile = await asyncio.to_thread(cpu_profiler.profile, seconds, interval_ms, idle)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except ProfilerBusy as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            log_event(logging.INFO, "admin.profile_cpu", seconds=seconds, samples=profile.sample_count)
+            if format == "speedscope":
+                return JSONResponse(profile.to_speedscope())
+            return Response(content=profile.to_collapsed(), media_type="text/plain")
+        
+        @self.app.post("/admin/profile/memory/snapshots")
+        async def take_memory_snapshot(http_request: Request, top: int = 25, group_by: str = "lineno"):
+            """Take a tracemalloc snapshot (starts tracing on first use)."""
+            self._require_admin(http_request)
+            try:
+                return await asyncio.to_thread(memory_profiler.snapshot, top, group_by)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        @self.app.get("/admin/profile/memory/snapshots")
+        async def list_memory_snapshots(http_request: Request):
+            """List stored snapshots and the traced memory."""
+            self._require_admin(http_request)
+            return await asyncio.to_thread(memory_profiler.list)
+        
+        @self.app.get("/admin/profile/memory/diff")
+        async def diff_memory_snapshots(
+            http_request: Request,
+            base: int,
+            target: int,
+            top: int = 25,
+            group_by: str = "lineno"
+        ):
+            """Compare two snapshots, largest growth first."""
+            self._require_admin(http_request)
+            try:
+                return await asyncio.to_thread(memory_profiler.diff, base, target, top, group_by)
+            except KeyError as e:
+                raise HTTPException(status_code=404, detail=e.args[0])
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        @self.app.delete("/admin/profile/memory")
+        async def stop_memory_profiling(http_request: Request):
+            """Stop tracemalloc and drop all snapshots."""
+            self._require_admin(http_request)
+            return memory_profiler.stop()
     
     def run(self, transport: str = "http", host: str = "0.0.0.0", port: int = 8090):
         """Run the MCP server.
         
+        Set MCP_WORKERS to run several worker processes (gunicorn with
+        uvicorn workers, app preloaded in the master).
+        
         Args:
             transport: Transport type (currently only "http" supported)
             host: Host to bind to
@@ -303,6 +970,12 @@ class FastMCP:
         
         print(f"Starting {self.name} MCP server on http://{host}:{port}")
         print(f"Available tools: {', '.join(self.tools.keys())}")
+        workers = int(os.getenv("MCP_WORKERS", "1"))
+        if workers > 1:
+            # Preload-then-fork: see server/multiprocess.py
+            print(f"Using {workers} worker processes")
+            serve(self.app, host=host, port=port, workers=workers)
+            return
         uvicorn.run(self.app, host=host, port=port)
 
 
@@ -319,7 +992,10 @@ register_utilities_tools(mcp)
 register_memory_tools(mcp)
 register_planner_tools(mcp)
 
+# ASGI app for external servers (e.g., "gunicorn -k uvicorn.workers.UvicornWorker main_server:app")
+app = mcp.app
+
 
 if __name__ == "__main__":
-    mcp.run(transport="http", host="0.0.0.0", port=8090)
+    mcp.run(transport="http", host="0.0.0.0", port=int(os.getenv("MCP_PORT", "8090")))
 
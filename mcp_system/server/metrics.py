@@ -0,0 +1,235 @@
+"""In-process metrics with a Prometheus text exposition endpoint.
+
+Metrics are plain counters and fixed-bucket histograms kept in memory, so
+recording one costs a dict lookup and a few additions under a lock. They are
+rendered in the Prometheus text format (version 0.0.4) when /metrics is
+scraped. With MCP_WORKERS > 1 every worker keeps its own metrics; scrape
+each worker or aggregate by instance.
+
+Metrics shared across modules (tool calls, upstream calls, loop lag) are
+defined at the bottom of this module on the process-wide ``metrics``
+registry; the server adds scrape-time gauges for cache, dispatcher and
+circuit-breaker state.
+
+Environment variables:
+    MCP_METRICS: Set to "0" to disable the /metrics endpoint and the loop-lag
+        probe. Default enabled.
+    MCP_LOOP_LAG_INTERVAL: Seconds between event-loop lag probes. Default 0.5.
+"""
+
+import asyncio
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow scrapes
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Event-loop lag buckets in seconds
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# Seconds between event-loop lag probes
+LOOP_LAG_INTERVAL = float(os.getenv("MCP_LOOP_LAG_INTERVAL", "0.5"))
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with labels.
+
+    Args:
+        name: Metric name
+        help_text: Description shown in the exposition
+        labels: Label names; values are passed positionally to inc()
+        collect: Optional callable returning {label values: value}, called at
+                 scrape time to copy counters kept elsewhere (e.g., cache stats)
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 collect: Optional[Callable[[], Dict[LabelValues, float]]] = None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.collect = collect
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def set(self, *label_values: str, value: float):
+        with self._lock:
+            self._values[label_values] = value
+
+    def render(self) -> List[str]:
+        if self.collect is not None:
+            try:
+                values = self.collect()
+            except Exception as e:
+                print(f"[METRICS] Warning: could not collect {self.name}: {e}")
+                values = {}
+            with self._lock:
+                self._values = dict(values)
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    """Fixed-bucket histogram with labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *label_values: str, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = (), collect=None) -> Counter:
+        return self.register(Counter(name, help_text, labels, collect))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = (), collect=None) -> Gauge:
+        return self.register(Gauge(name, help_text, labels, collect))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _after_fork(self):
+        """Give a forked worker fresh locks (a parent thread may have held one)."""
+        for metric in self._metrics:
+            metric._lock = threading.Lock()
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag by timing how late a periodic sleep wakes up.
+
+    A blocking call on the loop (sync I/O, heavy JSON encoding) delays every
+    request; the lag shows how long the loop was unable to run callbacks.
+    """
+
+    def __init__(self, histogram: Histogram, gauge: Gauge, interval: float = LOOP_LAG_INTERVAL):
+        self.histogram = histogram
+        self.gauge = gauge
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - expected, 0.0)
+            self.histogram.observe(value=lag)
+            self.gauge.set(value=lag)
+
+
+# Process-wide registry rendered by the /metrics endpoint
+metrics = MetricsRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=metrics._after_fork)
+
+tool_duration = metrics.histogram(
+    "mcp_tool_duration_seconds", "Tool call latency, including cache hits.", ("tool", "status"))
+tool_in_flight = metrics.gauge(
+    "mcp_tool_in_flight", "Tool calls currently being executed.", ("tool",))
+tool_errors = metrics.counter(
+    "mcp_tool_errors_total", "Tool calls that failed or returned an error result.", ("tool", "code"))
+upstream_duration = metrics.histogram(
+    "mcp_upstream_duration_seconds", "External API response time (outcome ok, error or abandoned).", ("service", "outcome"))
+admission_rejected = metrics.counter(
+    "mcp_admission_rejected_total", "Tool calls shed with a 503 by admission control.", ("priority", "reason"))
+loop_lag = metrics.histogram(
+    "mcp_event_loop_lag_seconds", "Delay of a periodic event-loop wakeup.", buckets=LAG_BUCKETS)
+loop_lag_last = metrics.gauge(
+    "mcp_event_loop_lag_last_seconds", "Most recent event-loop lag sample.")
@@ -0,0 +1,84 @@
+"""Multi-process serving for the MCP server (preload, then fork).
+
+The server module is imported once in the gunicorn master: tool modules,
+the SQLAlchemy engine, and (when warmed) the sentence-transformer model are
+loaded there and shared copy-on-write by the forked workers. Each worker
+runs its own uvicorn event loop.
+
+Per-process resources are rebuilt in each worker through
+os.register_at_fork() hooks in the modules that own them: the tool worker
+pool (server.dispatch), the log listener thread (server.request_log),
+Redis clients (server.result_cache, tools.upstream) and the database
+connection pool (tools.planner_tools).
+
+Caches and rate limits are coordinated across workers through Redis
+(REDIS_URL). Without Redis each worker gets an equal share of every
+upstream rate limit.
+
+Environment variables:
+    MCP_WORKERS: Number of worker processes. 1 (default) runs plain uvicorn.
+    MCP_PRELOAD_MODELS: Set to "0" to skip loading the embedding model in the
+        master before forking.
+    MCP_WORKER_TIMEOUT: Seconds before an unresponsive worker is restarted.
+        Default 120.
+"""
+
+import os
+from typing import Any, Dict
+
+
+def preload_shared_models():
+    """Load heavy models in the master so workers share them copy-on-write."""
+    if os.getenv("MCP_PRELOAD_MODELS", "1") == "0":
+        return
+    try:
+        from memory.embeddings import get_model
+        get_model()
+        print("[WORKERS] Embedding model loaded in master process")
+    except Exception as e:
+        print(f"[WORKERS] Warning: could not preload embedding model: {e}")
+
+
+def serve(app: Any, host: str, port: int, workers: int):
+    """Serve an ASGI app with a preforked gunicorn master and uvicorn workers.
+
+    Args:
+        app: The (already imported) ASGI application
+        host: Host to bind to
+        port: Port to bind to
+        workers: Number of worker processes
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class PreforkApplication(BaseApplication):
+        """Gunicorn application that serves an app object imported in the master."""
+
+        def __init__(self, options: Dict[str, Any]):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    def when_ready(server):
+        preload_shared_models()
+
+    def post_fork(server, worker):
+        print(f"[WORKERS] Worker {worker.pid} started")
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "timeout": int(os.getenv("MCP_WORKER_TIMEOUT", "120")),
+        "graceful_timeout": 30,
+        "keepalive": 5,
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+    }
+    PreforkApplication(options).run()
@@ -0,0 +1,149 @@
+"""Field projection for tool results.
+
+An invoke request may carry a "projection" spec so the server drops the
+parts of a result the caller would throw away anyway, before the result is
+serialized and sent:
+
+    {
+        "include": ["hotels.name", "hotels.roomTypes"],
+        "exclude": ["*.booking_token", "*.flights.extensions"],
+        "limits": {"hotels.hotelImages": 3, "outbound": 5}
+    }
+
+- Paths are dot-separated dict keys. Lists are traversed transparently, so
+  "hotels.name" addresses the name of every hotel. A "*" segment matches any
+  key that has no exact entry at that level.
+- include: keep only these paths (and everything below them). Optional.
+- exclude: drop these paths.
+- limits: keep at most N items of the list at each path. When a top-level
+  list is cut, its original length is reported in "_truncated".
+
+Error results ("error": True) are returned unchanged. Results are never
+modified in place (cached results are shared between callers); only the
+containers on the projected paths are copied.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+class _Node:
+    """One path segment of a compiled projection."""
+
+    __slots__ = ("children", "keep", "drop", "limit", "selects")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.keep = False       # include path ends here: keep the whole subtree
+        self.drop = False       # exclude path ends here
+        self.limit: Optional[int] = None
+        self.selects = False    # include paths continue below: drop unlisted keys
+
+    def child(self, segment: str) -> "_Node":
+        node = self.children.get(segment)
+        if node is None:
+            node = self.children[segment] = _Node()
+        return node
+
+
+def _split(path: Any, field: str) -> List[str]:
+    if not isinstance(path, str) or not path or any(not part for part in path.split(".")):
+        raise ValueError(f"'{field}' paths must be non-empty dot-separated strings, got {path!r}")
+    return path.split(".")
+
+
+def _string_list(spec: Dict[str, Any], field: str) -> List[str]:
+    value = spec.get(field) or []
+    if not isinstance(value, list):
+        raise ValueError(f"'{field}' must be a list of paths")
+    return value
+
+
+class Projection:
+    """A compiled include/exclude/limit spec."""
+
+    def __init__(
+        self,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        limits: Optional[Dict[str, int]] = None
+    ):
+        self.root = _Node()
+        for path in include or []:
+            node = self.root
+            for segment in _split(path, "include"):
+                node.selects = True
+                node = node.child(segment)
+            node.keep = True
+        for path in exclude or []:
+            node = self.root
+            for segment in _split(path, "exclude"):
+                node = node.child(segment)
+            node.drop = True
+        for path, limit in (limits or {}).items():
+            if not isinstance(limit, int) or isinstance(limit, bool) or limit < 0:
+                raise ValueError(f"Limit for '{path}' must be a non-negative integer, got {limit!r}")
+            node = self.root
+            for segment in _split(path, "limits"):
+                node = node.child(segment)
+            node.limit = limit
+
+    @classmethod
+    def from_spec(cls, spec: Any) -> Optional["Projection"]:
+        """Compile a projection spec from a request; None for an empty spec.
+
+        Raises:
+            ValueError: If the spec is malformed
+        """
+        if not spec:
+            return None
+        if not isinstance(spec, dict):
+            raise ValueError("Projection must be an object with include/exclude/limits")
+        unknown = set(spec) - {"include", "exclude", "limits"}
+        if unknown:
+            raise ValueError(f"Unknown projection fields: {', '.join(sorted(unknown))}")
+        limits = spec.get("limits") or {}
+        if not isinstance(limits, dict):
+            raise ValueError("'limits' must be an object mapping paths to item counts")
+        return cls(_string_list(spec, "include"), _string_list(spec, "exclude"), limits)
+
+    def apply(self, result: Any) -> Any:
+        """Return the projected result (the input is not modified)."""
+        if isinstance(result, dict) and result.get("error"):
+            return result
+        truncated: Dict[str, int] = {}
+        projected = self._apply(result, self.root, False, truncated, "")
+        if truncated and isinstance(projected, dict):
+            projected["_truncated"] = truncated
+        return projected
+
+    def _apply(self, value: Any, node: _Node, kept: bool, truncated: Dict[str, int], path: Optional[str]) -> Any:
+        kept = kept or node.keep
+        if isinstance(value, list):
+            if node.limit is not None and len(value) > node.limit:
+                if path:
+                    truncated[path] = len(value)
+                value = value[:node.limit]
+            if not node.children:
+                return value
+            # Paths below a list apply to every item; only the top list reports truncation
+            return [self._apply(item, node, kept, truncated, None) for item in value]
+
+        select = node.selects and not kept
+        if not isinstance(value, dict) or not (node.children or select):
+            return value
+
+        wildcard = node.children.get("*")
+        projected = {}
+        for key, item in value.items():
+            child = node.children.get(key, wildcard)
+            if child is None:
+                if not select:
+                    projected[key] = item
+                continue
+            if child.drop:
+                continue
+            if select and not (child.keep or child.selects):
+                continue
+            child_path = f"{path}.{key}" if path else (key if path is not None else None)
+            projected[key] = self._apply(item, child, kept, truncated, child_path)
+        return projected
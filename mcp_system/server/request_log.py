@@ -0,0 +1,196 @@
+"""Structured, low-overhead request logging for the MCP server.
+
+Every tool call produces one short INFO record (tool, status, duration).
+Parameter and result payloads are logged at DEBUG and are only serialized
+when a handler actually writes them, on the background listener thread.
+Records are handed to that thread through a queue, so the request path never
+blocks on stdout.
+
+Environment variables:
+    MCP_LOG_LEVEL: Minimum level (DEBUG, INFO, WARNING, ...). Default INFO.
+    MCP_LOG_FORMAT: "text" (default) or "json" (one JSON object per line).
+    MCP_LOG_SAMPLE_RATE: Fraction of calls whose payloads are logged at
+        DEBUG (0.0 - 1.0). Default 1.0.
+    MCP_LOG_PAYLOAD_CHARS: Maximum rendered payload length. Default 5000.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+LOGGER_NAME = "mcp.server"
+
+# Maximum characters kept from a rendered parameter/result payload
+PAYLOAD_CHARS = int(os.getenv("MCP_LOG_PAYLOAD_CHARS", "5000"))
+
+
+class LazyPayload:
+    """Defers JSON rendering of a payload until the record is formatted.
+
+    Building the object is free; json.dumps only runs if a handler emits the
+    record, and the output is cut to max_chars.
+    """
+
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: int = PAYLOAD_CHARS):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        try:
+            rendered = json.dumps(self.value, ensure_ascii=False, default=str)
+        except Exception:
+            rendered = repr(self.value)
+        if len(rendered) > self.max_chars:
+            rendered = rendered[:self.max_chars] + f"... (truncated, {len(rendered)} chars)"
+        return rendered
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as "<time> <LEVEL> <event> key=value ..." or JSON lines."""
+
+    def __init__(self, json_lines: bool = False):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields: Dict[str, Any] = getattr(record, "fields", None) or {}
+        timestamp = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        exc_text = self.formatException(record.exc_info) if record.exc_info else None
+
+        if self.json_lines:
+            entry = {"ts": timestamp, "level": record.levelname, "event": record.getMessage()}
+            for key, value in fields.items():
+                entry[key] = str(value) if isinstance(value, LazyPayload) else value
+            if exc_text:
+                entry["exc"] = exc_text
+            return json.dumps(entry, ensure_ascii=False, default=str)
+
+        parts = [timestamp, record.levelname, record.getMessage()]
+        for key, value in fields.items():
+            text = str(value)
+            if not isinstance(value, LazyPayload) and (" " in text or "=" in text or not text):
+                text = json.dumps(text, ensure_ascii=False)
+            parts.append(f"{key}={text}")
+        line = " ".join(parts)
+        if exc_text:
+            line = f"{line}\n{exc_text}"
+        return line
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock QueueHandler formats the record before enqueueing it, which
+    would serialize payloads on the request path.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_logger: Optional[logging.Logger] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+_sample_rate = 1.0
+
+
+def get_logger() -> logging.Logger:
+    """Get the server logger, configuring the queue handler on first use."""
+    global _logger, _listener, _sample_rate
+    if _logger is not None:
+        return _logger
+
+    with _lock:
+        if _logger is not None:
+            return _logger
+
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel(os.getenv("MCP_LOG_LEVEL", "INFO").upper())
+        logger.propagate = False
+
+        try:
+            _sample_rate = min(max(float(os.getenv("MCP_LOG_SAMPLE_RATE", "1.0")), 0.0), 1.0)
+        except ValueError:
+            _sample_rate = 1.0
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(
+            StructuredFormatter(json_lines=os.getenv("MCP_LOG_FORMAT", "text").lower() == "json")
+        )
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+
+        _logger = logger
+        return _logger
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread.
+
+    The next get_logger() call sets up a fresh handler and listener.
+    """
+    global _logger, _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        if _logger is not None:
+            for handler in list(_logger.handlers):
+                if isinstance(handler, _DeferredQueueHandler):
+                    _logger.removeHandler(handler)
+            _logger = None
+
+
+def _after_fork():
+    """Drop the parent's listener in a forked worker; its thread did not survive the fork."""
+    global _logger, _listener, _lock
+    _lock = threading.Lock()
+    _listener = None
+    if _logger is not None:
+        for handler in list(_logger.handlers):
+            if isinstance(handler, _DeferredQueueHandler):
+                _logger.removeHandler(handler)
+        _logger = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def payloads_enabled() -> bool:
+    """Whether this call's parameters and result should be logged.
+
+    True when DEBUG is enabled and the call falls inside MCP_LOG_SAMPLE_RATE.
+    Decide once per call so a sampled call logs both its input and output.
+    """
+    if not get_logger().isEnabledFor(logging.DEBUG):
+        return False
+    return _sample_rate >= 1.0 or random.random() < _sample_rate
+
+
+def log_event(level: int, event: str, exc_info: Any = None, **fields: Any):
+    """Log a structured event if the level is enabled.
+
+    Args:
+        level: logging level (e.g., logging.INFO)
+        event: Short event name (e.g., "tool.call")
+        exc_info: Optional exception to attach a traceback for
+        **fields: Extra key/value fields. Wrap large values in LazyPayload.
+    """
+    logger = get_logger()
+    if logger.isEnabledFor(level):
+        logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
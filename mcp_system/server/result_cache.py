@@ -0,0 +1,309 @@
+"""Per-tool result cache for the MCP server.
+
+Tools opt in through the decorator, e.g.
+``@mcp.tool(cache=CachePolicy(ttl=3600))``. Results are kept in a
+size-bounded in-process LRU and, when Redis is reachable, in a shared Redis
+tier so every server process (and every restart) can reuse them.
+
+Environment variables:
+    MCP_CACHE_MAX_ENTRIES: Size of the in-process LRU. Default 2048.
+    MCP_CACHE_REDIS: Set to "0" to disable the Redis tier. Default enabled
+        when REDIS_URL is set.
+    REDIS_URL: Redis connection URL (shared with short-term memory).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+
+# Maximum number of results kept in the in-process LRU
+MAX_ENTRIES = int(os.getenv("MCP_CACHE_MAX_ENTRIES", "2048"))
+
+# Prefix for cache keys in Redis
+REDIS_KEY_PREFIX = "MCP:cache"
+
+# Seconds to wait before trying Redis again after a connection failure
+REDIS_RETRY_AFTER = 30.0
+
+
+def canonical_params(parameters: Dict[str, Any]) -> str:
+    """Serialize parameters deterministically (sorted keys, no whitespace)."""
+    return json.dumps(parameters, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def canonical_key(tool_name: str, parameters: Dict[str, Any]) -> str:
+    """Build a stable key for a (tool, parameters) pair."""
+    digest = hashlib.sha256(canonical_params(parameters).encode("utf-8")).hexdigest()[:32]
+    return f"{tool_name}:{digest}"
+
+
+def normalize_strings(*names: str, upper: bool = False) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Key normalizer that strips and case-folds the named string parameters.
+
+    Args:
+        *names: Parameter names to normalize
+        upper: Upper-case instead of lower-case (e.g., currency codes)
+    """
+    def normalize(parameters: Dict[str, Any]) -> Dict[str, Any]:
+        params = dict(parameters)
+        for name in names:
+            value = params.get(name)
+            if isinstance(value, str):
+                value = value.strip()
+                params[name] = value.upper() if upper else value.lower()
+        return params
+    return normalize
+
+
+def drop_params(*names: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Key normalizer that ignores parameters which do not change the result (e.g., timeouts)."""
+    def normalize(parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in parameters.items() if key not in names}
+    return normalize
+
+
+class RedisTier:
+    """Shared Redis connection with back-off, for state that outlives one process.
+
+    The client is bound to the event loop that created it and is recreated
+    for a new loop (or after a fork). After an error Redis is skipped for
+    REDIS_RETRY_AFTER seconds so callers fall back to their in-process tier.
+    """
+
+    def __init__(self, tag: str, enabled: bool = True):
+        """Initialize the tier.
+
+        Args:
+            tag: Log tag of the owner (e.g., "CACHE")
+            enabled: Use Redis at all (it also needs REDIS_URL and redis-py)
+        """
+        self.tag = tag
+        self.url = os.getenv("REDIS_URL") if enabled else None
+        self._client = None
+        self._loop = None
+        self._down_until = 0.0
+        self.errors = 0
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """Give a forked worker its own connection."""
+        self._client = None
+        self._loop = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(redis_asyncio is not None and self.url)
+
+    def client(self):
+        """Get the Redis client for the running loop, or None if unavailable."""
+        if not self.enabled or time.time() < self._down_until:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = redis_asyncio.from_url(
+                self.url,
+                decode_responses=True,
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5
+            )
+            self._loop = loop
+        return self._client
+
+    def failed(self, error: Exception):
+        """Back off from Redis after an error; the in-process tier keeps working."""
+        self.errors += 1
+        self._down_until = time.time() + REDIS_RETRY_AFTER
+        self._client = None
+        print(f"[{self.tag}] Warning: Redis tier unavailable ({error}), retrying in {REDIS_RETRY_AFTER:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "available": time.time() >= self._down_until,
+            "errors": self.errors,
+        }
+
+
+class CachePolicy:
+    """How a tool's results are cached.
+
+    Args:
+        ttl: Seconds a result stays valid
+        key: Optional normalizer applied to the parameters before building the
+             cache key. Several normalizers can be passed as a tuple and are
+             applied in order.
+        cache_errors: Also cache results with "error": True (exceptions are
+                      never cached)
+        shared: Store results in the Redis tier as well as in-process
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        key: Optional[Any] = None,
+        cache_errors: bool = False,
+        shared: bool = True
+    ):
+        self.ttl = ttl
+        if key is None:
+            self.normalizers = ()
+        elif callable(key):
+            self.normalizers = (key,)
+        else:
+            self.normalizers = tuple(key)
+        self.cache_errors = cache_errors
+        self.shared = shared
+
+    def normalize(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the key normalizers to a call's parameters."""
+        for normalize in self.normalizers:
+            parameters = normalize(parameters)
+        return parameters
+
+    def make_key(self, tool_name: str, parameters: Dict[str, Any]) -> str:
+        """Return the cache key for a call."""
+        return canonical_key(tool_name, self.normalize(parameters))
+
+    def should_store(self, result: Any) -> bool:
+        """Whether a result may be cached under this policy."""
+        if self.cache_errors:
+            return True
+        return not (isinstance(result, dict) and result.get("error"))
+
+
+class ResultCache:
+    """In-process LRU with an optional Redis tier.
+
+    Cached results are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or MAX_ENTRIES
+        self.policies: Dict[str, CachePolicy] = {}
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+
+        self.redis = RedisTier("CACHE", enabled=os.getenv("MCP_CACHE_REDIS", "1") != "0")
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """Give a forked worker its own lock."""
+        self._lock = threading.Lock()
+
+    def configure_tool(self, tool_name: str, policy: Optional[CachePolicy]):
+        """Register (or clear) the cache policy for a tool."""
+        if policy is None:
+            self.policies.pop(tool_name, None)
+            return
+        self.policies[tool_name] = policy
+        self._stats.setdefault(tool_name, {"hits": 0, "redis_hits": 0, "misses": 0, "stores": 0, "skipped": 0})
+
+    async def get(self, tool_name: str, parameters: Dict[str, Any]) -> Tuple[Optional[str], bool, Any]:
+        """Look up a cached result.
+
+        Returns:
+            (key, hit, value). key is None when the tool has no cache policy.
+        """
+        policy = self.policies.get(tool_name)
+        if policy is None:
+            return None, False, None
+
+        key = policy.make_key(tool_name, parameters)
+        stats = self._stats[tool_name]
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    stats["hits"] += 1
+                    return key, True, entry[1]
+                del self._entries[key]
+
+        if policy.shared:
+            client = self.redis.client()
+            if client is not None:
+                try:
+                    raw = await client.get(f"{REDIS_KEY_PREFIX}:{key}")
+                except Exception as e:
+                    self.redis.failed(e)
+                    raw = None
+                if raw is not None:
+                    entry = json.loads(raw)
+                    self._store_local(key, entry["v"], entry["e"])
+                    stats["redis_hits"] += 1
+                    return key, True, entry["v"]
+
+        stats["misses"] += 1
+        return key, False, None
+
+    async def set(self, tool_name: str, key: str, value: Any):
+        """Store a result under a key returned by get()."""
+        policy = self.policies.get(tool_name)
+        if policy is None:
+            return
+        if not policy.should_store(value):
+            self._stats[tool_name]["skipped"] += 1
+            return
+
+        expires_at = time.time() + policy.ttl
+        self._store_local(key, value, expires_at)
+        self._stats[tool_name]["stores"] += 1
+
+        if policy.shared:
+            client = self.redis.client()
+            if client is not None:
+                try:
+                    payload = json.dumps({"e": expires_at, "v": value}, ensure_ascii=False, default=str)
+                    await client.set(f"{REDIS_KEY_PREFIX}:{key}", payload, ex=max(int(policy.ttl), 1))
+                except Exception as e:
+                    self.redis.failed(e)
+
+    def invalidate(self, tool_name: Optional[str] = None):
+        """Drop in-process entries for one tool (or all tools)."""
+        with self._lock:
+            if tool_name is None:
+                self._entries.clear()
+                return
+            prefix = f"{tool_name}:"
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def _store_local(self, key: str, value: Any, expires_at: float):
+        """Insert into the LRU, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters per tool plus LRU and Redis state."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "redis": self.redis.stats(),
+            "tools": {
+                name: dict(counters, ttl=self.policies[name].ttl)
+                for name, counters in self._stats.items()
+                if name in self.policies
+            },
+        }
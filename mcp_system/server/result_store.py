@@ -0,0 +1,302 @@
+"""Server-side result store for paginated tool results.
+
+Some tools return far more rows than a caller shows at once (thousands of
+hotels, every flight option, hundreds of eSIM bundles). Tools declare which
+of their result lists may be paged:
+
+    @mcp.tool(pages=PagePolicy("outbound", "return", size=25))
+
+A caller opts in per request with "page": {"size": N} (or "page": true for
+the tool's default size). When a declared list is longer than one page, the
+full lists are stored under a random handle for the policy's TTL and the
+response carries only the first page of each list, plus:
+
+    "_page": {
+        "handle": "...",        # pass to fetch_page
+        "next_cursor": "25",    # None once every list is exhausted
+        "page_size": 25,
+        "totals": {"outbound": 180, "return": 96},
+        "expires_in": 900
+    }
+
+The fetch_page(handle, cursor) tool returns the next slice of every stored
+list, shaped like the original result. Stored lists are kept in an
+in-process LRU and, when Redis is reachable, in Redis lists (one per path)
+so any worker process can serve the next page. Results are never modified
+in place (cached results are shared between callers).
+
+Environment variables:
+    MCP_PAGE_TTL: Default seconds a handle stays valid. Default 900.
+    MCP_PAGE_MAX_HANDLES: Handles kept in-process. Default 256.
+    MCP_PAGE_REDIS: Set to "0" to keep handles in-process only. Default
+        enabled when REDIS_URL is set.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from server.result_cache import RedisTier
+
+
+PAGE_TTL = float(os.getenv("MCP_PAGE_TTL", "900"))
+MAX_HANDLES = int(os.getenv("MCP_PAGE_MAX_HANDLES", "256"))
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Prefix for handle keys in Redis
+REDIS_KEY_PREFIX = "MCP:pages"
+
+
+class PagePolicy:
+    """Which result lists of a tool may be paged.
+
+    Args:
+        *paths: Dot-separated paths of the lists to page (e.g., "hotels",
+                "data.bundles"). Intermediate values must be dicts.
+        size: Default page size when a caller sends "page": true
+        ttl: Seconds a handle stays valid
+    """
+
+    def __init__(self, *paths: str, size: int = DEFAULT_PAGE_SIZE, ttl: float = PAGE_TTL):
+        if not paths:
+            raise ValueError("PagePolicy needs at least one list path")
+        for path in paths:
+            if not isinstance(path, str) or any(not part for part in path.split(".")):
+                raise ValueError(f"Page paths must be non-empty dot-separated strings, got {path!r}")
+        self.paths = paths
+        self.size = size
+        self.ttl = ttl
+
+
+def _get_list(result: Any, path: str) -> Optional[list]:
+    value = result
+    for segment in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(segment)
+    return value if isinstance(value, list) else None
+
+
+def _set_path(target: Dict[str, Any], path: str, value: Any):
+    """Set a dot-separated path in a dict built from scratch."""
+    *parents, leaf = path.split(".")
+    for segment in parents:
+        target = target.setdefault(segment, {})
+    target[leaf] = value
+
+
+def _replace_lists(result: Dict[str, Any], pages: Dict[str, list]) -> Dict[str, Any]:
+    """Copy result with the lists at the given paths replaced (only the containers on those paths are copied)."""
+    copied = dict(result)
+    for path, page in pages.items():
+        *parents, leaf = path.split(".")
+        target = copied
+        for segment in parents:
+            target[segment] = dict(target[segment])
+            target = target[segment]
+        target[leaf] = page
+    return copied
+
+
+class ResultStore:
+    """Holds full result lists under handles so callers can page through them."""
+
+    def __init__(self, max_handles: Optional[int] = None):
+        self.max_handles = max_handles or MAX_HANDLES
+        self.policies: Dict[str, PagePolicy] = {}
+        # handle -> (expires_at, tool name, {path: full list})
+        self._handles: "OrderedDict[str, Tuple[float, str, Dict[str, list]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.redis = RedisTier("PAGES", enabled=os.getenv("MCP_PAGE_REDIS", "1") != "0")
+        self._stats = {"paged": 0, "unpaged": 0, "fetches": 0, "redis_fetches": 0, "expired": 0, "evictions": 0}
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """Give a forked worker its own lock."""
+        self._lock = threading.Lock()
+
+    def configure_tool(self, tool_name: str, policy: Optional[PagePolicy]):
+        """Register (or clear) the page policy for a tool."""
+        if policy is None:
+            self.policies.pop(tool_name, None)
+        else:
+            self.policies[tool_name] = policy
+
+    def page_size(self, tool_name: str, spec: Any) -> Optional[int]:
+        """Resolve a request's "page" spec to a page size; None when not paging.
+
+        Raises:
+            ValueError: If the spec is malformed or the tool cannot be paged
+        """
+        if spec is None or spec is False:
+            return None
+        policy = self.policies.get(tool_name)
+        if policy is None:
+            raise ValueError(f"Tool '{tool_name}' does not support pagination")
+        if spec is True:
+            return policy.size
+        if not isinstance(spec, dict) or set(spec) - {"size"}:
+            raise ValueError("'page' must be true or an object {\"size\": n}")
+        size = spec.get("size", policy.size)
+        if not isinstance(size, int) or isinstance(size, bool) or not 1 <= size <= MAX_PAGE_SIZE:
+            raise ValueError(f"Page size must be an integer between 1 and {MAX_PAGE_SIZE}, got {size!r}")
+        return size
+
+    async def paginate(self, tool_name: str, result: Any, size: int) -> Any:
+        """Cut the tool's declared lists to their first page, storing the rest.
+
+        Error results and results that already fit in one page are returned
+        unchanged (no handle is created).
+        """
+        policy = self.policies[tool_name]
+        if not isinstance(result, dict) or result.get("error"):
+            return result
+        lists = {path: items for path in policy.paths if (items := _get_list(result, path)) is not None}
+        if not any(len(items) > size for items in lists.values()):
+            self._stats["unpaged"] += 1
+            return result
+
+        handle = secrets.token_urlsafe(12)
+        expires_at = time.time() + policy.ttl
+        self._store_local(handle, (expires_at, tool_name, lists))
+        await self._store_redis(handle, tool_name, lists, policy.ttl)
+        self._stats["paged"] += 1
+
+        paged = _replace_lists(result, {path: items[:size] for path, items in lists.items()})
+        paged["_page"] = self._page_info(handle, lists, 0, size, policy.ttl)
+        return paged
+
+    async def fetch(self, handle: str, cursor: str, size: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Return the page of every stored list starting at cursor.
+
+        Returns:
+            {<list paths>: [...], "_page": {...}}, or None if the handle is
+            unknown or expired
+
+        Raises:
+            ValueError: If the cursor or size is invalid
+        """
+        try:
+            offset = int(cursor)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid cursor {cursor!r}")
+        if offset < 0:
+            raise ValueError(f"Invalid cursor {cursor!r}")
+        if size is not None and not 1 <= size <= MAX_PAGE_SIZE:
+            raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}, got {size}")
+
+        entry = self._get_local(handle)
+        if entry is not None:
+            expires_at, tool_name, lists = entry
+            size = size or self._default_size(tool_name)
+            slices = {path: items[offset:offset + size] for path, items in lists.items()}
+            totals = {path: len(items) for path, items in lists.items()}
+            ttl = expires_at - time.time()
+        else:
+            found = await self._fetch_redis(handle, offset, size)
+            if found is None:
+                self._stats["expired"] += 1
+                return None
+            slices, totals, size, ttl = found
+            self._stats["redis_fetches"] += 1
+        self._stats["fetches"] += 1
+
+        page: Dict[str, Any] = {}
+        for path, items in slices.items():
+            _set_path(page, path, items)
+        page["_page"] = self._page_info(handle, totals, offset, size, ttl)
+        return page
+
+    def _default_size(self, tool_name: str) -> int:
+        policy = self.policies.get(tool_name)
+        return policy.size if policy is not None else DEFAULT_PAGE_SIZE
+
+    @staticmethod
+    def _page_info(handle: str, lists: Dict[str, Any], offset: int, size: int, ttl: float) -> Dict[str, Any]:
+        totals = {path: value if isinstance(value, int) else len(value) for path, value in lists.items()}
+        end = offset + size
+        return {
+            "handle": handle,
+            "next_cursor": str(end) if any(total > end for total in totals.values()) else None,
+            "page_size": size,
+            "totals": totals,
+            "expires_in": max(int(ttl), 0),
+        }
+
+    def _store_local(self, handle: str, entry: Tuple[float, str, Dict[str, list]]):
+        """Insert into the LRU, evicting the least recently used handles."""
+        with self._lock:
+            self._handles[handle] = entry
+            while len(self._handles) > self.max_handles:
+                self._handles.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _get_local(self, handle: str) -> Optional[Tuple[float, str, Dict[str, list]]]:
+        with self._lock:
+            entry = self._handles.get(handle)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._handles[handle]
+                return None
+            self._handles.move_to_end(handle)
+            return entry
+
+    async def _store_redis(self, handle: str, tool_name: str, lists: Dict[str, list], ttl: float):
+        """Store each list as a Redis list so pages can be read with LRANGE."""
+        client = self.redis.client()
+        if client is None:
+            return
+        key = f"{REDIS_KEY_PREFIX}:{handle}"
+        expire = max(int(ttl), 1)
+        meta = {"tool": tool_name, "totals": {path: len(items) for path, items in lists.items()}}
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.set(key, json.dumps(meta), ex=expire)
+                for path, items in lists.items():
+                    if items:
+                        pipe.rpush(f"{key}:{path}", *(json.dumps(item, ensure_ascii=False, default=str) for item in items))
+                        pipe.expire(f"{key}:{path}", expire)
+                await pipe.execute()
+        except Exception as e:
+            self.redis.failed(e)
+
+    async def _fetch_redis(self, handle: str, offset: int, size: Optional[int]):
+        client = self.redis.client()
+        if client is None:
+            return None
+        key = f"{REDIS_KEY_PREFIX}:{handle}"
+        try:
+            raw = await client.get(key)
+            if raw is None:
+                return None
+            meta = json.loads(raw)
+            size = size or self._default_size(meta["tool"])
+            paths = list(meta["totals"])
+            async with client.pipeline(transaction=False) as pipe:
+                for path in paths:
+                    pipe.lrange(f"{key}:{path}", offset, offset + size - 1)
+                pipe.ttl(key)
+                replies = await pipe.execute()
+        except Exception as e:
+            self.redis.failed(e)
+            return None
+        slices = {path: [json.loads(item) for item in items] for path, items in zip(paths, replies)}
+        return slices, meta["totals"], size, replies[-1]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return handle counts and page/fetch counters."""
+        return dict(
+            self._stats,
+            handles=len(self._handles),
+            max_handles=self.max_handles,
+            redis=self.redis.stats(),
+            tools={name: {"paths": list(policy.paths), "size": policy.size, "ttl": policy.ttl}
+                   for name, policy in self.policies.items()},
+        )
@@ -16,6 +16,19 @@ from test.test_visa_agent import test_visa_agent
 from test.test_flight_agent import test_flight_agent
 from test.test_utilities_agent import test_utilities_agent
 from test.test_memory_agent import test_memory_agent
+from test.test_batch_invoke import test_batch_invoke
+from test.test_streaming import test_streaming
+from test.test_result_cache import test_result_cache
+from test.test_projection import test_projection
+from test.test_deadline import test_deadline
+from test.test_admin_profiling import test_admin_profiling
+from test.test_pagination import test_pagination
+from test.test_ws_transport import test_ws_transport
+from test.test_inprocess_transport import test_inprocess_transport
+from test.test_retries import test_retries
+from test.test_run_memo import test_run_memo
+from test.test_dispatch import test_dispatch
+from test.test_shared_pool import test_shared_pool
 
 
 async def run_test_with_capture(test_func, test_name):
@@ -62,6 +75,19 @@ async def run_all_tests():
         (test_flight_agent, "Flight Agent"),
         (test_utilities_agent, "Utilities Agent"),
         (test_memory_agent, "Memory Agent"),
+        (test_batch_invoke, "Batch Invocation"),
+        (test_streaming, "Streamed Invocation"),
+        (test_result_cache, "Result Cache"),
+        (test_projection, "Result Projection"),
+        (test_deadline, "Request Deadlines"),
+        (test_admin_profiling, "Admin Profiling"),
+        (test_pagination, "Paginated Results"),
+        (test_ws_transport, "WebSocket Transport"),
+        (test_inprocess_transport, "In-Process Transport"),
+        (test_retries, "Retries and Hedging"),
+        (test_run_memo, "Run-Scoped Memo"),
+        (test_dispatch, "Dispatch Accounting"),
+        (test_shared_pool, "Shared HTTP Pool"),
     ]
     
     results = []
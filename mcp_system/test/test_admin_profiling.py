@@ -0,0 +1,97 @@
+"""Test script for the admin profiling endpoints."""
+
+import asyncio
+import io
+import sys
+import os
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from clients.main_agent_client import MainAgentClient
+
+
+async def test_admin_profiling():
+    """Test CPU profiles and memory snapshots behind ADMIN_TOKEN.
+
+    Uses the same ADMIN_TOKEN as the server (from the environment or .env).
+    """
+    print("=" * 60)
+    print("Testing Admin Profiling")
+    print("=" * 60)
+
+    base_url = f"{MainAgentClient.server_url}/admin/profile"
+    token = os.getenv("ADMIN_TOKEN")
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        if not token:
+            # Test 1: Without a token configured the endpoints are disabled
+            print("\n1. Testing disabled admin endpoints (ADMIN_TOKEN not set)...")
+            response = await client.post(f"{base_url}/cpu", params={"seconds": 1})
+            assert response.status_code == 404, f"Expected 404, got {response.status_code}"
+            print("✓ Admin endpoints disabled")
+            print("\nSet ADMIN_TOKEN for the server and this test to run the remaining checks")
+            return
+
+        headers = {"Authorization": f"Bearer {token}"}
+
+        # Test 1: Requests without the token are refused
+        print("\n1. Testing a missing admin token...")
+        response = await client.post(f"{base_url}/cpu", params={"seconds": 1})
+        assert response.status_code == 401, f"Expected 401, got {response.status_code}"
+        print("✓ Rejected with 401")
+
+        # Test 2: Collapsed-stack CPU profile
+        print("\n2. Testing a collapsed-stack CPU profile...")
+        response = await client.post(f"{base_url}/cpu", params={"seconds": 1, "idle": "true"}, headers=headers)
+        assert response.status_code == 200, f"Unexpected status: {response.status_code} {response.text}"
+        lines = response.text.splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines), "Expected 'stack count' lines"
+        print(f"✓ {len(lines)} distinct stacks")
+
+        # Test 3: Speedscope CPU profile
+        print("\n3. Testing a speedscope CPU profile...")
+        response = await client.post(f"{base_url}/cpu", params={"seconds": 1, "format": "speedscope", "idle": "true"},
+                                     headers=headers)
+        profile = response.json()
+        assert profile["shared"]["frames"] and profile["profiles"], f"Unexpected profile: {profile}"
+        print(f"✓ {len(profile['profiles'])} thread profiles")
+
+        # Test 4: Memory snapshots and diff
+        print("\n4. Testing memory snapshots...")
+        try:
+            base = (await client.post(f"{base_url}/memory/snapshots", headers=headers)).json()
+            await MainAgentClient.invoke("delegate", agent="hotel_agent", task="profiling test", args={})
+            target = (await client.post(f"{base_url}/memory/snapshots", headers=headers)).json()
+            response = await client.get(f"{base_url}/memory/diff", headers=headers,
+                                        params={"base": base["id"], "target": target["id"], "top": 5})
+            diff = response.json()
+            assert response.status_code == 200 and "top" in diff, f"Unexpected diff: {diff}"
+            print(f"✓ Diff of snapshots {base['id']} -> {target['id']}: {diff['size_diff_bytes']} bytes")
+
+            response = await client.get(f"{base_url}/memory/diff", headers=headers, params={"base": 0, "target": 0})
+            assert response.status_code == 404, f"Expected 404, got {response.status_code}"
+            print("✓ Unknown snapshot rejected with 404")
+        finally:
+            # Cleanup: stop tracing
+            await client.delete(f"{base_url}/memory", headers=headers)
+            await MainAgentClient.close()
+
+    print("\n" + "=" * 60)
+    print("Admin Profiling Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_admin_profiling())
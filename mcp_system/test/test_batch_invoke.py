@@ -0,0 +1,76 @@
+"""Test script for batched tool invocation."""
+
+import asyncio
+import io
+import sys
+import os
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clients.main_agent_client import MainAgentClient
+from clients.utilities_agent_client import UtilitiesAgentClient
+
+
+async def test_batch_invoke():
+    """Test the /tools/invoke_batch endpoint through invoke_many()."""
+    print("=" * 60)
+    print("Testing Batch Invocation")
+    print("=" * 60)
+
+    try:
+        # Test 1: Results come back in call order
+        print("\n1. Testing invoke_many with several delegate calls...")
+        calls = [
+            {"tool": "delegate", "parameters": {"agent": f"agent_{i}", "task": "noop", "args": {"i": i}}}
+            for i in range(5)
+        ]
+        results = await MainAgentClient.invoke_many(calls)
+        assert len(results) == len(calls), f"Expected {len(calls)} results, got {len(results)}"
+        for i, entry in enumerate(results):
+            assert "result" in entry, f"Call {i} failed: {entry.get('error')}"
+            assert entry["result"]["agent"] == f"agent_{i}", f"Result {i} out of order: {entry['result']}"
+        print(f"✓ Got {len(results)} results in call order")
+
+        # Test 2: A failing call does not fail the whole batch
+        print("\n2. Testing per-call errors...")
+        results = await MainAgentClient.invoke_many([
+            {"tool": "delegate", "parameters": {"agent": "ok", "task": "noop", "args": {}}},
+            {"tool": "delegate", "parameters": {"unexpected": "value"}},
+        ])
+        assert "result" in results[0], f"First call should succeed: {results[0]}"
+        assert results[1].get("error", {}).get("status_code") == 400, f"Second call should fail with 400: {results[1]}"
+        print(f"✓ Invalid call reported as: {results[1]['error']['detail']}")
+
+        # Test 3: Permissions are checked for every entry
+        print("\n3. Testing permission checks on batch entries...")
+        try:
+            await UtilitiesAgentClient.invoke_many([
+                {"tool": "get_real_time_date_time", "parameters": {"location": "Paris"}},
+                {"tool": "delegate", "parameters": {"agent": "x", "task": "y", "args": {}}},
+            ])
+            raise AssertionError("Utilities agent should not be allowed to call 'delegate'")
+        except PermissionError as e:
+            print(f"✓ Permission denied as expected: {e}")
+
+    finally:
+        # Cleanup
+        await MainAgentClient.close()
+        await UtilitiesAgentClient.close()
+
+    print("\n" + "=" * 60)
+    print("Batch Invocation Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_batch_invoke())
@@ -0,0 +1,80 @@
+"""Test script for request deadlines."""
+
+import asyncio
+import io
+import sys
+import os
+import time
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from clients.base_client import DEADLINE_HEADER, call_deadline
+from clients.main_agent_client import MainAgentClient
+
+
+async def test_deadline():
+    """Test that the server honors the caller's deadline."""
+    print("=" * 60)
+    print("Testing Request Deadlines")
+    print("=" * 60)
+
+    # Unique arguments so no call is answered from the result cache
+    payload = {
+        "tool": "delegate",
+        "parameters": {"agent": "hotel_agent", "task": "deadline test", "args": {"nonce": time.time()}}
+    }
+    url = f"{MainAgentClient.server_url}/tools/invoke"
+
+    try:
+        # Test 1: A call well within its deadline succeeds
+        print("\n1. Testing a call within its deadline...")
+        with call_deadline(10):
+            result = await MainAgentClient.invoke("delegate", agent="hotel_agent", task="deadline test", args={})
+        assert result["status"], f"Unexpected result: {result}"
+        print("✓ Call completed")
+
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            # Test 2: A spent budget is answered with 504 without running the tool
+            print("\n2. Testing an exhausted deadline...")
+            response = await client.post(url, json=payload, headers={DEADLINE_HEADER: "0"})
+            assert response.status_code == 504, f"Expected 504, got {response.status_code}"
+            print(f"✓ Rejected with 504: {response.json()['detail']}")
+
+            # Test 3: Malformed deadlines are rejected
+            print("\n3. Testing an invalid deadline header...")
+            response = await client.post(url, json=payload, headers={DEADLINE_HEADER: "soon"})
+            assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+            print(f"✓ Rejected with 400: {response.json()['detail']}")
+
+        # Test 4: The client does not send calls past its own deadline
+        print("\n4. Testing an expired client deadline...")
+        with call_deadline(0):
+            try:
+                await MainAgentClient.invoke("delegate", agent="hotel_agent", task="deadline test", args={})
+                assert False, "Expected TimeoutError"
+            except TimeoutError:
+                print("✓ Call not sent")
+
+    finally:
+        # Cleanup
+        await MainAgentClient.close()
+
+    print("\n" + "=" * 60)
+    print("Request Deadline Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_deadline())
@@ -0,0 +1,98 @@
+"""Test script for the in-process transport."""
+
+import asyncio
+import io
+import sys
+import os
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from clients.base_client import BaseAgentClient
+from clients.inprocess import get_inprocess_channel
+
+
+async def test_inprocess_transport():
+    """Test calls, errors, permissions and streams without going through HTTP."""
+    print("=" * 60)
+    print("Testing In-Process Transport")
+    print("=" * 60)
+
+    if get_inprocess_channel() is None:
+        print("\n⚠ The MCP server cannot be loaded in this process, skipping")
+        return
+
+    # Nothing listens on this URL: every call must stay in-process
+    client = BaseAgentClient(
+        name="InProcessTest", allowed_tools=["delegate"], server_url="http://127.0.0.1:9", transport="inprocess"
+    )
+    try:
+        # Test 1: Concurrent calls get their own results
+        print("\n1. Testing 20 concurrent calls...")
+        results = await asyncio.gather(*(
+            client.invoke("delegate", agent=f"agent_{i}", task="inprocess test", args={"i": i}) for i in range(20)
+        ))
+        for i, result in enumerate(results):
+            assert result["agent"] == f"agent_{i}", f"Result {i} matched to the wrong call: {result}"
+        print(f"✓ {len(results)} results")
+
+        # Test 2: Results are copies, like decoded responses
+        print("\n2. Testing that results do not share objects with the caller or the server...")
+        args = {"nested": [1, 2], "pair": (3, 4)}
+        result = await client.invoke("delegate", agent="copy", task="inprocess test", args=args)
+        assert result["args"] is not args and result["args"]["nested"] is not args["nested"]
+        assert result["args"] == {"nested": [1, 2], "pair": [3, 4]}, f"Unexpected result: {result}"
+        print("✓ Detached copy (tuples as lists)")
+
+        # Test 3: Errors are raised like HTTP errors
+        print("\n3. Testing an invalid call...")
+        try:
+            await client.invoke("delegate", unexpected="value")
+            assert False, "Expected a 400 for an unknown parameter"
+        except httpx.HTTPStatusError as e:
+            assert e.response.status_code == 400
+            print(f"✓ Rejected with 400: {e.response.json()['detail'][:60]}...")
+
+        # Test 4: The permission check still applies
+        print("\n4. Testing a tool outside allowed_tools...")
+        try:
+            await client.invoke("get_list_of_hotels", city_name="Paris")
+            assert False, "Expected a PermissionError"
+        except PermissionError:
+            print("✓ PermissionError raised")
+
+        # Test 5: invoke_many, list_tools and invoke_stream
+        print("\n5. Testing invoke_many, list_tools and invoke_stream...")
+        entries = await client.invoke_many([
+            {"tool": "delegate", "parameters": {"agent": "ok", "task": "noop", "args": {}}},
+            {"tool": "delegate", "parameters": {"unexpected": "value"}},
+        ])
+        assert "result" in entries[0] and entries[1]["error"]["status_code"] == 400, f"Unexpected entries: {entries}"
+        tools = await client.list_tools()
+        assert [tool["name"] for tool in tools] == ["delegate"], f"Unexpected tools: {tools}"
+        events = [event async for event in client.invoke_stream("delegate", agent="s", task="noop", args={})]
+        assert events[-1]["type"] == "result" and events[-1]["data"]["agent"] == "s", f"Unexpected events: {events}"
+        print("✓ Batch entries, filtered catalog and result event")
+
+    finally:
+        # Cleanup
+        await client.close()
+
+    print("\n" + "=" * 60)
+    print("In-Process Transport Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_inprocess_transport())
@@ -0,0 +1,101 @@
+"""Test script for paginated tool results."""
+
+import asyncio
+import io
+import sys
+import os
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from clients.base_client import BaseAgentClient
+from clients.flight_agent_client import FlightAgentClient
+from clients.hotel_agent_client import HotelAgentClient
+from clients.utilities_agent_client import UtilitiesAgentClient
+
+
+async def test_pagination():
+    """Test that long result lists are paged behind a handle, and only when asked."""
+    print("=" * 60)
+    print("Testing Paginated Results")
+    print("=" * 60)
+
+    # Paging is opt-in per client; the agents' shared clients return whole lists
+    client = BaseAgentClient(
+        name="PageTest",
+        allowed_tools=["get_list_of_hotels", "fetch_page", "delegate"],
+        pages={"get_list_of_hotels": 50}
+    )
+    try:
+        # Test 1: A long hotel list comes back one page at a time
+        print("\n1. Testing the first page of a hotel list...")
+        result = await client.invoke("get_list_of_hotels", city_name="Paris", country_code="FR", limit=120)
+        if result.get("error"):
+            print(f"⚠ Hotel search failed ({result.get('error_code')}), skipping page checks")
+        elif "_page" not in result:
+            print(f"⚠ Only {len(result.get('hotels', []))} hotels returned, nothing to page")
+        else:
+            page = result["_page"]
+            total = page["totals"]["hotels"]
+            assert len(result["hotels"]) == page["page_size"], "First page has the wrong size"
+            print(f"✓ {len(result['hotels'])} of {total} hotels, handle {page['handle']}")
+
+            # Test 2: fetch_page walks the rest of the list
+            print("\n2. Testing fetch_page...")
+            seen = len(result["hotels"])
+            while (result := await client.next_page(result)) is not None:
+                assert not result.get("error"), f"Unexpected error: {result}"
+                seen += len(result["hotels"])
+            assert seen == total, f"Expected {total} hotels across pages, got {seen}"
+            print(f"✓ All {seen} hotels fetched")
+
+        # Test 3: Unknown handles and bad cursors are reported as errors
+        print("\n3. Testing an unknown handle and an invalid cursor...")
+        result = await client.invoke("fetch_page", handle="unknown", cursor="50")
+        assert result.get("error_code") == "PAGE_HANDLE_EXPIRED", f"Unexpected result: {result}"
+        result = await client.invoke("fetch_page", handle="unknown", cursor="next")
+        assert result.get("error_code") == "INVALID_CURSOR", f"Unexpected result: {result}"
+        print("✓ Errors returned")
+
+        # Test 4: Tools without a page policy reject a page request
+        print("\n4. Testing a page request for a tool that cannot be paged...")
+        async with httpx.AsyncClient(timeout=10.0) as http:
+            response = await http.post(f"{client.server_url}/tools/invoke", json={
+                "tool": "delegate",
+                "parameters": {"agent": "hotel_agent", "task": "page test", "args": {}},
+                "page": {"size": 10}
+            })
+        assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+        print(f"✓ Rejected with 400: {response.json()['detail']}")
+
+        # Test 5: The agents' clients do not page (their nodes read whole lists)
+        print("\n5. Testing that agent clients request whole lists...")
+        for agent_client, tool_name in ((HotelAgentClient, "get_list_of_hotels"),
+                                        (FlightAgentClient, "agent_get_flights_tool"),
+                                        (UtilitiesAgentClient, "get_esim_bundles")):
+            payload = agent_client._call_payload(tool_name, {})
+            assert "page" not in payload, f"{agent_client.name} pages {tool_name} by default"
+        print("✓ No default page sizes")
+
+    finally:
+        # Cleanup
+        await client.close()
+
+    print("\n" + "=" * 60)
+    print("Paginated Results Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_pagination())
@@ -0,0 +1,87 @@
+"""Test script for server-side result projection."""
+
+import asyncio
+import io
+import sys
+import os
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from clients.main_agent_client import MainAgentClient
+
+
+async def test_projection():
+    """Test that projections trim results on the server."""
+    print("=" * 60)
+    print("Testing Result Projection")
+    print("=" * 60)
+
+    args = {
+        "items": [{"id": i, "token": f"tok-{i}", "images": list(range(10))} for i in range(8)],
+        "meta": {"source": "test", "debug": True},
+    }
+
+    try:
+        # Test 1: Exclude paths and per-array limits
+        print("\n1. Testing exclude and limits...")
+        result = await MainAgentClient.invoke_projected(
+            "delegate",
+            {"exclude": ["args.items.token", "args.meta.debug"], "limits": {"args.items": 3, "args.items.images": 2}},
+            agent="hotel_agent", task="projection test", args=args
+        )
+        items = result["args"]["items"]
+        assert len(items) == 3, f"Expected 3 items, got {len(items)}"
+        assert all("token" not in item and len(item["images"]) == 2 for item in items)
+        assert result["args"]["meta"] == {"source": "test"}
+        assert result["_truncated"] == {"args.items": 8}
+        print("✓ Excluded fields dropped and arrays capped")
+
+        # Test 2: Include paths keep only the listed fields
+        print("\n2. Testing include...")
+        result = await MainAgentClient.invoke_projected(
+            "delegate", {"include": ["status", "args.items.id"]},
+            agent="hotel_agent", task="projection test", args=args
+        )
+        assert result == {"status": result["status"], "args": {"items": [{"id": i} for i in range(8)]}}
+        print("✓ Only included fields returned")
+
+        # Test 3: An empty projection returns the full result
+        print("\n3. Testing empty projection...")
+        result = await MainAgentClient.invoke_projected("delegate", {}, agent="hotel_agent", task="projection test", args=args)
+        assert result["args"] == args
+        print("✓ Full result returned")
+
+        # Test 4: Malformed specs are rejected
+        print("\n4. Testing invalid projection...")
+        try:
+            await MainAgentClient.invoke_projected(
+                "delegate", {"limits": {"args.items": -1}}, agent="hotel_agent", task="projection test", args=args
+            )
+            assert False, "Expected a 400 for a negative limit"
+        except httpx.HTTPStatusError as e:
+            assert e.response.status_code == 400
+            print(f"✓ Rejected with 400: {e.response.json()['detail']}")
+
+    finally:
+        # Cleanup
+        await MainAgentClient.close()
+
+    print("\n" + "=" * 60)
+    print("Result Projection Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_projection())
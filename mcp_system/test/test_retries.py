@@ -0,0 +1,180 @@
+"""Test script for idempotency-aware retries and hedged requests."""
+
+import asyncio
+import io
+import json
+import sys
+import os
+import time
+from typing import Optional
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from clients.base_client import BaseAgentClient
+from clients.hedging import HedgePolicy
+
+
+async def _dropping_server(catalog: Optional[dict], requests: list, status: Optional[int] = None):
+    """Start a server that serves /tools/list (unless catalog is None) and drops every other request.
+
+    With a status, other requests get an empty "<status> Gateway Timeout" response instead of being dropped.
+    """
+    body = json.dumps(catalog).encode()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        head = await reader.readuntil(b"\r\n\r\n")
+        request_line = head.split(b"\r\n", 1)[0].decode()
+        requests.append(request_line)
+        if request_line.startswith("GET /tools/list") and catalog is not None:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+            await writer.drain()
+        elif status is not None:
+            await reader.read(int(dict(
+                line.split(": ", 1) for line in head.decode().split("\r\n")[1:] if ": " in line
+            ).get("content-length", 0)))
+            writer.write(f"HTTP/1.1 {status} Gateway Timeout\r\nContent-Length: 0\r\n\r\n".encode())
+            await writer.drain()
+        else:
+            # The request arrived, but no response follows: the call may have run
+            await reader.read(int(dict(
+                line.split(": ", 1) for line in head.decode().split("\r\n")[1:] if ": " in line
+            ).get("content-length", 0)))
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def test_retries():
+    """Test idempotency metadata, retry rules and hedging."""
+    print("=" * 60)
+    print("Testing Retries and Hedging")
+    print("=" * 60)
+
+    client = BaseAgentClient(name="RetryTest", allowed_tools=["delegate"], hedge=True)
+    try:
+        # Test 1: The catalog marks tools with side effects as not idempotent
+        print("\n1. Testing idempotency metadata in /tools/list...")
+        async with httpx.AsyncClient() as http:
+            tools = {tool["name"]: tool for tool in (await http.get(f"{client.server_url}/tools/list")).json()["tools"]}
+        for name in ("book_hotel_room", "agent_add_plan_item_tool", "agent_store_memory_tool"):
+            assert tools[name]["idempotent"] is False, f"{name} should not be idempotent"
+        for name in ("delegate", "get_list_of_hotels"):
+            assert tools[name]["idempotent"] is True, f"{name} should be idempotent"
+        print("✓ Writes are not idempotent, reads are")
+
+        # Test 2: Hedged calls (separate executions on the server) return normally
+        print("\n2. Testing calls with hedging enabled...")
+        results = await asyncio.gather(*(
+            client.invoke("delegate", agent=f"agent_{i}", task="hedge test", args={}) for i in range(30)
+        ))
+        assert [result["agent"] for result in results] == [f"agent_{i}" for i in range(30)]
+        print("✓ 30 calls returned their own results")
+    finally:
+        # Cleanup
+        await client.close()
+
+    # Test 3: An ambiguous failure is retried only for idempotent tools
+    print("\n3. Testing retries after a dropped response...")
+    requests = []
+    catalog = {"version": "test", "tools": [
+        {"name": "delegate", "idempotent": True}, {"name": "book_hotel_room", "idempotent": False}
+    ]}
+    server = await _dropping_server(catalog, requests)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    dropped = BaseAgentClient(name="DropTest", allowed_tools=["delegate", "book_hotel_room"], server_url=url)
+    try:
+        for tool_name, expected in (("book_hotel_room", 1), ("delegate", 3)):
+            requests.clear()
+            try:
+                await dropped.invoke(tool_name)
+                assert False, "Expected the dropped response to fail the call"
+            except httpx.HTTPError:
+                pass
+            posts = [line for line in requests if line.startswith("POST")]
+            assert len(posts) == expected, f"{tool_name}: expected {expected} attempts, got {len(posts)}"
+            print(f"✓ {tool_name}: {len(posts)} attempt(s)")
+    finally:
+        await dropped.close()
+        server.close()
+        await server.wait_closed()
+
+    # Test 4: An error status (even a 504 "Gateway Timeout") is not retried
+    print("\n4. Testing an idempotent call answered with 504...")
+    requests = []
+    server = await _dropping_server(catalog, requests, status=504)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    timed_out = BaseAgentClient(name="GatewayTimeoutTest", allowed_tools=["delegate"], server_url=url)
+    try:
+        try:
+            await timed_out.invoke("delegate")
+            assert False, "Expected the 504 to fail the call"
+        except httpx.HTTPStatusError as e:
+            assert e.response.status_code == 504
+        posts = [line for line in requests if line.startswith("POST")]
+        assert len(posts) == 1, f"Expected 1 attempt, got {len(posts)}"
+        print("✓ 1 attempt")
+    finally:
+        await timed_out.close()
+        server.close()
+        await server.wait_closed()
+
+    # Test 5: A failed catalog load is not retried on every call
+    print("\n5. Testing calls while /tools/list is down...")
+    requests = []
+    server = await _dropping_server(None, requests)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    no_catalog = BaseAgentClient(name="NoCatalogTest", allowed_tools=["delegate"], server_url=url)
+    try:
+        for attempt in range(3):
+            start = time.perf_counter()
+            try:
+                await no_catalog.invoke("delegate")
+                assert False, "Expected the dropped response to fail the call"
+            except httpx.HTTPError:
+                pass
+            elapsed = time.perf_counter() - start
+            if attempt:
+                assert elapsed < 0.5, f"Call {attempt} waited {elapsed:.2f}s for the catalog"
+        gets = [line for line in requests if line.startswith("GET")]
+        posts = [line for line in requests if line.startswith("POST")]
+        assert len(posts) == 3, f"Expected one attempt per call (not idempotent), got {len(posts)}"
+        assert len(gets) <= 3, f"Expected the catalog load to be tried once (with its retries), got {len(gets)}"
+        print(f"✓ {len(gets)} catalog request(s) for 3 calls")
+    finally:
+        await no_catalog.close()
+        server.close()
+        await server.wait_closed()
+
+    # Test 6: A slow call is hedged and the faster reply wins
+    print("\n6. Testing the hedge policy...")
+    policy = HedgePolicy(percentile=95, budget=0.5, min_samples=5, min_delay=0.01)
+    for _ in range(5):
+        await policy.run("tool", lambda hedge: asyncio.sleep(0.01, result="fast"))
+    start = time.perf_counter()
+    result = await policy.run("tool", lambda hedge: asyncio.sleep(0.01 if hedge else 2.0, result=hedge))
+    elapsed = time.perf_counter() - start
+    assert result is True and elapsed < 1.0, f"Expected the hedge to win quickly, got {result} after {elapsed:.2f}s"
+    stats = policy.stats()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1, f"Unexpected stats: {stats}"
+    print(f"✓ Hedge won after {elapsed * 1000:.0f} ms ({stats})")
+
+    print("\n" + "=" * 60)
+    print("Retries and Hedging Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_retries())
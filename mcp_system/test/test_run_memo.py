@@ -0,0 +1,94 @@
+"""Test script for the run-scoped memo of tool results."""
+
+import asyncio
+import io
+import sys
+import os
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clients.base_client import BaseAgentClient
+from clients.run_memo import current_run_memo, run_memo
+
+
+async def test_run_memo():
+    """Test that repeated idempotent calls within a run are answered from the memo."""
+    print("=" * 60)
+    print("Testing Run-Scoped Memo")
+    print("=" * 60)
+
+    client = BaseAgentClient(name="MemoTest", allowed_tools=["delegate", "book_hotel_room"])
+    try:
+        with run_memo("test-run") as memo:
+            # Test 1: A repeated call is answered from the memo, as a separate copy
+            print("\n1. Testing a repeated call...")
+            first = await client.invoke("delegate", agent="hotel_agent", task="search", args={"city": "Paris"})
+            second = await client.invoke("delegate", agent="hotel_agent", task="search", args={"city": "Paris"})
+            assert first == second and first is not second, "Expected an equal copy"
+            first["args"]["city"] = "changed"
+            third = await client.invoke("delegate", agent="hotel_agent", task="search", args={"city": "Paris"})
+            assert third["args"]["city"] == "Paris", "A caller's change leaked into the memo"
+            assert memo.stats()["hits"] == 2 and memo.stats()["misses"] == 1, f"Unexpected stats: {memo.stats()}"
+            print(f"✓ Served from the memo: {memo.stats()}")
+
+            # Test 2: Changed arguments are sent
+            print("\n2. Testing changed arguments...")
+            other = await client.invoke("delegate", agent="hotel_agent", task="search", args={"city": "Rome"})
+            assert other["args"]["city"] == "Rome" and memo.stats()["misses"] == 2
+            print("✓ Sent to the server")
+
+            # Test 3: Concurrent identical calls share one request
+            print("\n3. Testing concurrent identical calls...")
+            results = await asyncio.gather(*(
+                client.invoke("delegate", agent="flight_agent", task="search", args={"to": "LIS"}) for _ in range(5)
+            ))
+            assert all(result["args"]["to"] == "LIS" for result in results)
+            assert memo.stats()["misses"] == 3, f"Expected one request: {memo.stats()}"
+            print("✓ One request for 5 calls")
+
+            # Test 4: invoke_many skips calls made earlier in the run
+            print("\n4. Testing invoke_many...")
+            entries = await client.invoke_many([
+                {"tool": "delegate", "parameters": {"agent": "hotel_agent", "task": "search", "args": {"city": "Paris"}}},
+                {"tool": "delegate", "parameters": {"agent": "hotel_agent", "task": "search", "args": {"city": "Oslo"}}},
+            ])
+            assert entries[0]["result"]["args"]["city"] == "Paris" and entries[1]["result"]["args"]["city"] == "Oslo"
+            again = await client.invoke("delegate", agent="hotel_agent", task="search", args={"city": "Oslo"})
+            assert again["args"]["city"] == "Oslo"
+            assert memo.stats()["misses"] == 4, f"Expected only Oslo to be sent once: {memo.stats()}"
+            print(f"✓ Batch hits and stores: {memo.stats()}")
+
+            # Test 5: Tools with side effects are never memoized
+            print("\n5. Testing a non-idempotent tool...")
+            before = memo.stats()
+            await client.invoke("book_hotel_room")
+            await client.invoke("book_hotel_room")
+            after = memo.stats()
+            assert (after["hits"], after["misses"]) == (before["hits"], before["misses"]), f"Unexpected stats: {after}"
+            print("✓ Both calls went to the server")
+
+        # Test 6: The memo ends with the run
+        print("\n6. Testing outside the run...")
+        assert current_run_memo() is None
+        print("✓ No memo outside run_memo()")
+    finally:
+        # Cleanup
+        await client.close()
+
+    print("\n" + "=" * 60)
+    print("Run-Scoped Memo Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_run_memo())
@@ -0,0 +1,68 @@
+"""Test script for the shared HTTP pool across event loops."""
+
+import asyncio
+import io
+import sys
+import os
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clients.base_client import BaseAgentClient, close_shared_connections
+from clients.http_pool import shared_pool
+
+
+def _run_requests(client: BaseAgentClient, runs: int, close: bool):
+    """Make one call per asyncio.run(), like the frontend does per request."""
+
+    async def one_request(index: int):
+        try:
+            return await client.invoke("delegate", agent=f"loop_{index}", task="pool test", args={})
+        finally:
+            if close:
+                await close_shared_connections()
+
+    return [asyncio.run(one_request(index)) for index in range(runs)]
+
+
+async def test_shared_pool():
+    """Test that the pool does not keep the shards of finished event loops."""
+    print("=" * 60)
+    print("Testing Shared HTTP Pool Across Event Loops")
+    print("=" * 60)
+
+    client = BaseAgentClient(name="PoolTest", allowed_tools=["delegate"], transport="http")
+
+    # Test 1: Loops closed with close_shared_connections() leave nothing behind
+    print("\n1. Testing 10 loops closed with close_shared_connections()...")
+    loops_before = len(shared_pool._loops)
+    results = await asyncio.to_thread(_run_requests, client, 10, True)
+    assert [result["agent"] for result in results] == [f"loop_{i}" for i in range(10)]
+    assert len(shared_pool._loops) == loops_before, f"Expected no new loop entries: {len(shared_pool._loops)}"
+    print("✓ No shards left behind")
+
+    # Test 2: Shards of loops that ended without closing them are dropped
+    print("\n2. Testing 10 loops that end without closing the pool...")
+    await asyncio.to_thread(_run_requests, client, 10, False)
+    abandoned = [loop for loop in shared_pool._loops if loop.is_closed()]
+    assert len(abandoned) <= 1, f"Shards of {len(abandoned)} closed loops are kept"
+    print(f"✓ At most one closed loop kept ({shared_pool.stats()['abandoned']} dropped so far)")
+
+    await client.close()
+
+    print("\n" + "=" * 60)
+    print("Shared HTTP Pool Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_shared_pool())
@@ -0,0 +1,78 @@
+"""Test script for streamed tool invocation."""
+
+import asyncio
+import io
+import sys
+import os
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clients.main_agent_client import MainAgentClient
+from clients.flight_agent_client import FlightAgentClient
+
+
+async def test_streaming():
+    """Test the /tools/invoke_stream endpoint through invoke_stream()."""
+    print("=" * 60)
+    print("Testing Streamed Invocation")
+    print("=" * 60)
+
+    try:
+        # Test 1: Non-streaming tools emit a single result event
+        print("\n1. Testing invoke_stream on a non-streaming tool...")
+        events = [
+            event async for event in MainAgentClient.invoke_stream(
+                "delegate", agent="hotel_agent", task="noop", args={}
+            )
+        ]
+        assert len(events) == 1, f"Expected a single event, got {len(events)}"
+        assert events[0]["type"] == "result", f"Expected a result event, got {events[0]['type']}"
+        print(f"✓ Got result event: {events[0]['data']}")
+
+        # Test 2: Flexible flight search streams one partial per date
+        print("\n2. Testing agent_get_flights_flexible_tool streaming (days_flex=1)...")
+        print("   Note: This test uses SerpAPI and may take 10-30 seconds")
+        partial_dates = []
+        final = None
+        async for event in FlightAgentClient.invoke_stream(
+            "agent_get_flights_flexible_tool",
+            trip_type="one-way",
+            departure="JFK",
+            arrival="LAX",
+            departure_date="2025-12-10",
+            days_flex=1
+        ):
+            if event["type"] == "partial":
+                partial_dates.append(event["data"].get("search_date"))
+                print(f"  • {event['data'].get('search_date')}: {len(event['data'].get('flights', []))} flights")
+            elif event["type"] == "result":
+                final = event["data"]
+        assert final is not None, "Stream ended without a result event"
+        if final.get("error"):
+            print(f"  Note: API returned error (expected if no API key): {final.get('error_message')}")
+        else:
+            assert len(partial_dates) == 3, f"Expected 3 partial events, got {len(partial_dates)}"
+            print(f"✓ Streamed {len(partial_dates)} dates, {len(final.get('flights', []))} flights total")
+
+    finally:
+        # Cleanup
+        await MainAgentClient.close()
+        await FlightAgentClient.close()
+
+    print("\n" + "=" * 60)
+    print("Streamed Invocation Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_streaming())
@@ -0,0 +1,121 @@
+"""Test script for the multiplexed WebSocket transport."""
+
+import asyncio
+import io
+import sys
+import os
+
+# Fix encoding for Windows console (only if buffer is available and when run directly)
+if __name__ == "__main__":
+    try:
+        if hasattr(sys.stdout, 'buffer') and sys.stdout.buffer is not None:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    except (AttributeError, ValueError, OSError):
+        # If buffer is not available or closed, skip encoding fix
+        pass
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from clients.base_client import BaseAgentClient, close_shared_connections
+from clients.http_pool import shared_pool
+from clients import ws_channel
+from clients.ws_channel import get_channel, websockets
+
+
+async def test_ws_transport():
+    """Test concurrent calls, error mapping and reconnects over /tools/ws."""
+    print("=" * 60)
+    print("Testing WebSocket Transport")
+    print("=" * 60)
+
+    if websockets is None:
+        print("\n⚠ The websockets package is not installed, skipping")
+        return
+
+    client = BaseAgentClient(name="WsTest", allowed_tools=["delegate"], transport="ws")
+    try:
+        # Test 1: Concurrent calls share one connection and get their own replies
+        print("\n1. Testing 20 concurrent calls on one connection...")
+        results = await asyncio.gather(*(
+            client.invoke("delegate", agent=f"agent_{i}", task="ws test", args={"i": i}) for i in range(20)
+        ))
+        for i, result in enumerate(results):
+            assert result["agent"] == f"agent_{i}", f"Reply {i} matched to the wrong call: {result}"
+        channel = get_channel(client.server_url)
+        assert channel.stats["connects"] == 1, f"Expected one connection: {channel.stats}"
+        print(f"✓ {len(results)} replies on {channel.stats['connects']} connection")
+
+        # Test 2: Errors are raised like HTTP errors
+        print("\n2. Testing an invalid call...")
+        try:
+            await client.invoke("delegate", unexpected="value")
+            assert False, "Expected a 400 for an unknown parameter"
+        except httpx.HTTPStatusError as e:
+            assert e.response.status_code == 400
+            print(f"✓ Rejected with 400: {e.response.json()['detail'][:60]}...")
+
+        # Test 3: A closed connection is replaced on the next call
+        print("\n3. Testing reconnect after the connection closes...")
+        await channel.close()
+        result = await client.invoke("delegate", agent="again", task="ws test", args={})
+        assert result["agent"] == "again"
+        assert channel.stats["connects"] == 2, f"Expected a reconnect: {channel.stats}"
+        print("✓ Reconnected")
+
+        # Test 4: invoke_many sends every call as its own message
+        print("\n4. Testing invoke_many over the channel...")
+        entries = await client.invoke_many([
+            {"tool": "delegate", "parameters": {"agent": "ok", "task": "noop", "args": {}}},
+            {"tool": "delegate", "parameters": {"unexpected": "value"}},
+        ])
+        assert "result" in entries[0] and entries[1]["error"]["status_code"] == 400, f"Unexpected entries: {entries}"
+        print("✓ Per-call results and errors")
+
+        # Test 5: Closing one agent client leaves the shared connections to the others
+        print("\n5. Testing close() of another client...")
+        other = BaseAgentClient(name="WsOther", allowed_tools=["delegate"], transport="ws")
+        await other.invoke("delegate", agent="other", task="ws test", args={})
+        created = shared_pool.stats()["clients_created"]
+        await other.close()
+        result = await client.invoke("delegate", agent="after", task="ws test", args={})
+        assert result["agent"] == "after"
+        assert get_channel(client.server_url) is channel and channel.stats["connects"] == 2, \
+            f"The shared channel was closed: {channel.stats}"
+        assert shared_pool.stats()["clients_created"] == created, "The shared HTTP pool was closed"
+        print("✓ Channel and HTTP pool still open")
+
+        # Test 6: Channels of finished event loops are closed and forgotten
+        print("\n6. Testing channels of short-lived event loops...")
+
+        def run_loops():
+            sockets = []
+
+            async def one_request():
+                await client.invoke("delegate", agent="loop", task="ws test", args={})
+                sockets.append(get_channel(client.server_url)._ws)
+
+            for _ in range(5):
+                asyncio.run(one_request())
+            return sockets
+
+        loop_sockets = await asyncio.to_thread(run_loops)
+        assert all(ws.transport.is_closing() for ws in loop_sockets), "A finished loop's socket is still open"
+        closed_loops = [loop for loop in ws_channel._channels if loop.is_closed()]
+        assert len(closed_loops) <= 1, f"Channels of {len(closed_loops)} closed loops are kept"
+        print("✓ Sockets closed with their loops, at most one closed loop kept")
+
+    finally:
+        # Cleanup
+        await client.close()
+        await close_shared_connections()
+
+    print("\n" + "=" * 60)
+    print("WebSocket Transport Test Complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_ws_transport())
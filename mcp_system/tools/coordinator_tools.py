@@ -1,6 +1,6 @@
 """Coordinator tools for agent orchestration."""
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from tools.doc_loader import get_doc
 
 
@@ -31,4 +31,34 @@ def register_coordinator_tools(mcp):
             "task": task,
             "args": args
         }
-
+    
+    @mcp.tool(description=get_doc("fetch_page", "coordinator"))
+    async def fetch_page(handle: str, cursor: str, size: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch the next page of a paginated tool result.
+        
+        Args:
+            handle: The _page.handle of a paginated result
+            cursor: The _page.next_cursor of the previous page
+            size: Optional number of items per list (defaults to the tool's page size)
+        
+        Returns:
+            Dictionary with the next items of each paginated list (same keys
+            as the original result) and a "_page" object with the next cursor
+        """
+        try:
+            page = await mcp.result_store.fetch(handle, cursor, size)
+        except ValueError as e:
+            return {
+                "error": True,
+                "error_code": "INVALID_CURSOR",
+                "error_message": str(e),
+                "suggestion": "Pass the next_cursor value from the previous page's _page object"
+            }
+        if page is None:
+            return {
+                "error": True,
+                "error_code": "PAGE_HANDLE_EXPIRED",
+                "error_message": f"Page handle '{handle}' is unknown or has expired",
+                "suggestion": "Run the original search again to get a new handle"
+            }
+        return page
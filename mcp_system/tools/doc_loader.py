@@ -2,9 +2,27 @@
 
 import json
 import os
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
 
+# mcp_system/tool_docs
+DOCS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tool_docs")
+
+
+@lru_cache(maxsize=None)
+def _load_docs(category: str) -> Dict[str, Any]:
+    """Read and parse a category's documentation file once per process.
+    
+    Raises:
+        FileNotFoundError, json.JSONDecodeError: Propagated to the callers,
+            which report them; failures are not cached.
+    """
+    docs_file = os.path.join(DOCS_DIR, f"{category}_docs.json")
+    with open(docs_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
 def get_doc(tool_name: str, category: str = "hotel") -> str:
     """Load tool description from JSON documentation file.
     
@@ -16,16 +34,7 @@ def get_doc(tool_name: str, category: str = "hotel") -> str:
         Tool description string, or empty string if not found
     """
     try:
-        # Get the directory where this file is located
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # Go up one level to mcp_system, then into tool_docs
-        docs_dir = os.path.join(os.path.dirname(current_dir), "tool_docs")
-        docs_file = os.path.join(docs_dir, f"{category}_docs.json")
-        
-        with open(docs_file, "r", encoding="utf-8") as f:
-            docs = json.load(f)
-        
-        tool_doc = docs.get(tool_name, {})
+        tool_doc = _load_docs(category).get(tool_name, {})
         return tool_doc.get("description", "")
     except FileNotFoundError:
         print(f"Warning: Documentation file not found for {category}_docs.json")
@@ -49,16 +58,8 @@ def get_tool_metadata(tool_name: str, category: str = "hotel") -> Dict[str, Any]
         Dictionary containing tool metadata, or empty dict if not found
     """
     try:
-        # Get the directory where this file is located
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # Go up one level to mcp_system, then into tool_docs
-        docs_dir = os.path.join(os.path.dirname(current_dir), "tool_docs")
-        docs_file = os.path.join(docs_dir, f"{category}_docs.json")
-        
-        with open(docs_file, "r", encoding="utf-8") as f:
-            docs = json.load(f)
-        
-        return docs.get(tool_name, {})
+        # Copy so callers cannot modify the cached documentation
+        return dict(_load_docs(category).get(tool_name, {}))
     except FileNotFoundError:
         print(f"Warning: Documentation file not found for {category}_docs.json")
         return {}
@@ -68,4 +69,3 @@ def get_tool_metadata(tool_name: str, category: str = "hotel") -> Dict[str, Any]
     except Exception as e:
         print(f"Warning: Error loading metadata for {tool_name}: {e}")
         return {}
-
@@ -1,22 +1,30 @@
 """Flight-related tools for the MCP server."""
 
+import contextvars
 import os
 import re
 import requests
 import time
-from copy import deepcopy
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from tools.doc_loader import get_doc
 from tools.api_logger import log_api_call
+from tools.upstream import UpstreamBlocked, upstream_call
+from tools.streaming import collect_result
+from server.result_store import PagePolicy
 
 # SerpAPI configuration
 API_KEY = os.getenv("SERPAPI_KEY", "5ace04863364568bc6e013757ecaea56d0dc7d3e66401e9553d9e5e21c259453")
 BASE_URL = "https://serpapi.com/search"
 CURRENT_CURRENCY = "USD"
 
+# Dates searched at the same time by a flexible-date search, like the
+# serpapi concurrency cap in server/dispatch.py (SerpAPI's rate limit in
+# tools/upstream.py still applies to every request)
+FLEX_SEARCH_CONCURRENCY = int(os.getenv("MCP_FLEX_SEARCH_CONCURRENCY", "8"))
+
 
 # -------------------------
 # Utility helpers
@@ -746,7 +754,9 @@ def fetch_booking_details(
     try:
         # Use very short timeout to avoid blocking (3 seconds max)
         start_time = time.time()
-        resp = requests.get(BASE_URL, params=params, timeout=3)
+        with upstream_call("serpapi", api_key=API_KEY, max_wait=0.5) as call:
+            resp = requests.get(BASE_URL, params=params, timeout=call.timeout(3))
+            call.record(resp)
         response_time_ms = (time.time() - start_time) * 1000
         resp.raise_for_status()
         data = resp.json()
@@ -768,6 +778,8 @@ def fetch_booking_details(
             return {"error": data.get("error", "Unknown error from API")}
         
         return data
+    except UpstreamBlocked as e:
+        return {"error": str(e)}  # Don't raise, just return error
     except requests.exceptions.Timeout:
         error_msg = "Request timeout"
         log_api_call(
@@ -949,9 +961,10 @@ def _attach_booking_links_to_flights(flights, search_metadata, departure_id, arr
     print(f"[FLIGHT_TOOLS] Processing booking links for {len(flights)} flights in parallel (max_workers={max_workers})")
     
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all flight processing tasks
+        # Submit all flight processing tasks, each in a copy of this context so
+        # the caller's deadline and cancellation reach its SerpAPI calls
         future_to_index = {
-            executor.submit(process_single_flight, (idx, flight)): idx 
+            executor.submit(contextvars.copy_context().run, process_single_flight, (idx, flight)): idx 
             for idx, flight in enumerate(flights)
         }
         
@@ -1089,7 +1102,9 @@ def fetch_one_way_flights(departure, arrival, date, currency,
     }
 
     start_time = time.time()
-    resp = requests.get(BASE_URL, params=params)
+    with upstream_call("serpapi", api_key=API_KEY) as call:
+        resp = requests.get(BASE_URL, params=params, timeout=call.timeout(None))
+        call.record(resp)
     response_time_ms = (time.time() - start_time) * 1000
     data = resp.json()
 
@@ -1152,7 +1167,9 @@ def fetch_round_trip_flights(departure, arrival, dep_date, arr_date, currency,
     }
 
     start_time = time.time()
-    resp = requests.get(BASE_URL, params=params)
+    with upstream_call("serpapi", api_key=API_KEY) as call:
+        resp = requests.get(BASE_URL, params=params, timeout=call.timeout(None))
+        call.record(resp)
     response_time_ms = (time.time() - start_time) * 1000
     data = resp.json()
 
@@ -1404,7 +1421,7 @@ def agent_get_flights(
     raise ValueError("trip_type must be 'one-way' or 'round-trip'")
 
 
-def agent_get_flights_flexible(
+def iter_flights_flexible(
     trip_type, dep, arr, dep_date, arr_date=None, currency="USD",
     airline=None, max_price=None, direct_only=False,
     max_duration=None, dep_after=None, dep_before=None,
@@ -1413,10 +1430,17 @@ def agent_get_flights_flexible(
     adults=1, children=0, infants=0, travel_class=1,
     days_flex=3
 ):
-    """Perform the same flight search for ±days_flex around dep_date."""
-    all_flights = []
+    """Perform the same flight search for ±days_flex around dep_date.
+    
+    Up to FLEX_SEARCH_CONCURRENCY dates are searched at a time. Yields
+    ("partial", {"search_date": d, "flights": [...]}) as each date's search
+    completes (in completion order) and a final ("result", {...}) event with
+    the flights of all dates merged and sorted.
+    """
+    dates = date_range(dep_date, days_flex)
+    flights_by_date = {}
 
-    for d in date_range(dep_date, days_flex):
+    def search(d):
         result = agent_get_flights(
             trip_type, dep, arr, d, arr_date, currency,
             airline, max_price, direct_only, max_duration,
@@ -1424,13 +1448,31 @@ def agent_get_flights_flexible(
             stopover, sort_by, ascending,
             adults, children, infants, travel_class
         )
+        # The flights come from this search's response alone, so they are tagged in place
+        flights = result["outbound"] or []
+        for f in flights:
+            f["search_date"] = d
+        return flights
 
-        if result["outbound"]:
-            for f in result["outbound"]:
-                f_copy = deepcopy(f)
-                f_copy["search_date"] = d
-                all_flights.append(f_copy)
-
+    executor = ThreadPoolExecutor(
+        max_workers=max(min(FLEX_SEARCH_CONCURRENCY, len(dates)), 1),
+        thread_name_prefix="flex-search"
+    )
+    try:
+        # Each search runs under the tool call's deadline (context copied per thread)
+        future_to_date = {
+            executor.submit(contextvars.copy_context().run, search, d): d
+            for d in dates
+        }
+        for future in as_completed(future_to_date):
+            d = future_to_date[future]
+            flights_by_date[d] = future.result()
+            yield "partial", {"search_date": d, "flights": flights_by_date[d]}
+    finally:
+        # On an error (or a closed stream) don't start the remaining dates
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    all_flights = [f for d in dates for f in flights_by_date[d]]
     if sort_by:
         all_flights = sort_flights(all_flights, by=sort_by, ascending=ascending)
     else:
@@ -1445,7 +1487,12 @@ def agent_get_flights_flexible(
         }
     }
 
-    return {"flights": all_flights, **result_info}
+    yield "result", {"flights": all_flights, **result_info}
+
+
+def agent_get_flights_flexible(*args, **kwargs):
+    """Perform the same flight search for ±days_flex around dep_date."""
+    return collect_result(iter_flights_flexible(*args, **kwargs))
 
 
 def _validate_flight_inputs(
@@ -1492,10 +1539,246 @@ def _validate_flight_inputs(
     return True, None
 
 
+def _flexible_flights_events(
+    trip_type: str,
+    departure: str,
+    arrival: str,
+    departure_date: str,
+    arrival_date: Optional[str] = None,
+    currency: str = "USD",
+    airline: Optional[str] = None,
+    max_price: Optional[float] = None,
+    direct_only: bool = False,
+    max_duration: Optional[int] = None,
+    dep_after: Optional[str] = None,
+    dep_before: Optional[str] = None,
+    arr_after: Optional[str] = None,
+    arr_before: Optional[str] = None,
+    stopover: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    ascending: bool = True,
+    adults: int = 1,
+    children: int = 0,
+    infants: int = 0,
+    travel_class: str = "economy",
+    days_flex: int = 3
+):
+    """Run a flexible-date flight search, yielding per-date results as they complete.
+    
+    Yields ("partial", {"search_date", "flights"}) for each searched date and one
+    final ("result", response) event with the same payload as
+    agent_get_flights_flexible_tool.
+    """
+    # Normalize trip_type
+    trip_type_normalized = trip_type.lower().strip()
+    if trip_type_normalized == "oneway":
+        trip_type_normalized = "one-way"
+    elif trip_type_normalized == "roundtrip":
+        trip_type_normalized = "round-trip"
+    
+    # Convert string numeric parameters to proper types
+    if max_price is not None:
+        try:
+            max_price = float(max_price) if not isinstance(max_price, (int, float)) else max_price
+        except (ValueError, TypeError):
+            max_price = None
+    
+    if max_duration is not None:
+        try:
+            max_duration = int(max_duration) if not isinstance(max_duration, int) else max_duration
+        except (ValueError, TypeError):
+            max_duration = None
+    
+    if days_flex is not None:
+        try:
+            days_flex = int(days_flex) if not isinstance(days_flex, int) else days_flex
+        except (ValueError, TypeError):
+            days_flex = 3
+    
+    # Validate inputs first
+    is_valid, validation_error = _validate_flight_inputs(
+        trip_type_normalized, departure, arrival, departure_date, arrival_date
+    )
+    if not is_valid:
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": validation_error,
+            "flights": [],
+            "suggestion": "Please check your flight search parameters and try again."
+        }
+        return
+    
+    # Validate days_flex
+    if days_flex < 0 or days_flex > 7:
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": f"Invalid days_flex: {days_flex}. Must be between 0 and 7.",
+            "flights": [],
+            "suggestion": "Please provide days_flex between 0 and 7."
+        }
+        return
+    
+    # Convert passenger counts (might come as strings from JSON)
+    try:
+        adults = int(adults)
+    except (ValueError, TypeError):
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": f"Invalid adults value: {adults}. Must be an integer.",
+            "flights": []
+        }
+        return
+    
+    try:
+        children = int(children)
+    except (ValueError, TypeError):
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": f"Invalid children value: {children}. Must be an integer.",
+            "flights": []
+        }
+        return
+    
+    try:
+        infants = int(infants)
+    except (ValueError, TypeError):
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": f"Invalid infants value: {infants}. Must be an integer.",
+            "flights": []
+        }
+        return
+    
+    # Validate numeric inputs (same as agent_get_flights_tool)
+    if adults < 0 or children < 0 or infants < 0:
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": "Number of passengers (adults, children, infants) must be 0 or greater.",
+            "flights": [],
+            "suggestion": "Please provide valid passenger counts."
+        }
+        return
+    
+    if max_price is not None and max_price <= 0:
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": f"Invalid max_price: {max_price}. Must be a positive number.",
+            "flights": [],
+            "suggestion": "Please provide a positive number for max_price."
+        }
+        return
+    
+    try:
+        # Normalize locations (convert country/city names to airport codes)
+        normalized_departure = _normalize_location(departure)
+        normalized_arrival = _normalize_location(arrival)
+        
+        # Run the flexible flight search, forwarding per-date results as they arrive
+        result = {}
+        for event, payload in iter_flights_flexible(
+            trip_type=trip_type_normalized,
+            dep=normalized_departure,
+            arr=normalized_arrival,
+            dep_date=departure_date.strip(),
+            arr_date=arrival_date.strip() if arrival_date else None,
+            currency=currency.upper() if currency else "USD",
+            airline=airline.strip() if airline else None,
+            max_price=max_price,
+            direct_only=direct_only,
+            max_duration=max_duration,
+            dep_after=dep_after.strip() if dep_after else None,
+            dep_before=dep_before.strip() if dep_before else None,
+            arr_after=arr_after.strip() if arr_after else None,
+            arr_before=arr_before.strip() if arr_before else None,
+            stopover=stopover.strip().upper() if stopover else None,
+            sort_by=sort_by.lower() if sort_by else None,
+            ascending=ascending,
+            adults=adults,
+            children=children,
+            infants=infants,
+            travel_class=travel_class,
+            days_flex=days_flex
+        ):
+            if event == "partial":
+                yield "partial", payload
+            else:
+                result = payload
+        
+        yield "result", {
+            "error": False,
+            "flights": result.get("flights", []),
+            "passengers": result.get("_passengers", {"adults": adults, "children": children, "infants": infants}),
+            "trip_type": trip_type_normalized,
+            "departure": normalized_departure,
+            "arrival": normalized_arrival,
+            "departure_date": departure_date.strip(),
+            "arrival_date": arrival_date.strip() if arrival_date else None,
+            "days_flex": days_flex,
+            "currency": currency.upper() if currency else "USD",
+            "travel_class": travel_class.lower() if travel_class else "economy"
+        }
+        return
+        
+    except UpstreamBlocked as e:
+        yield "result", e.error_response(flights=[])
+        return
+    except ValueError as e:
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": f"Invalid parameter: {str(e)}",
+            "flights": [],
+            "suggestion": "Please check your flight search parameters and try again."
+        }
+        return
+    except Exception as e:
+        error_type = type(e).__name__
+        error_message = str(e)
+        
+        # Provide helpful error messages
+        if "timeout" in error_message.lower() or "Timeout" in error_type:
+            yield "result", {
+                "error": True,
+                "error_code": "TIMEOUT",
+                "error_message": "The flexible flight search took too long to complete. The flight service may be slow or unavailable.",
+                "flights": [],
+                "suggestion": "Please try again in a few moments. If the problem persists, the flight service may be temporarily unavailable."
+            }
+            return
+        elif "api" in error_message.lower() or "serpapi" in error_message.lower():
+            yield "result", {
+                "error": True,
+                "error_code": "API_ERROR",
+                "error_message": f"Flight API error: {error_message}",
+                "flights": [],
+                "suggestion": "Please verify your API credentials and try again. If the problem persists, contact support."
+            }
+            return
+        else:
+            yield "result", {
+                "error": True,
+                "error_code": "UNEXPECTED_ERROR",
+                "error_message": f"An unexpected error occurred while searching for flights: {error_message}",
+                "flights": [],
+                "suggestion": "Please try again. If the problem persists, contact support."
+            }
+
+
 def register_flight_tools(mcp):
     """Register all flight-related tools with the MCP server."""
     
-    @mcp.tool(description=get_doc("agent_get_flights", "flight"))
+    @mcp.tool(
+        description=get_doc("agent_get_flights", "flight"),
+        upstream="serpapi",
+        pages=PagePolicy("outbound", "return", size=25)
+    )
     def agent_get_flights_tool(
         trip_type: str,
         departure: str,
@@ -1704,6 +1987,10 @@ def register_flight_tools(mcp):
                 "travel_class": travel_class.lower() if travel_class else "economy"
             }
             
+        except UpstreamBlocked as e:
+            error_response = e.error_response(outbound=[])
+            error_response["return"] = []
+            return error_response
         except ValueError as e:
             return {
                 "error": True,
@@ -1746,7 +2033,11 @@ def register_flight_tools(mcp):
                     "suggestion": "Please try again. If the problem persists, contact support."
                 }
     
-    @mcp.tool(description=get_doc("agent_get_flights_flexible", "flight"))
+    @mcp.tool(
+        description=get_doc("agent_get_flights_flexible", "flight"),
+        upstream="serpapi",
+        pages=PagePolicy("flights", size=50)
+    )
     def agent_get_flights_flexible_tool(
         trip_type: str,
         departure: str,
@@ -1804,185 +2095,30 @@ def register_flight_tools(mcp):
         Returns:
             Dictionary with flight search results across multiple dates
         """
-        # Normalize trip_type
-        trip_type_normalized = trip_type.lower().strip()
-        if trip_type_normalized == "oneway":
-            trip_type_normalized = "one-way"
-        elif trip_type_normalized == "roundtrip":
-            trip_type_normalized = "round-trip"
-        
-        # Convert string numeric parameters to proper types
-        if max_price is not None:
-            try:
-                max_price = float(max_price) if not isinstance(max_price, (int, float)) else max_price
-            except (ValueError, TypeError):
-                max_price = None
-        
-        if max_duration is not None:
-            try:
-                max_duration = int(max_duration) if not isinstance(max_duration, int) else max_duration
-            except (ValueError, TypeError):
-                max_duration = None
-        
-        if days_flex is not None:
-            try:
-                days_flex = int(days_flex) if not isinstance(days_flex, int) else days_flex
-            except (ValueError, TypeError):
-                days_flex = 3
-        
-        # Validate inputs first
-        is_valid, validation_error = _validate_flight_inputs(
-            trip_type_normalized, departure, arrival, departure_date, arrival_date
-        )
-        if not is_valid:
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": validation_error,
-                "flights": [],
-                "suggestion": "Please check your flight search parameters and try again."
-            }
-        
-        # Validate days_flex
-        if days_flex < 0 or days_flex > 7:
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": f"Invalid days_flex: {days_flex}. Must be between 0 and 7.",
-                "flights": [],
-                "suggestion": "Please provide days_flex between 0 and 7."
-            }
-        
-        # Convert passenger counts (might come as strings from JSON)
-        try:
-            adults = int(adults)
-        except (ValueError, TypeError):
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": f"Invalid adults value: {adults}. Must be an integer.",
-                "flights": []
-            }
-        
-        try:
-            children = int(children)
-        except (ValueError, TypeError):
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": f"Invalid children value: {children}. Must be an integer.",
-                "flights": []
-            }
-        
-        try:
-            infants = int(infants)
-        except (ValueError, TypeError):
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": f"Invalid infants value: {infants}. Must be an integer.",
-                "flights": []
-            }
-        
-        # Validate numeric inputs (same as agent_get_flights_tool)
-        if adults < 0 or children < 0 or infants < 0:
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": "Number of passengers (adults, children, infants) must be 0 or greater.",
-                "flights": [],
-                "suggestion": "Please provide valid passenger counts."
-            }
-        
-        if max_price is not None and max_price <= 0:
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": f"Invalid max_price: {max_price}. Must be a positive number.",
-                "flights": [],
-                "suggestion": "Please provide a positive number for max_price."
-            }
-        
-        try:
-            # Normalize locations (convert country/city names to airport codes)
-            normalized_departure = _normalize_location(departure)
-            normalized_arrival = _normalize_location(arrival)
-            
-            # Call the flexible flight search function
-            result = agent_get_flights_flexible(
-                trip_type=trip_type_normalized,
-                dep=normalized_departure,
-                arr=normalized_arrival,
-                dep_date=departure_date.strip(),
-                arr_date=arrival_date.strip() if arrival_date else None,
-                currency=currency.upper() if currency else "USD",
-                airline=airline.strip() if airline else None,
-                max_price=max_price,
-                direct_only=direct_only,
-                max_duration=max_duration,
-                dep_after=dep_after.strip() if dep_after else None,
-                dep_before=dep_before.strip() if dep_before else None,
-                arr_after=arr_after.strip() if arr_after else None,
-                arr_before=arr_before.strip() if arr_before else None,
-                stopover=stopover.strip().upper() if stopover else None,
-                sort_by=sort_by.lower() if sort_by else None,
-                ascending=ascending,
-                adults=adults,
-                children=children,
-                infants=infants,
-                travel_class=travel_class,
-                days_flex=days_flex
-            )
-            
-            return {
-                "error": False,
-                "flights": result.get("flights", []),
-                "passengers": result.get("_passengers", {"adults": adults, "children": children, "infants": infants}),
-                "trip_type": trip_type_normalized,
-                "departure": normalized_departure,
-                "arrival": normalized_arrival,
-                "departure_date": departure_date.strip(),
-                "arrival_date": arrival_date.strip() if arrival_date else None,
-                "days_flex": days_flex,
-                "currency": currency.upper() if currency else "USD",
-                "travel_class": travel_class.lower() if travel_class else "economy"
-            }
-            
-        except ValueError as e:
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": f"Invalid parameter: {str(e)}",
-                "flights": [],
-                "suggestion": "Please check your flight search parameters and try again."
-            }
-        except Exception as e:
-            error_type = type(e).__name__
-            error_message = str(e)
-            
-            # Provide helpful error messages
-            if "timeout" in error_message.lower() or "Timeout" in error_type:
-                return {
-                    "error": True,
-                    "error_code": "TIMEOUT",
-                    "error_message": "The flexible flight search took too long to complete. The flight service may be slow or unavailable.",
-                    "flights": [],
-                    "suggestion": "Please try again in a few moments. If the problem persists, the flight service may be temporarily unavailable."
-                }
-            elif "api" in error_message.lower() or "serpapi" in error_message.lower():
-                return {
-                    "error": True,
-                    "error_code": "API_ERROR",
-                    "error_message": f"Flight API error: {error_message}",
-                    "flights": [],
-                    "suggestion": "Please verify your API credentials and try again. If the problem persists, contact support."
-                }
-            else:
-                return {
-                    "error": True,
-                    "error_code": "UNEXPECTED_ERROR",
-                    "error_message": f"An unexpected error occurred while searching for flights: {error_message}",
-                    "flights": [],
-                    "suggestion": "Please try again. If the problem persists, contact support."
-                }
-
+        return collect_result(_flexible_flights_events(
+            trip_type=trip_type,
+            departure=departure,
+            arrival=arrival,
+            departure_date=departure_date,
+            arrival_date=arrival_date,
+            currency=currency,
+            airline=airline,
+            max_price=max_price,
+            direct_only=direct_only,
+            max_duration=max_duration,
+            dep_after=dep_after,
+            dep_before=dep_before,
+            arr_after=arr_after,
+            arr_before=arr_before,
+            stopover=stopover,
+            sort_by=sort_by,
+            ascending=ascending,
+            adults=adults,
+            children=children,
+            infants=infants,
+            travel_class=travel_class,
+            days_flex=days_flex
+        ))
+    
+    # Stream per-date results to /tools/invoke_stream as each search completes
+    mcp.streamer("agent_get_flights_flexible_tool")(_flexible_flights_events)
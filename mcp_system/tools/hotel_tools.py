@@ -11,6 +11,9 @@ from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from tools.doc_loader import get_doc
 from tools.api_logger import log_api_call
+from tools.upstream import UpstreamBlocked, upstream_call
+from server.result_cache import CachePolicy, drop_params
+from server.result_store import PagePolicy
 
 # Load environment variables from .env file in main directory
 # Get the project root directory (2 levels up from mcp_system/tools/)
@@ -264,14 +267,17 @@ def _make_api_call(request_payload: Dict, top_k: Optional[int] = None, sort_by:
         # Make API request
         start_time = time.time()
         with httpx.Client(timeout=12.0) as client:
-            response = client.post(
-                API_ENDPOINT,
-                json=request_payload,
-                headers={
-                    "Content-Type": "application/json",
-                    "X-API-Key": API_KEY
-                }
-            )
+            with upstream_call("liteapi", api_key=API_KEY) as call:
+                response = client.post(
+                    API_ENDPOINT,
+                    json=request_payload,
+                    headers={
+                        "Content-Type": "application/json",
+                        "X-API-Key": API_KEY
+                    },
+                    timeout=call.timeout(12.0)
+                )
+                call.record(response)
             response_time_ms = (time.time() - start_time) * 1000
             
             # Handle 204 No Content
@@ -393,6 +399,8 @@ def _make_api_call(request_payload: Dict, top_k: Optional[int] = None, sort_by:
             
             return result
             
+    except UpstreamBlocked as e:
+        return e.error_response(hotels=[])
     except httpx.HTTPStatusError as e:
         status_code = e.response.status_code
         # Try to get detailed error information from response
@@ -482,13 +490,16 @@ def _make_hotel_details_api_call(hotel_id: str, language: Optional[str] = None,
         # Make API request
         start_time = time.time()
         with httpx.Client(timeout=timeout + 2.0) as client:
-            response = client.get(
-                HOTEL_DETAILS_ENDPOINT,
-                params=params,
-                headers={
-                    "X-API-Key": API_KEY
-                }
-            )
+            with upstream_call("liteapi", api_key=API_KEY) as call:
+                response = client.get(
+                    HOTEL_DETAILS_ENDPOINT,
+                    params=params,
+                    headers={
+                        "X-API-Key": API_KEY
+                    },
+                    timeout=call.timeout(timeout + 2.0)
+                )
+                call.record(response)
             response_time_ms = (time.time() - start_time) * 1000
             
             # Handle 400 Bad Request
@@ -588,6 +599,8 @@ def _make_hotel_details_api_call(hotel_id: str, language: Optional[str] = None,
                 "hotel": hotel_data
             }
             
+    except UpstreamBlocked as e:
+        return e.error_response(hotel=None)
     except httpx.HTTPStatusError as e:
         status_code = e.response.status_code
         if status_code == 400:
@@ -708,11 +721,14 @@ def _make_hotels_list_api_call(
         
         start_time = time.time()
         with httpx.Client(timeout=timeout) as client:
-            response = client.get(
-                HOTELS_LIST_ENDPOINT,
-                params=params,
-                headers=headers
-            )
+            with upstream_call("liteapi", api_key=API_KEY) as call:
+                response = client.get(
+                    HOTELS_LIST_ENDPOINT,
+                    params=params,
+                    headers=headers,
+                    timeout=call.timeout(timeout)
+                )
+                call.record(response)
             response_time_ms = (time.time() - start_time) * 1000
             
             
@@ -778,6 +794,8 @@ def _make_hotels_list_api_call(
                 "total": data.get("total", 0)
             }
             
+    except UpstreamBlocked as e:
+        return e.error_response(hotels=[], total=0)
     except httpx.TimeoutException:
         return {
             "error": True,
@@ -934,15 +952,18 @@ def _make_booking_api_call(booking_payload: Dict) -> Dict:
         # Make API request
         start_time = time.time()
         with httpx.Client(timeout=30.0) as client:
-            response = client.post(
-                BOOKING_ENDPOINT,
-                json=booking_payload,
-                headers={
-                    "Content-Type": "application/json",
-                    "X-API-Key": API_KEY,
-                    "Accept": "application/json"
-                }
-            )
+            with upstream_call("liteapi", api_key=API_KEY) as call:
+                response = client.post(
+                    BOOKING_ENDPOINT,
+                    json=booking_payload,
+                    headers={
+                        "Content-Type": "application/json",
+                        "X-API-Key": API_KEY,
+                        "Accept": "application/json"
+                    },
+                    timeout=call.timeout(30.0)
+                )
+                call.record(response)
             response_time_ms = (time.time() - start_time) * 1000
             
             print(f"[HOTEL BOOKING API] Response Status: {response.status_code}")
@@ -1139,6 +1160,8 @@ def _make_booking_api_call(booking_payload: Dict) -> Dict:
                 "status": booking_data.get("status", "confirmed")
             }
             
+    except UpstreamBlocked as e:
+        return e.error_response(booking=None)
     except httpx.HTTPStatusError as e:
         status_code = e.response.status_code
         try:
@@ -1207,7 +1230,7 @@ def _make_booking_api_call(booking_payload: Dict) -> Dict:
 def register_hotel_tools(mcp):
     """Register all hotel-related tools with the MCP server."""
     
-    @mcp.tool(description=get_doc("get_hotel_rates", "hotel"))
+    @mcp.tool(description=get_doc("get_hotel_rates", "hotel"), upstream="liteapi")
     def get_hotel_rates(
         checkin: str,
         checkout: str,
@@ -1349,7 +1372,7 @@ def register_hotel_tools(mcp):
         
         return _make_api_call(request_payload, top_k=k, sort_by=None)
     
-    @mcp.tool(description=get_doc("get_hotel_rates_by_price", "hotel"))
+    @mcp.tool(description=get_doc("get_hotel_rates_by_price", "hotel"), upstream="liteapi")
     def get_hotel_rates_by_price(
         checkin: str,
         checkout: str,
@@ -1479,7 +1502,11 @@ def register_hotel_tools(mcp):
         
         return _make_api_call(request_payload, top_k=k, sort_by="price")
     
-    @mcp.tool(description=get_doc("get_hotel_details", "hotel"))
+    @mcp.tool(
+        description=get_doc("get_hotel_details", "hotel"),
+        upstream="liteapi",
+        cache=CachePolicy(ttl=6 * 3600, key=drop_params("timeout"))
+    )
     def get_hotel_details(
         hotel_id: str,
         language: Optional[str] = None,
@@ -1517,7 +1544,12 @@ def register_hotel_tools(mcp):
         
         return _make_hotel_details_api_call(hotel_id.strip(), language, timeout)
     
-    @mcp.tool(description=get_doc("get_list_of_hotels", "hotel"))
+    @mcp.tool(
+        description=get_doc("get_list_of_hotels", "hotel"),
+        upstream="liteapi",
+        max_concurrency=4,
+        pages=PagePolicy("hotels", size=50)
+    )
     def get_list_of_hotels(
         country_code: Optional[str] = None,
         city_name: Optional[str] = None,
@@ -1724,7 +1756,7 @@ def register_hotel_tools(mcp):
             timeout=timeout
         )
     
-    @mcp.tool(description=get_doc("book_hotel_room", "hotel"))
+    @mcp.tool(description=get_doc("book_hotel_room", "hotel"), upstream="liteapi", coalesce=False)
     def book_hotel_room(
         hotel_id: Optional[str] = None,
         rate_id: Optional[str] = None,
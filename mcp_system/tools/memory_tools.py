@@ -15,14 +15,22 @@ project_root = Path(__file__).parent.parent.parent
 env_path = project_root / ".env"
 load_dotenv(dotenv_path=env_path)
 
-from memory.memory_store import MemoryStore
-from memory.memory_extraction import analyze_for_memory
+
+
+def _memory_store():
+    """Create a MemoryStore.
+    
+    The memory modules pull in the Qdrant client, OpenAI and the embedding
+    model, so they are imported on first use instead of at server startup.
+    """
+    from memory.memory_store import MemoryStore
+    return MemoryStore()
 
 
 def register_memory_tools(mcp):
     """Register all memory-related tools with the MCP server."""
     
-    @mcp.tool(description="Analyze a user message to determine if it should be stored in long-term memory, or if it updates/deletes an existing memory.")
+    @mcp.tool(description="Analyze a user message to determine if it should be stored in long-term memory, or if it updates/deletes an existing memory.", upstream="openai", priority="background")
     def agent_analyze_memory_tool(message: str) -> Dict:
         """Analyze a user message for memory extraction.
         
@@ -43,6 +51,7 @@ def register_memory_tools(mcp):
             - old_memory_text: str - text of memory being updated/deleted (if applicable)
         """
         try:
+            from memory.memory_extraction import analyze_for_memory
             result = analyze_for_memory(message)
             return {
                 "should_write_memory": result.get("should_write_memory", False),
@@ -63,7 +72,7 @@ def register_memory_tools(mcp):
                 "old_memory_text": ""
             }
     
-    @mcp.tool(description="Store a new memory in the long-term memory database.")
+    @mcp.tool(description="Store a new memory in the long-term memory database.", upstream="qdrant", coalesce=False, priority="background")
     def agent_store_memory_tool(user_email: str, fact_text: str, importance: int) -> Dict:
         """Store a new memory in Qdrant.
         
@@ -76,7 +85,7 @@ def register_memory_tools(mcp):
             Dictionary with success status and message
         """
         try:
-            memory_store = MemoryStore()
+            memory_store = _memory_store()
             memory_store.store_memory(user_email, fact_text, importance)
             return {
                 "success": True,
@@ -89,7 +98,7 @@ def register_memory_tools(mcp):
                 "message": f"Error storing memory: {str(e)}"
             }
     
-    @mcp.tool(description="Update an existing memory in the long-term memory database.")
+    @mcp.tool(description="Update an existing memory in the long-term memory database.", upstream="qdrant", coalesce=False, priority="background")
     def agent_update_memory_tool(user_email: str, old_fact_text: str, new_fact_text: str, new_importance: Optional[int] = None) -> Dict:
         """Update an existing memory.
         
@@ -103,7 +112,7 @@ def register_memory_tools(mcp):
             Dictionary with success status and message
         """
         try:
-            memory_store = MemoryStore()
+            memory_store = _memory_store()
             success = memory_store.update_memory(user_email, old_fact_text, new_fact_text, new_importance)
             if success:
                 return {
@@ -122,7 +131,7 @@ def register_memory_tools(mcp):
                 "message": f"Error updating memory: {str(e)}"
             }
     
-    @mcp.tool(description="Delete a memory from the long-term memory database.")
+    @mcp.tool(description="Delete a memory from the long-term memory database.", upstream="qdrant", coalesce=False, priority="background")
     def agent_delete_memory_tool(user_email: str, fact_text: str) -> Dict:
         """Delete a memory by finding similar memories and deleting the most similar one.
         
@@ -134,7 +143,7 @@ def register_memory_tools(mcp):
             Dictionary with success status and message
         """
         try:
-            memory_store = MemoryStore()
+            memory_store = _memory_store()
             # Find similar memories
             similar_memories = memory_store.find_similar_memories(user_email, fact_text, similarity_threshold=0.7)
             
@@ -165,7 +174,7 @@ def register_memory_tools(mcp):
                 "message": f"Error deleting memory: {str(e)}"
             }
     
-    @mcp.tool(description="Retrieve relevant memories for a user based on a query.")
+    @mcp.tool(description="Retrieve relevant memories for a user based on a query.", upstream="qdrant")
     def agent_get_relevant_memories_tool(user_email: str, query: str, top_k: int = 5) -> Dict:
         """Get relevant memories for a user based on a query.
         
@@ -183,7 +192,7 @@ def register_memory_tools(mcp):
             - count: int - number of memories returned
         """
         try:
-            memory_store = MemoryStore()
+            memory_store = _memory_store()
             memories = memory_store.get_relevant_memory(user_email, query, top_k=top_k)
             return {
                 "memories": memories,
@@ -1,9 +1,12 @@
 """Planner-related tools for the MCP server."""
 
+import asyncio
 import sys
 import os
 import json
 import hashlib
+import threading
+import time
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -35,6 +38,10 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Forked server workers must open their own connections instead of sharing the parent's
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
 
 class Base(DeclarativeBase):
     """Base class for all models."""
@@ -178,30 +185,64 @@ def backfill_normalized_keys():
             pass
 
 
+# Seconds before retrying schema initialization after the database was unreachable
+INIT_RETRY_SECONDS = 30.0
+
+_db_ready = False
+_db_init_failed_at: Optional[float] = None
+_db_init_lock = threading.Lock()
+
+
 # Initialize database tables (only if database is available)
-def init_planner_tables():
+def init_planner_tables() -> bool:
     """Initialize planner database tables if database is available."""
     try:
         Base.metadata.create_all(bind=engine)
         print("[PLANNER] ✓ Database tables initialized successfully")
+        return True
     except Exception as e:
         print(f"[PLANNER] ⚠ Warning: Could not connect to database: {e}")
         print("  Planner features will be unavailable until database is started.")
         print("  To start database: docker-compose up -d")
+        return False
+
+
+def init_planner_db() -> bool:
+    """Create the planner tables and backfill normalized keys (idempotent).
+    
+    This used to run on import, which made every server start (and every
+    import of this module) wait on Postgres. It now runs explicitly: in the
+    background when the server starts (see register_planner_tools), from
+    the command line (python tools/planner_tools.py), or lazily before the
+    first planner query.
+    
+    Returns:
+        True if the schema is ready
+    """
+    global _db_ready, _db_init_failed_at
+    with _db_init_lock:
+        if _db_ready:
+            return True
+        if not init_planner_tables():
+            _db_init_failed_at = time.monotonic()
+            return False
+        backfill_normalized_keys()
+        _db_ready = True
+        return True
 
-# Try to initialize tables on import (non-blocking)
-try:
-    init_planner_tables()
-    backfill_normalized_keys()
-except Exception as e:
-    print(f"[PLANNER] Could not initialize tables on import: {e}")
+
+def _get_session():
+    """Open a database session, initializing the schema on first use."""
+    if not _db_ready and (_db_init_failed_at is None or time.monotonic() - _db_init_failed_at >= INIT_RETRY_SECONDS):
+        init_planner_db()
+    return SessionLocal()
 
 
 def _get_email_from_session(session_id: str) -> Optional[str]:
     """Get user email from session_id by looking up in Chat table."""
     if not session_id:
         return None
-    db = SessionLocal()
+    db = _get_session()
     try:
         chat = db.query(Chat).filter(Chat.session_id == session_id).first()
         if chat:
@@ -217,7 +258,14 @@ def _get_email_from_session(session_id: str) -> Optional[str]:
 def register_planner_tools(mcp):
     """Register all planner-related tools with the MCP server."""
     
-    @mcp.tool(description="Add a new item to the travel plan. Use this when the user wants to save/select a flight, hotel, or other travel option.")
+    @mcp.app.on_event("startup")
+    async def init_planner_db_in_background():
+        # Don't hold up startup (or /tools/list) on Postgres; planner calls
+        # made before this finishes initialize the schema themselves
+        if os.getenv("MCP_INIT_DB_ON_STARTUP", "1") != "0":
+            asyncio.get_running_loop().run_in_executor(None, init_planner_db)
+    
+    @mcp.tool(description="Add a new item to the travel plan. Use this when the user wants to save/select a flight, hotel, or other travel option.", upstream="postgres", coalesce=False, priority="background")
     def agent_add_plan_item_tool(session_id: str, title: str, details: Dict, type: str, user_email: Optional[str] = None, status: str = "not_booked") -> Dict:
         """Add a new item to the travel plan.
         
@@ -273,7 +321,7 @@ def register_planner_tools(mcp):
             
             normalized_key = generate_normalized_key(details, type, title)
 
-            db = SessionLocal()
+            db = _get_session()
             try:
                 # Check if item already exists by normalized_key
                 existing = db.query(TravelPlanItem).filter(
@@ -380,7 +428,7 @@ def register_planner_tools(mcp):
                 "message": f"Error adding plan item: {str(e)}"
             }
     
-    @mcp.tool(description="Update an existing travel plan item. Use this when the user wants to modify details or status of a saved item.")
+    @mcp.tool(description="Update an existing travel plan item. Use this when the user wants to modify details or status of a saved item.", upstream="postgres", coalesce=False, priority="background")
     def agent_update_plan_item_tool(session_id: str, title: str, user_email: Optional[str] = None, details: Optional[Dict] = None, status: Optional[str] = None) -> Dict:
         """Update an existing travel plan item.
         
@@ -411,7 +459,7 @@ def register_planner_tools(mcp):
             except:
                 pass  # Table might already exist
             
-            db = SessionLocal()
+            db = _get_session()
             try:
                 item = db.query(TravelPlanItem).filter(
                     TravelPlanItem.email == user_email,
@@ -454,7 +502,7 @@ def register_planner_tools(mcp):
                 "message": f"Error updating plan item: {str(e)}"
             }
     
-    @mcp.tool(description="Delete a travel plan item. Use this when the user wants to remove an item from their plan.")
+    @mcp.tool(description="Delete a travel plan item. Use this when the user wants to remove an item from their plan.", upstream="postgres", coalesce=False, priority="background")
     def agent_delete_plan_item_tool(session_id: str, title: str, user_email: Optional[str] = None) -> Dict:
         """Delete a travel plan item.
         
@@ -483,7 +531,7 @@ def register_planner_tools(mcp):
             except:
                 pass  # Table might already exist
             
-            db = SessionLocal()
+            db = _get_session()
             try:
                 item = db.query(TravelPlanItem).filter(
                     TravelPlanItem.email == user_email,
@@ -516,7 +564,7 @@ def register_planner_tools(mcp):
                 "message": f"Error deleting plan item: {str(e)}"
             }
     
-    @mcp.tool(description="Retrieve all travel plan items for a session. Use this to get the current travel plan.")
+    @mcp.tool(description="Retrieve all travel plan items for a session. Use this to get the current travel plan.", upstream="postgres")
     def agent_get_plan_items_tool(session_id: str, user_email: Optional[str] = None, type: Optional[str] = None, status: Optional[str] = None) -> Dict:
         """Retrieve travel plan items for a session.
         
@@ -547,7 +595,7 @@ def register_planner_tools(mcp):
             except:
                 pass  # Table might already exist
             
-            db = SessionLocal()
+            db = _get_session()
             try:
                 query = db.query(TravelPlanItem).filter(
                     TravelPlanItem.email == user_email,
@@ -593,3 +641,7 @@ def register_planner_tools(mcp):
                 "message": f"Error retrieving plan items: {str(e)}"
             }
 
+
+if __name__ == "__main__":
+    # Explicit schema initialization, e.g. as a deploy step
+    sys.exit(0 if init_planner_db() else 1)
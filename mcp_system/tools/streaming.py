@@ -0,0 +1,23 @@
+"""Helpers for tools that stream partial results."""
+
+from typing import Any, Iterable, Tuple
+
+
+def collect_result(events: Iterable[Tuple[str, Any]]) -> Any:
+    """Drain a tool event generator and return its final result.
+    
+    Streaming tools are written as generators that yield ("partial", payload)
+    events as sub-fetches complete and one ("result", payload) event last.
+    The regular (non-streaming) tool only needs the final result.
+    
+    Args:
+        events: Iterable of (event, payload) tuples
+        
+    Returns:
+        Payload of the "result" event, or None if there was none
+    """
+    result = None
+    for event, payload in events:
+        if event == "result":
+            result = payload
+    return result
@@ -8,6 +8,9 @@ from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from tools.doc_loader import get_doc
 from tools.api_logger import log_api_call
+from tools.streaming import collect_result
+from tools.upstream import UpstreamBlocked, upstream_call
+from server.result_cache import CachePolicy, normalize_strings
 
 # Load environment variables from .env file in main directory
 # Get the project root directory (2 levels up from mcp_system/tools/)
@@ -404,10 +407,16 @@ def _make_api_call(
         timeout_config = httpx.Timeout(timeout, connect=10.0, read=timeout, write=10.0, pool=10.0)
         start_time = time.time()
         with httpx.Client(timeout=timeout_config) as client:
-            if method.upper() == "GET":
-                response = client.get(f"{BASE_URL}{endpoint}", params=params)
-            else:
-                response = client.post(f"{BASE_URL}{endpoint}", json=params)
+            with upstream_call("tripadvisor", api_key=API_KEY) as call:
+                # Shrink every phase to the caller's remaining deadline, if shorter
+                request_timeout = call.timeout(timeout)
+                if request_timeout < timeout:
+                    timeout_config = httpx.Timeout(request_timeout)
+                if method.upper() == "GET":
+                    response = client.get(f"{BASE_URL}{endpoint}", params=params, timeout=timeout_config)
+                else:
+                    response = client.post(f"{BASE_URL}{endpoint}", json=params, timeout=timeout_config)
+                call.record(response)
             response_time_ms = (time.time() - start_time) * 1000
             
             # Log API call
@@ -523,6 +532,8 @@ def _make_api_call(
                 "data": response_data
             }
             
+    except UpstreamBlocked as e:
+        return e.error_response(data={} if is_single_object else [])
     except httpx.HTTPStatusError as e:
         status_code = e.response.status_code
         if status_code == 400:
@@ -592,10 +603,277 @@ def _make_api_call(
         }
 
 
+def _search_restaurants_by_cuisine_events(
+    search_query: str,
+    cuisine_types: List[str],
+    language: Optional[str] = None
+):
+    """Search restaurants by cuisine, yielding matches as they are confirmed.
+    
+    Yields ("partial", location) for every restaurant that matches (directly
+    from the search results, or after its details lookup) and one final
+    ("result", response) event with the same payload the tool returns.
+    """
+    # Validate search_query
+    if not search_query or not isinstance(search_query, str) or not search_query.strip():
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": "Search query is required and must be a non-empty string.",
+            "data": [],
+            "suggestion": "Please provide a search query."
+        }
+        return
+    
+    # Validate cuisine_types
+    if not cuisine_types or not isinstance(cuisine_types, list) or len(cuisine_types) == 0:
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": "Cuisine types are required and must be a non-empty list.",
+            "data": [],
+            "suggestion": "Please provide at least one cuisine type (e.g., ['Italian', 'French'])."
+        }
+        return
+    
+    # Validate language
+    is_valid, error_msg = _validate_language(language)
+    if not is_valid:
+        yield "result", {
+            "error": True,
+            "error_code": "VALIDATION_ERROR",
+            "error_message": error_msg,
+            "data": [],
+            "suggestion": "Please use a supported language code or omit to use default (en)."
+        }
+        return
+    
+    # Build query parameters
+    params = {
+        "searchQuery": search_query.strip(),
+        "category": "restaurants"
+    }
+    
+    if language:
+        params["language"] = language
+    
+    # Make API call
+    result = _make_api_call("GET", "/location/search", params)
+    
+    if result.get("error"):
+        yield "result", result
+        return
+    
+    # Get locations
+    locations = result.get("data", [])
+    if not locations:
+        yield "result", result
+        return
+    
+    def normalize_cuisine(cuisine_str: str) -> str:
+        """Normalize cuisine string for matching."""
+        if not cuisine_str:
+            return ""
+        # Convert to lowercase and strip whitespace
+        normalized = cuisine_str.lower().strip()
+        # Remove common suffixes/prefixes that might interfere with matching
+        normalized = normalized.replace(" cuisine", "").replace(" restaurant", "")
+        normalized = normalized.replace(" food", "").replace(" dining", "")
+        return normalized
+    
+    def extract_cuisine_list(cuisine_data) -> List[str]:
+        """Extract list of cuisine strings from various formats."""
+        cuisine_list = []
+        if not cuisine_data:
+            return cuisine_list
+        
+        if isinstance(cuisine_data, list):
+            for item in cuisine_data:
+                if isinstance(item, str):
+                    cuisine_list.append(normalize_cuisine(item))
+                elif isinstance(item, dict):
+                    # Try multiple possible keys
+                    name = (item.get("name") or 
+                           item.get("value") or 
+                           item.get("label") or
+                           item.get("cuisine") or
+                           str(item))
+                    cuisine_list.append(normalize_cuisine(name))
+                else:
+                    cuisine_list.append(normalize_cuisine(str(item)))
+        elif isinstance(cuisine_data, str):
+            # Handle comma-separated cuisine strings
+            if "," in cuisine_data:
+                for part in cuisine_data.split(","):
+                    cuisine_list.append(normalize_cuisine(part))
+            else:
+                cuisine_list.append(normalize_cuisine(cuisine_data))
+        else:
+            cuisine_list.append(normalize_cuisine(str(cuisine_data)))
+        
+        return cuisine_list
+    
+    def matches_cuisine(location_cuisines: List[str], search_cuisines: List[str]) -> bool:
+        """Check if any location cuisine matches any search cuisine (flexible matching)."""
+        if not location_cuisines or not search_cuisines:
+            return False
+        
+        for search_cuisine in search_cuisines:
+            search_normalized = normalize_cuisine(search_cuisine)
+            if not search_normalized:
+                continue
+            
+            for loc_cuisine in location_cuisines:
+                if not loc_cuisine:
+                    continue
+                
+                # Exact match
+                if search_normalized == loc_cuisine:
+                    return True
+                
+                # Partial match (search term is contained in location cuisine)
+                if search_normalized in loc_cuisine:
+                    return True
+                
+                # Partial match (location cuisine is contained in search term)
+                if loc_cuisine in search_normalized:
+                    return True
+                
+                # Word-based matching (check if key words match)
+                search_words = set(search_normalized.split())
+                loc_words = set(loc_cuisine.split())
+                if search_words and loc_words and search_words.intersection(loc_words):
+                    return True
+        
+        return False
+    
+    # Normalize search cuisine types
+    normalized_search_cuisines = [normalize_cuisine(c) for c in cuisine_types]
+    
+    # First, try to filter by cuisine from search results if available
+    filtered_locations = []
+    locations_needing_details = []
+    
+    for location in locations:
+        # Try to get cuisine from search result if available
+        cuisine = location.get("cuisine") or location.get("cuisineType") or location.get("cuisine_type")
+        
+        # Also check location name for cuisine hints (e.g., "Italian Restaurant")
+        location_name = location.get("name", "").lower()
+        name_has_cuisine = any(normalize_cuisine(c) in location_name for c in cuisine_types)
+        
+        if cuisine:
+            location_cuisines = extract_cuisine_list(cuisine)
+            if matches_cuisine(location_cuisines, cuisine_types):
+                filtered_locations.append(location)
+                yield "partial", location
+            elif name_has_cuisine:
+                # If name suggests the cuisine, include it
+                filtered_locations.append(location)
+                yield "partial", location
+            else:
+                # Doesn't match, don't include
+                pass
+        elif name_has_cuisine:
+            # No cuisine data but name suggests it, include it
+            filtered_locations.append(location)
+            yield "partial", location
+        else:
+            # No cuisine in search result, need to get details
+            location_id = location.get("locationId") or location.get("id")
+            if location_id:
+                locations_needing_details.append((location, location_id))
+    
+    # If we have locations without cuisine info, get details for them (limit to 10 to avoid too many API calls)
+    if locations_needing_details and len(filtered_locations) < 10:
+        for location, location_id in locations_needing_details[:10]:
+            # Get details for this location with increased timeout for details calls
+            detail_params = {}
+            if language:
+                detail_params["language"] = language
+            
+            detail_result = _make_api_call("GET", f"/location/{location_id}/details", detail_params, timeout=15.0, is_single_object=True)
+            
+            # If API call failed, skip this location
+            if detail_result.get("error"):
+                continue
+            
+            detail_data = detail_result.get("data", {})
+            cuisine = detail_data.get("cuisine")
+            
+            # Also check name in details
+            detail_name = detail_data.get("name", "").lower()
+            name_has_cuisine = any(normalize_cuisine(c) in detail_name for c in cuisine_types)
+            
+            if cuisine:
+                location_cuisines = extract_cuisine_list(cuisine)
+                if matches_cuisine(location_cuisines, cuisine_types):
+                    # Add cuisine info to location and include it
+                    location["cuisine"] = cuisine
+                    filtered_locations.append(location)
+                    yield "partial", location
+                elif name_has_cuisine:
+                    # Name suggests cuisine, include it
+                    location["cuisine"] = cuisine if cuisine else []
+                    filtered_locations.append(location)
+                    yield "partial", location
+            elif name_has_cuisine:
+                # No cuisine data but name suggests it, include it
+                filtered_locations.append(location)
+                yield "partial", location
+    
+    # If still no matches after checking details, be more lenient:
+    # If search query itself contains cuisine keywords, include all results
+    if not filtered_locations and locations:
+        search_query_lower = search_query.lower()
+        query_has_cuisine = any(normalize_cuisine(c) in search_query_lower for c in cuisine_types)
+        
+        if query_has_cuisine:
+            # Search query itself mentions the cuisine, so include all results
+            filtered_locations = locations[:10]  # Limit to 10
+            yield "result", {
+                "error": False,
+                "data": filtered_locations,
+                "message": f"Search query contains cuisine keywords. Returning all restaurants from search (cuisine filtering applied to search query).",
+                "search_params": {
+                    "query": search_query,
+                    "cuisine_types": cuisine_types,
+                    "filtered_count": len(filtered_locations),
+                    "total_searched": len(locations),
+                    "note": "Results based on search query containing cuisine keywords"
+                }
+            }
+            return
+    
+    # If still no matches, return empty with helpful message
+    if not filtered_locations:
+        yield "result", {
+            "error": False,
+            "data": [],
+            "message": f"No restaurants found matching cuisine types: {', '.join(cuisine_types)}. Try different cuisine types or a different search query.",
+            "search_params": {
+                "query": search_query,
+                "cuisine_types": cuisine_types
+            }
+        }
+        return
+    
+    yield "result", {
+        "error": False,
+        "data": filtered_locations,
+        "search_params": {
+            "query": search_query,
+            "cuisine_types": cuisine_types,
+            "filtered_count": len(filtered_locations),
+            "total_searched": len(locations)
+        }
+    }
+
+
 def register_tripadvisor_tools(mcp):
     """Register all TripAdvisor-related tools with the MCP server."""
     
-    @mcp.tool(description=get_doc("search_locations", "tripadvisor"))
+    @mcp.tool(description=get_doc("search_locations", "tripadvisor"), upstream="tripadvisor")
     def search_locations(
         search_query: str,
         category: Optional[str] = None,
@@ -707,7 +985,7 @@ def register_tripadvisor_tools(mcp):
         
         return _make_api_call("GET", "/location/search", params)
     
-    @mcp.tool(description=get_doc("get_location_reviews", "tripadvisor"))
+    @mcp.tool(description=get_doc("get_location_reviews", "tripadvisor"), upstream="tripadvisor")
     def get_location_reviews(
         location_id: int,
         language: Optional[str] = None,
@@ -791,7 +1069,7 @@ def register_tripadvisor_tools(mcp):
         # Use longer timeout for reviews as they can take longer
         return _make_api_call("GET", f"/location/{location_id}/reviews", params, timeout=15.0)
     
-    @mcp.tool(description=get_doc("get_location_photos", "tripadvisor"))
+    @mcp.tool(description=get_doc("get_location_photos", "tripadvisor"), upstream="tripadvisor")
     def get_location_photos(
         location_id: int,
         language: Optional[str] = None,
@@ -891,7 +1169,11 @@ def register_tripadvisor_tools(mcp):
         
         return _make_api_call("GET", f"/location/{location_id}/photos", params)
     
-    @mcp.tool(description=get_doc("get_location_details", "tripadvisor"))
+    @mcp.tool(
+        description=get_doc("get_location_details", "tripadvisor"),
+        upstream="tripadvisor",
+        cache=CachePolicy(ttl=24 * 3600, key=normalize_strings("language", "currency"))
+    )
     def get_location_details(
         location_id: int,
         language: Optional[str] = None,
@@ -949,7 +1231,7 @@ def register_tripadvisor_tools(mcp):
         # Use longer timeout for details as they can take longer
         return _make_api_call("GET", f"/location/{location_id}/details", params, timeout=15.0, is_single_object=True)
     
-    @mcp.tool(description=get_doc("search_nearby", "tripadvisor"))
+    @mcp.tool(description=get_doc("search_nearby", "tripadvisor"), upstream="tripadvisor")
     def search_nearby(
         lat_long: str,
         category: Optional[str] = None,
@@ -1045,7 +1327,7 @@ def register_tripadvisor_tools(mcp):
         
         return _make_api_call("GET", "/location/nearby_search", params)
     
-    @mcp.tool(description=get_doc("search_locations_by_rating", "tripadvisor"))
+    @mcp.tool(description=get_doc("search_locations_by_rating", "tripadvisor"), upstream="tripadvisor")
     def search_locations_by_rating(
         search_query: str,
         min_rating: Optional[float] = None,
@@ -1170,7 +1452,7 @@ def register_tripadvisor_tools(mcp):
             }
         }
     
-    @mcp.tool(description=get_doc("search_nearby_by_rating", "tripadvisor"))
+    @mcp.tool(description=get_doc("search_nearby_by_rating", "tripadvisor"), upstream="tripadvisor")
     def search_nearby_by_rating(
         lat_long: str,
         min_rating: Optional[float] = None,
@@ -1323,7 +1605,7 @@ def register_tripadvisor_tools(mcp):
             }
         }
     
-    @mcp.tool(description=get_doc("get_top_rated_locations", "tripadvisor"))
+    @mcp.tool(description=get_doc("get_top_rated_locations", "tripadvisor"), upstream="tripadvisor")
     def get_top_rated_locations(
         search_query: str,
         k: int,
@@ -1444,7 +1726,7 @@ def register_tripadvisor_tools(mcp):
             }
         }
     
-    @mcp.tool(description=get_doc("search_locations_by_price", "tripadvisor"))
+    @mcp.tool(description=get_doc("search_locations_by_price", "tripadvisor"), upstream="tripadvisor")
     def search_locations_by_price(
         search_query: str,
         max_price_level: int,
@@ -1534,7 +1816,7 @@ def register_tripadvisor_tools(mcp):
             }
         }
     
-    @mcp.tool(description=get_doc("search_nearby_by_price", "tripadvisor"))
+    @mcp.tool(description=get_doc("search_nearby_by_price", "tripadvisor"), upstream="tripadvisor")
     def search_nearby_by_price(
         lat_long: str,
         max_price_level: int,
@@ -1652,7 +1934,7 @@ def register_tripadvisor_tools(mcp):
             }
         }
     
-    @mcp.tool(description=get_doc("search_nearby_by_distance", "tripadvisor"))
+    @mcp.tool(description=get_doc("search_nearby_by_distance", "tripadvisor"), upstream="tripadvisor")
     def search_nearby_by_distance(
         lat_long: str,
         sort_by_distance: bool = True,
@@ -1761,7 +2043,7 @@ def register_tripadvisor_tools(mcp):
             }
         }
     
-    @mcp.tool(description=get_doc("find_closest_location", "tripadvisor"))
+    @mcp.tool(description=get_doc("find_closest_location", "tripadvisor"), upstream="tripadvisor")
     def find_closest_location(
         lat_long: str,
         category: Optional[str] = None,
@@ -1872,7 +2154,7 @@ def register_tripadvisor_tools(mcp):
             }
         }
     
-    @mcp.tool(description=get_doc("search_restaurants_by_cuisine", "tripadvisor"))
+    @mcp.tool(description=get_doc("search_restaurants_by_cuisine", "tripadvisor"), upstream="tripadvisor")
     def search_restaurants_by_cuisine(
         search_query: str,
         cuisine_types: List[str],
@@ -1888,249 +2170,12 @@ def register_tripadvisor_tools(mcp):
         Note: This function first searches for restaurants, then gets details for each to check cuisine.
         For better performance, consider using search_locations with category="restaurants" and filtering manually.
         """
-        # Validate search_query
-        if not search_query or not isinstance(search_query, str) or not search_query.strip():
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": "Search query is required and must be a non-empty string.",
-                "data": [],
-                "suggestion": "Please provide a search query."
-            }
-        
-        # Validate cuisine_types
-        if not cuisine_types or not isinstance(cuisine_types, list) or len(cuisine_types) == 0:
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": "Cuisine types are required and must be a non-empty list.",
-                "data": [],
-                "suggestion": "Please provide at least one cuisine type (e.g., ['Italian', 'French'])."
-            }
-        
-        # Validate language
-        is_valid, error_msg = _validate_language(language)
-        if not is_valid:
-            return {
-                "error": True,
-                "error_code": "VALIDATION_ERROR",
-                "error_message": error_msg,
-                "data": [],
-                "suggestion": "Please use a supported language code or omit to use default (en)."
-            }
-        
-        # Build query parameters
-        params = {
-            "searchQuery": search_query.strip(),
-            "category": "restaurants"
-        }
-        
-        if language:
-            params["language"] = language
-        
-        # Make API call
-        result = _make_api_call("GET", "/location/search", params)
-        
-        if result.get("error"):
-            return result
-        
-        # Get locations
-        locations = result.get("data", [])
-        if not locations:
-            return result
-        
-        def normalize_cuisine(cuisine_str: str) -> str:
-            """Normalize cuisine string for matching."""
-            if not cuisine_str:
-                return ""
-            # Convert to lowercase and strip whitespace
-            normalized = cuisine_str.lower().strip()
-            # Remove common suffixes/prefixes that might interfere with matching
-            normalized = normalized.replace(" cuisine", "").replace(" restaurant", "")
-            normalized = normalized.replace(" food", "").replace(" dining", "")
-            return normalized
-        
-        def extract_cuisine_list(cuisine_data) -> List[str]:
-            """Extract list of cuisine strings from various formats."""
-            cuisine_list = []
-            if not cuisine_data:
-                return cuisine_list
-            
-            if isinstance(cuisine_data, list):
-                for item in cuisine_data:
-                    if isinstance(item, str):
-                        cuisine_list.append(normalize_cuisine(item))
-                    elif isinstance(item, dict):
-                        # Try multiple possible keys
-                        name = (item.get("name") or 
-                               item.get("value") or 
-                               item.get("label") or
-                               item.get("cuisine") or
-                               str(item))
-                        cuisine_list.append(normalize_cuisine(name))
-                    else:
-                        cuisine_list.append(normalize_cuisine(str(item)))
-            elif isinstance(cuisine_data, str):
-                # Handle comma-separated cuisine strings
-                if "," in cuisine_data:
-                    for part in cuisine_data.split(","):
-                        cuisine_list.append(normalize_cuisine(part))
-                else:
-                    cuisine_list.append(normalize_cuisine(cuisine_data))
-            else:
-                cuisine_list.append(normalize_cuisine(str(cuisine_data)))
-            
-            return cuisine_list
-        
-        def matches_cuisine(location_cuisines: List[str], search_cuisines: List[str]) -> bool:
-            """Check if any location cuisine matches any search cuisine (flexible matching)."""
-            if not location_cuisines or not search_cuisines:
-                return False
-            
-            for search_cuisine in search_cuisines:
-                search_normalized = normalize_cuisine(search_cuisine)
-                if not search_normalized:
-                    continue
-                
-                for loc_cuisine in location_cuisines:
-                    if not loc_cuisine:
-                        continue
-                    
-                    # Exact match
-                    if search_normalized == loc_cuisine:
-                        return True
-                    
-                    # Partial match (search term is contained in location cuisine)
-                    if search_normalized in loc_cuisine:
-                        return True
-                    
-                    # Partial match (location cuisine is contained in search term)
-                    if loc_cuisine in search_normalized:
-                        return True
-                    
-                    # Word-based matching (check if key words match)
-                    search_words = set(search_normalized.split())
-                    loc_words = set(loc_cuisine.split())
-                    if search_words and loc_words and search_words.intersection(loc_words):
-                        return True
-            
-            return False
-        
-        # Normalize search cuisine types
-        normalized_search_cuisines = [normalize_cuisine(c) for c in cuisine_types]
-        
-        # First, try to filter by cuisine from search results if available
-        filtered_locations = []
-        locations_needing_details = []
-        
-        for location in locations:
-            # Try to get cuisine from search result if available
-            cuisine = location.get("cuisine") or location.get("cuisineType") or location.get("cuisine_type")
-            
-            # Also check location name for cuisine hints (e.g., "Italian Restaurant")
-            location_name = location.get("name", "").lower()
-            name_has_cuisine = any(normalize_cuisine(c) in location_name for c in cuisine_types)
-            
-            if cuisine:
-                location_cuisines = extract_cuisine_list(cuisine)
-                if matches_cuisine(location_cuisines, cuisine_types):
-                    filtered_locations.append(location)
-                elif name_has_cuisine:
-                    # If name suggests the cuisine, include it
-                    filtered_locations.append(location)
-                else:
-                    # Doesn't match, don't include
-                    pass
-            elif name_has_cuisine:
-                # No cuisine data but name suggests it, include it
-                filtered_locations.append(location)
-            else:
-                # No cuisine in search result, need to get details
-                location_id = location.get("locationId") or location.get("id")
-                if location_id:
-                    locations_needing_details.append((location, location_id))
-        
-        # If we have locations without cuisine info, get details for them (limit to 10 to avoid too many API calls)
-        if locations_needing_details and len(filtered_locations) < 10:
-            for location, location_id in locations_needing_details[:10]:
-                # Get details for this location with increased timeout for details calls
-                detail_params = {}
-                if language:
-                    detail_params["language"] = language
-                
-                detail_result = _make_api_call("GET", f"/location/{location_id}/details", detail_params, timeout=15.0, is_single_object=True)
-                
-                # If API call failed, skip this location
-                if detail_result.get("error"):
-                    continue
-                
-                detail_data = detail_result.get("data", {})
-                cuisine = detail_data.get("cuisine")
-                
-                # Also check name in details
-                detail_name = detail_data.get("name", "").lower()
-                name_has_cuisine = any(normalize_cuisine(c) in detail_name for c in cuisine_types)
-                
-                if cuisine:
-                    location_cuisines = extract_cuisine_list(cuisine)
-                    if matches_cuisine(location_cuisines, cuisine_types):
-                        # Add cuisine info to location and include it
-                        location["cuisine"] = cuisine
-                        filtered_locations.append(location)
-                    elif name_has_cuisine:
-                        # Name suggests cuisine, include it
-                        location["cuisine"] = cuisine if cuisine else []
-                        filtered_locations.append(location)
-                elif name_has_cuisine:
-                    # No cuisine data but name suggests it, include it
-                    filtered_locations.append(location)
-        
-        # If still no matches after checking details, be more lenient:
-        # If search query itself contains cuisine keywords, include all results
-        if not filtered_locations and locations:
-            search_query_lower = search_query.lower()
-            query_has_cuisine = any(normalize_cuisine(c) in search_query_lower for c in cuisine_types)
-            
-            if query_has_cuisine:
-                # Search query itself mentions the cuisine, so include all results
-                filtered_locations = locations[:10]  # Limit to 10
-                return {
-                    "error": False,
-                    "data": filtered_locations,
-                    "message": f"Search query contains cuisine keywords. Returning all restaurants from search (cuisine filtering applied to search query).",
-                    "search_params": {
-                        "query": search_query,
-                        "cuisine_types": cuisine_types,
-                        "filtered_count": len(filtered_locations),
-                        "total_searched": len(locations),
-                        "note": "Results based on search query containing cuisine keywords"
-                    }
-                }
-        
-        # If still no matches, return empty with helpful message
-        if not filtered_locations:
-            return {
-                "error": False,
-                "data": [],
-                "message": f"No restaurants found matching cuisine types: {', '.join(cuisine_types)}. Try different cuisine types or a different search query.",
-                "search_params": {
-                    "query": search_query,
-                    "cuisine_types": cuisine_types
-                }
-            }
-        
-        return {
-            "error": False,
-            "data": filtered_locations,
-            "search_params": {
-                "query": search_query,
-                "cuisine_types": cuisine_types,
-                "filtered_count": len(filtered_locations),
-                "total_searched": len(locations)
-            }
-        }
+        return collect_result(_search_restaurants_by_cuisine_events(search_query, cuisine_types, language))
+    
+    # Stream cuisine matches to /tools/invoke_stream as detail lookups complete
+    mcp.streamer("search_restaurants_by_cuisine")(_search_restaurants_by_cuisine_events)
     
-    @mcp.tool(description=get_doc("get_multiple_location_details", "tripadvisor"))
+    @mcp.tool(description=get_doc("get_multiple_location_details", "tripadvisor"), upstream="tripadvisor")
     def get_multiple_location_details(
         location_ids: List[int],
         language: Optional[str] = None,
@@ -2236,7 +2281,7 @@ def register_tripadvisor_tools(mcp):
             }
         }
     
-    @mcp.tool(description=get_doc("compare_locations", "tripadvisor"))
+    @mcp.tool(description=get_doc("compare_locations", "tripadvisor"), upstream="tripadvisor")
     def compare_locations(
         location_ids: List[int],
         language: Optional[str] = None,
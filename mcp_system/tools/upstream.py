@@ -0,0 +1,550 @@
+"""Rate limiting and circuit breaking for external API calls.
+
+Every call to an external service goes through upstream_call(), which
+  1. fails fast with UpstreamBlocked while the service's circuit is open,
+  2. takes a token from the service's token bucket (one bucket per service
+     and API key), waiting briefly if the bucket is empty,
+  3. records the outcome so repeated failures open the circuit.
+
+Usage (sync or async):
+
+    with upstream_call("liteapi", api_key=API_KEY) as call:
+        response = client.post(...)
+        call.record(response)
+
+    async with upstream_call("calendarific", api_key=API_KEY) as call:
+        response = await client.get(...)
+        call.record(response)
+
+Tools catch UpstreamBlocked and return e.error_response(), a normal tool
+error dict ({"error": True, "error_code": "UPSTREAM_UNAVAILABLE" or
+"RATE_LIMITED", ...}).
+
+Calls also honor the caller's deadline (see server/deadline.py): no request
+starts once the deadline has passed or the tool call was cancelled
+("DEADLINE_EXCEEDED" / "CANCELLED"), and call.timeout(default) shrinks a
+request timeout to the time left:
+
+    with upstream_call("liteapi", api_key=API_KEY) as call:
+        response = client.post(..., timeout=call.timeout(12.0))
+
+Bucket state is shared between MCP replicas and worker processes through
+Redis when REDIS_URL is set (disable with MCP_UPSTREAM_REDIS=0). Async
+callers take their token through redis.asyncio, so the event loop never
+waits on Redis. Without Redis, each of the MCP_WORKERS processes gets an
+equal share of the rate. Circuit breakers are per process.
+
+Environment variables:
+    MCP_UPSTREAM_RATES: Overrides such as "serpapi=5:10,liteapi=20"
+        (requests per second, optional ":burst").
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from server.deadline import clamp_timeout, current_budget
+from server.metrics import upstream_duration
+from server.result_cache import RedisTier
+
+
+# Default (requests per second, burst) per upstream service
+DEFAULT_RATES: Dict[str, Tuple[float, int]] = {
+    "serpapi": (5.0, 10),
+    "liteapi": (10.0, 20),
+    "tripadvisor": (10.0, 20),
+    "openweathermap": (1.0, 10),  # Free tier: 60 calls/minute
+    "calendarific": (2.0, 5),
+    "exchangerate": (2.0, 5),
+}
+
+# Longest a call waits for a rate-limit token before failing with RATE_LIMITED
+DEFAULT_MAX_WAIT = 2.0
+
+# Consecutive failures that open a circuit, and how long it stays open
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0
+
+# Seconds to wait before trying Redis again after a connection failure
+REDIS_RETRY_AFTER = 30.0
+
+# Atomic token bucket: returns the wait in seconds, or -1 if the wait would
+# exceed max_wait (in which case no token is taken)
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(now - ts, 0) * rate)
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+end
+if wait > max_wait then
+    return '-1'
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+def _parse_rates(raw: Optional[str]) -> Dict[str, Tuple[float, int]]:
+    """Parse an override string such as "serpapi=5:10,liteapi=20"."""
+    rates = {}
+    if not raw:
+        return rates
+    for entry in raw.split(","):
+        if "=" not in entry:
+            continue
+        name, value = entry.split("=", 1)
+        try:
+            rate, _, burst = value.strip().partition(":")
+            rate = float(rate)
+            rates[name.strip()] = (rate, int(burst) if burst else max(int(rate * 2), 1))
+        except ValueError:
+            print(f"[UPSTREAM] Warning: ignoring invalid rate '{entry}'")
+    return rates
+
+
+class UpstreamBlocked(Exception):
+    """Raised instead of calling an upstream that is down or over its rate limit."""
+
+    def __init__(self, upstream: str, error_code: str, retry_after: float):
+        self.upstream = upstream
+        self.error_code = error_code
+        self.retry_after = retry_after
+        if error_code == "RATE_LIMITED":
+            message = f"Too many requests to {upstream}; try again in {retry_after:.1f}s."
+        elif error_code == "DEADLINE_EXCEEDED":
+            message = f"No time left in the request deadline to call {upstream}."
+        elif error_code == "CANCELLED":
+            message = f"The call to {upstream} was skipped because the request was cancelled."
+        else:
+            message = f"The {upstream} service is temporarily unavailable; try again in {retry_after:.0f}s."
+        super().__init__(message)
+
+    def error_response(self, **extra: Any) -> Dict[str, Any]:
+        """Build the structured tool error for this block.
+
+        Args:
+            **extra: Empty result fields the tool normally returns
+                     (e.g., hotels=[], data={})
+        """
+        if self.error_code in ("DEADLINE_EXCEEDED", "CANCELLED"):
+            suggestion = "The request ran out of time. Retry with a longer deadline or a narrower search."
+        else:
+            suggestion = "The service is overloaded or down. Wait a little before retrying; retrying immediately will fail again."
+        response = {
+            "error": True,
+            "error_code": self.error_code,
+            "error_message": str(self),
+            "retry_after": round(self.retry_after, 1),
+            "suggestion": suggestion
+        }
+        response.update(extra)
+        return response
+
+
+class TokenBucket:
+    """In-process token bucket."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> float:
+        """Take a token, returning how long to wait before using it.
+
+        Returns -1 (and takes nothing) if the wait would exceed max_wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            if wait > max_wait:
+                return -1
+            self.tokens -= 1
+            return wait
+
+    def pause(self, seconds: float):
+        """Drain the bucket so no calls go out for the given time (e.g., after a 429)."""
+        with self._lock:
+            self.tokens = min(self.tokens, -seconds * self.rate)
+            self.updated = time.monotonic()
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing.
+
+    closed: calls pass. After FAILURE_THRESHOLD consecutive failures the
+    circuit opens and calls fail fast for RESET_TIMEOUT seconds. Then one
+    probe call is let through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> float:
+        """Return 0 if a call may proceed, else seconds until the next probe."""
+        with self._lock:
+            if self.state == "closed":
+                return 0.0
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == "open" and remaining > 0:
+                return remaining
+            if self.probing:
+                # Half-open: one probe at a time
+                return max(remaining, 1.0)
+            self.state = "half_open"
+            self.probing = True
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures, "times_opened": self.times_opened}
+
+
+class UpstreamRegistry:
+    """Limiters and breakers for every upstream service."""
+
+    def __init__(self):
+        self.rates = dict(DEFAULT_RATES)
+        self.rates.update(_parse_rates(os.getenv("MCP_UPSTREAM_RATES")))
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+        redis_enabled = os.getenv("MCP_UPSTREAM_REDIS", "1") != "0"
+        self._redis_url = os.getenv("REDIS_URL") if redis_enabled else None
+        self._redis = None
+        self._redis_script = None
+        self._redis_down_until = 0.0
+        # Async callers use their own loop-bound connection to the same buckets
+        self._async_redis = RedisTier("UPSTREAM", enabled=redis_enabled)
+        self._async_script: Optional[Tuple[Any, Any]] = None
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """Give a forked worker its own locks, buckets and Redis connection."""
+        self._lock = threading.Lock()
+        self._buckets = {}
+        for breaker in self._breakers.values():
+            breaker._lock = threading.Lock()
+        self._redis = None
+        self._redis_script = None
+        self._async_script = None
+
+    def breaker(self, upstream: str) -> CircuitBreaker:
+        """Get the circuit breaker for an upstream."""
+        breaker = self._breakers.get(upstream)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(upstream, CircuitBreaker())
+                self._counters.setdefault(upstream, {"calls": 0, "failures": 0, "rejected": 0, "rate_limited": 0})
+        return breaker
+
+    def count(self, upstream: str, counter: str):
+        self.breaker(upstream)
+        self._counters[upstream][counter] += 1
+
+    def reserve(self, upstream: str, api_key: Optional[str], max_wait: float) -> float:
+        """Take a rate-limit token; see TokenBucket.reserve()."""
+        if upstream not in self.rates:
+            return 0.0
+        rate, burst = self.rates[upstream]
+        bucket_key = self._bucket_key(upstream, api_key)
+
+        script = self._get_redis_script()
+        if script is not None:
+            try:
+                return float(script(keys=[f"MCP:ratelimit:{bucket_key}"], args=[rate, burst, time.time(), max_wait]))
+            except Exception as e:
+                self._redis_failed(e)
+        return self._local_bucket(bucket_key, rate, burst).reserve(max_wait)
+
+    async def areserve(self, upstream: str, api_key: Optional[str], max_wait: float) -> float:
+        """Take a rate-limit token without blocking the event loop; see reserve()."""
+        if upstream not in self.rates:
+            return 0.0
+        rate, burst = self.rates[upstream]
+        bucket_key = self._bucket_key(upstream, api_key)
+
+        client = self._async_redis.client()
+        if client is not None:
+            if self._async_script is None or self._async_script[0] is not client:
+                self._async_script = (client, client.register_script(_TOKEN_BUCKET_LUA))
+            try:
+                return float(await self._async_script[1](
+                    keys=[f"MCP:ratelimit:{bucket_key}"], args=[rate, burst, time.time(), max_wait]
+                ))
+            except Exception as e:
+                self._async_redis.failed(e)
+        return self._local_bucket(bucket_key, rate, burst).reserve(max_wait)
+
+    def _local_bucket(self, bucket_key: str, rate: float, burst: int) -> TokenBucket:
+        """Get the in-process bucket used when Redis is unavailable."""
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            # Without Redis each worker process gets an equal share of the limit
+            share = 1.0 / max(int(os.getenv("MCP_WORKERS", "1")), 1)
+            with self._lock:
+                bucket = self._buckets.setdefault(bucket_key, TokenBucket(rate * share, max(int(burst * share), 1)))
+        return bucket
+
+    def pause(self, upstream: str, api_key: Optional[str], seconds: float):
+        """Stop calls to an upstream for a while after it returned 429."""
+        if upstream not in self.rates:
+            return
+        rate, _ = self.rates[upstream]
+        bucket_key = self._bucket_key(upstream, api_key)
+        if self._get_redis_script() is not None:
+            try:
+                self._redis.hset(f"MCP:ratelimit:{bucket_key}", mapping={"tokens": -seconds * rate, "ts": time.time()})
+            except Exception as e:
+                self._redis_failed(e)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is not None:
+            bucket.pause(seconds)
+
+    async def apause(self, upstream: str, api_key: Optional[str], seconds: float):
+        """Like pause(), writing the shared bucket without blocking the event loop."""
+        if upstream not in self.rates:
+            return
+        rate, _ = self.rates[upstream]
+        bucket_key = self._bucket_key(upstream, api_key)
+        client = self._async_redis.client()
+        if client is not None:
+            try:
+                await client.hset(f"MCP:ratelimit:{bucket_key}", mapping={"tokens": -seconds * rate, "ts": time.time()})
+            except Exception as e:
+                self._async_redis.failed(e)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is not None:
+            bucket.pause(seconds)
+
+    @staticmethod
+    def _bucket_key(upstream: str, api_key: Optional[str]) -> str:
+        """One bucket per upstream and API key (the key itself is hashed)."""
+        if not api_key:
+            return upstream
+        return f"{upstream}:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]}"
+
+    def _get_redis_script(self):
+        """Get the shared token-bucket script, or None to use local buckets."""
+        if not self._redis_url or time.time() < self._redis_down_until:
+            return None
+        if self._redis_script is None:
+            try:
+                import redis
+            except ImportError:
+                self._redis_url = None
+                return None
+            self._redis = redis.from_url(self._redis_url, socket_connect_timeout=0.2, socket_timeout=0.2)
+            self._redis_script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+        return self._redis_script
+
+    def _redis_failed(self, error: Exception):
+        """Fall back to local buckets for a while."""
+        self._redis_down_until = time.time() + REDIS_RETRY_AFTER
+        self._redis_script = None
+        print(f"[UPSTREAM] Warning: shared rate limiter unavailable ({error}), using local limits for {REDIS_RETRY_AFTER:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return breaker state and call counters per upstream."""
+        return {
+            name: dict(
+                self._counters.get(name, {}),
+                circuit=breaker.stats(),
+                rate=self.rates.get(name, (None, None))[0],
+                burst=self.rates.get(name, (None, None))[1]
+            )
+            for name, breaker in self._breakers.items()
+        }
+
+
+registry = UpstreamRegistry()
+
+
+class UpstreamCall:
+    """Context manager guarding one call to an external service.
+
+    Raises UpstreamBlocked on entry if the circuit is open, no rate-limit
+    token is available within max_wait (capped by the caller's deadline), or
+    the tool call is past its deadline or cancelled. Exceptions raised inside
+    the block count as failures, except when the caller's deadline ran out
+    or the call was cancelled: that says nothing about the upstream's health.
+    Call record(response) to classify HTTP responses: 429 and 5xx are
+    failures, anything else is a success.
+    """
+
+    def __init__(self, upstream: str, api_key: Optional[str] = None, max_wait: float = DEFAULT_MAX_WAIT):
+        self.upstream = upstream
+        self.api_key = api_key
+        self.max_wait = max_wait
+        self._outcome: Optional[bool] = None
+        self._started = 0.0
+        self._async = False
+        self._pause: Optional[float] = None
+
+    def _admit(self) -> float:
+        """Check the deadline and breaker and take a token; return the wait before calling."""
+        breaker, max_wait = self._check()
+        return self._reserved(breaker, registry.reserve(self.upstream, self.api_key, max_wait))
+
+    async def _aadmit(self) -> float:
+        """Like _admit(), taking the token without blocking the event loop."""
+        breaker, max_wait = self._check()
+        return self._reserved(breaker, await registry.areserve(self.upstream, self.api_key, max_wait))
+
+    def _check(self) -> Tuple[CircuitBreaker, float]:
+        """Check the deadline and breaker; return the breaker and the longest token wait."""
+        max_wait = self.max_wait
+        budget = current_budget()
+        if budget is not None:
+            if budget.cancelled:
+                raise UpstreamBlocked(self.upstream, "CANCELLED", 0.0)
+            remaining = budget.remaining()
+            if remaining is not None:
+                if remaining <= 0:
+                    raise UpstreamBlocked(self.upstream, "DEADLINE_EXCEEDED", 0.0)
+                max_wait = min(max_wait, remaining)
+        breaker = registry.breaker(self.upstream)
+        retry_after = breaker.allow()
+        if retry_after:
+            registry.count(self.upstream, "rejected")
+            raise UpstreamBlocked(self.upstream, "UPSTREAM_UNAVAILABLE", retry_after)
+        return breaker, max_wait
+
+    def _reserved(self, breaker: CircuitBreaker, wait: float) -> float:
+        """Count a token reservation; raise RATE_LIMITED if none was available in time."""
+        if wait < 0:
+            if breaker.state == "half_open":
+                # Give the probe slot back
+                breaker.probing = False
+            registry.count(self.upstream, "rate_limited")
+            raise UpstreamBlocked(self.upstream, "RATE_LIMITED", self.max_wait)
+        registry.count(self.upstream, "calls")
+        return wait
+
+    def __enter__(self) -> "UpstreamCall":
+        wait = self._admit()
+        if wait > 0:
+            time.sleep(wait)
+        self._started = time.perf_counter()
+        return self
+
+    async def __aenter__(self) -> "UpstreamCall":
+        self._async = True
+        wait = await self._aadmit()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._started = time.perf_counter()
+        return self
+
+    def timeout(self, default: Optional[float]) -> Optional[float]:
+        """Shrink a request timeout (seconds, None for none) to the caller's remaining budget."""
+        return clamp_timeout(default)
+
+    def record(self, response: Any):
+        """Classify an HTTP response (httpx or requests) as success or failure."""
+        status = getattr(response, "status_code", None) or 0
+        if status == 429:
+            retry_after = 1.0
+            try:
+                retry_after = float(response.headers.get("retry-after", retry_after))
+            except (TypeError, ValueError):
+                pass
+            if self._async:
+                # Applied in __aexit__, where Redis can be awaited
+                self._pause = retry_after
+            else:
+                registry.pause(self.upstream, self.api_key, retry_after)
+            self._outcome = False
+        else:
+            self._outcome = status < 500
+
+    def _finish(self, failed: bool, abandoned: bool = False):
+        breaker = registry.breaker(self.upstream)
+        if abandoned and self._outcome is None:
+            # Cut short by the caller (deadline or cancellation): neither success nor failure
+            upstream_duration.observe(self.upstream, "abandoned", value=time.perf_counter() - self._started)
+            if breaker.state == "half_open":
+                breaker.probing = False
+            return
+        failed = failed or self._outcome is False
+        upstream_duration.observe(self.upstream, "error" if failed else "ok",
+                                  value=time.perf_counter() - self._started)
+        if failed:
+            registry.count(self.upstream, "failures")
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    @staticmethod
+    def _cut_short() -> bool:
+        """Whether the current tool call is past its deadline or cancelled."""
+        budget = current_budget()
+        return budget is not None and (budget.cancelled or budget.expired())
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._finish(exc_type is not None, abandoned=exc_type is not None and self._cut_short())
+        return False
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if self._pause is not None:
+            await registry.apause(self.upstream, self.api_key, self._pause)
+        cancelled = exc_type is not None and issubclass(exc_type, asyncio.CancelledError)
+        self._finish(exc_type is not None, abandoned=cancelled or (exc_type is not None and self._cut_short()))
+        return False
+
+
+def upstream_call(upstream: str, api_key: Optional[str] = None, max_wait: float = DEFAULT_MAX_WAIT) -> UpstreamCall:
+    """Guard one call to an external service (use with "with" or "async with").
+
+    Args:
+        upstream: Service name (e.g., "liteapi"); see DEFAULT_RATES
+        api_key: API key the call is made with; each key gets its own bucket
+        max_wait: Longest to wait for a rate-limit token before failing
+    """
+    return UpstreamCall(upstream, api_key=api_key, max_wait=max_wait)
+
+
+def upstream_stats() -> Dict[str, Any]:
+    """Return limiter and circuit breaker stats for every upstream used so far."""
+    return registry.stats()
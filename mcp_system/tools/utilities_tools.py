@@ -12,7 +12,9 @@ from pathlib import Path
 from dotenv import load_dotenv
 from tools.doc_loader import get_doc
 from tools.api_logger import log_api_call
-from bs4 import BeautifulSoup
+from tools.upstream import UpstreamBlocked, upstream_call
+from server.result_cache import CachePolicy, normalize_strings
+from server.result_store import PagePolicy
 
 # Load environment variables from .env file in main directory
 project_root = Path(__file__).parent.parent.parent
@@ -31,7 +33,7 @@ CALENDARIFIC_API_URL = "https://calendarific.com/api/v2/holidays"
 def register_utilities_tools(mcp):
     """Register utilities tools with the MCP server."""
     
-    @mcp.tool(description=get_doc("get_real_time_weather", "utilities"))
+    @mcp.tool(description=get_doc("get_real_time_weather", "utilities"), upstream="openweathermap")
     async def get_real_time_weather(location: str) -> Dict:
         """Get real-time weather information for a specific location.
         
@@ -51,7 +53,9 @@ def register_utilities_tools(mcp):
                         "appid": WEATHER_API_KEY,
                         "units": "metric"  # Use metric for Celsius
                     }
-                    response = await client.get(WEATHER_API_URL, params=params)
+                    async with upstream_call("openweathermap", api_key=WEATHER_API_KEY) as call:
+                        response = await client.get(WEATHER_API_URL, params=params, timeout=call.timeout(10.0))
+                        call.record(response)
                     response_time_ms = (time.time() - start_time) * 1000
                     response.raise_for_status()
                     data = response.json()
@@ -125,6 +129,8 @@ def register_utilities_tools(mcp):
                             "visibility": "km"
                         }
                     }
+        except UpstreamBlocked as e:
+            return e.error_response()
         except httpx.HTTPStatusError as e:
             error_msg = f"Could not fetch weather data for '{location}'. Please check the location name and try again."
             log_api_call(
@@ -160,7 +166,11 @@ def register_utilities_tools(mcp):
                 "error_code": "UNEXPECTED_ERROR"
             }
     
-    @mcp.tool(description=get_doc("convert_currencies", "utilities"))
+    @mcp.tool(
+        description=get_doc("convert_currencies", "utilities"),
+        upstream="exchangerate",
+        cache=CachePolicy(ttl=15 * 60, key=normalize_strings("from_currency", "to_currency", upper=True))
+    )
     async def convert_currencies(from_currency: str, to_currency: str, amount: float = 1.0) -> Dict:
         """Convert currency from one code to another.
         
@@ -190,7 +200,9 @@ def register_utilities_tools(mcp):
             # Use exchangerate-api.com (free, no key needed)
             async with httpx.AsyncClient(timeout=10.0) as client:
                 # Get rates for the base currency
-                response = await client.get(f"{CURRENCY_API_URL}/{from_currency}")
+                async with upstream_call("exchangerate") as call:
+                    response = await client.get(f"{CURRENCY_API_URL}/{from_currency}", timeout=call.timeout(10.0))
+                    call.record(response)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -215,6 +227,8 @@ def register_utilities_tools(mcp):
                     "rate_date": data.get("date", ""),
                     "base_currency": data.get("base", from_currency)
                 }
+        except UpstreamBlocked as e:
+            return e.error_response()
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 return {
@@ -234,7 +248,7 @@ def register_utilities_tools(mcp):
                 "error_code": "UNEXPECTED_ERROR"
             }
     
-    @mcp.tool(description=get_doc("get_real_time_date_time", "utilities"))
+    @mcp.tool(description=get_doc("get_real_time_date_time", "utilities"), upstream="worldtimeapi")
     async def get_real_time_date_time(location: str) -> Dict:
         """Get real-time date and time for a specific country or city.
         
@@ -672,7 +686,12 @@ def register_utilities_tools(mcp):
                 "details": str(traceback.format_exc())[:200]  # First 200 chars of traceback
             }
     
-    @mcp.tool(description=get_doc("get_esim_bundles", "utilities"))
+    @mcp.tool(
+        description=get_doc("get_esim_bundles", "utilities"),
+        upstream="esim",
+        cache=CachePolicy(ttl=6 * 3600, key=normalize_strings("country")),
+        pages=PagePolicy("bundles", size=50)
+    )
     async def get_esim_bundles(country: str, limit: Optional[int] = 50) -> Dict:
         """Get available eSIM bundles for a specific country.
         
@@ -934,8 +953,9 @@ def register_utilities_tools(mcp):
                 # Debug: Check response status and content length
                 print(f"eSIM Tool: Response status: {response.status_code}, Content length: {len(response.text)}")
                 
-                # Parse HTML with BeautifulSoup
+                # Parse HTML with BeautifulSoup (imported on first use to keep startup fast)
                 try:
+                    from bs4 import BeautifulSoup
                     soup = BeautifulSoup(response.text, "html.parser")
                 except Exception as e:
                     return {
@@ -1434,7 +1454,11 @@ def register_utilities_tools(mcp):
                 "details": str(traceback.format_exc())[:200]
             }
     
-    @mcp.tool(description=get_doc("get_holidays", "utilities"))
+    @mcp.tool(
+        description=get_doc("get_holidays", "utilities"),
+        upstream="calendarific",
+        cache=CachePolicy(ttl=24 * 3600, key=normalize_strings("country"))
+    )
     async def get_holidays(country: str, year: Optional[int] = None, month: Optional[int] = None, day: Optional[int] = None) -> Dict:
         """Get holidays for a specific country, optionally filtered by date.
         
@@ -1632,7 +1656,9 @@ def register_utilities_tools(mcp):
             start_time = time.time()
             async with httpx.AsyncClient(timeout=15.0) as client:
                 try:
-                    response = await client.get(CALENDARIFIC_API_URL, params=params)
+                    async with upstream_call("calendarific", api_key=CALENDARIFIC_API_KEY) as call:
+                        response = await client.get(CALENDARIFIC_API_URL, params=params, timeout=call.timeout(15.0))
+                        call.record(response)
                     response_time_ms = (time.time() - start_time) * 1000
                     response.raise_for_status()
                     data = response.json()
@@ -1653,6 +1679,8 @@ def register_utilities_tools(mcp):
                         success=success,
                         error_message=error_msg
                     )
+                except UpstreamBlocked as e:
+                    return e.error_response(country=country)
                 except httpx.HTTPStatusError as e:
                     error_msg = None
                     if e.response.status_code == 401:
@@ -2,8 +2,8 @@
 
 import re
 from typing import Dict, Optional, Tuple
-from playwright.async_api import async_playwright
 from tools.doc_loader import get_doc
+from server.result_cache import CachePolicy, normalize_strings
 
 
 async def get_traveldoc_requirement(nationality: str, leaving_from: str, going_to: str):
@@ -11,6 +11,9 @@ async def get_traveldoc_requirement(nationality: str, leaving_from: str, going_t
     Automates traveldoc.aero visa requirement lookup and returns
     a clean, readable structured summary of the results.
     """
+    # Playwright is only needed for this tool; import it on first use
+    from playwright.async_api import async_playwright
+
     async with async_playwright() as pw:
         browser = await pw.chromium.launch(headless=True, slow_mo=300)
         context = await browser.new_context()
@@ -152,7 +155,11 @@ def _validate_visa_inputs(
 def register_visa_tools(mcp):
     """Register all visa-related tools with the MCP server."""
     
-    @mcp.tool(description=get_doc("get_traveldoc_requirement", "visa"))
+    @mcp.tool(
+        description=get_doc("get_traveldoc_requirement", "visa"),
+        upstream="traveldoc",
+        cache=CachePolicy(ttl=24 * 3600, key=normalize_strings("nationality", "leaving_from", "going_to"))
+    )
     async def get_traveldoc_requirement_tool(
         nationality: str,
         leaving_from: str,
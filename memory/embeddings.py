@@ -1,5 +1,4 @@
 """Embeddings using sentence-transformers."""
-from sentence_transformers import SentenceTransformer
 import os
 
 # Load model once (singleton pattern)
@@ -7,9 +6,14 @@ _model = None
 
 
 def get_model():
-    """Get or load the sentence transformer model."""
+    """Get or load the sentence transformer model.
+    
+    sentence-transformers (and torch) are imported here rather than at module
+    level so importing this module stays cheap until an embedding is needed.
+    """
     global _model
     if _model is None:
+        from sentence_transformers import SentenceTransformer
         _model = SentenceTransformer('all-MiniLM-L6-v2')
     return _model
 